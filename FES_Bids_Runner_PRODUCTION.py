@@ -12,12 +12,16 @@ from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime, timedelta
 import sys
 import os
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime, timedelta
 
 # Import the PRODUCTION master script classes
 try:
-    from FES_MasterScript_PRODUCTION import grab_forecast_data, MurleyGUCompiler, SupplyUnitCompiler
+    from FES_MasterScript_PRODUCTION import (grab_forecast_data, grab_forecast_window, GeneratorUnitCompiler,
+                                             SupplyUnitCompiler, run_in_parallel, WEEKEND_FORECAST_LAGS)
+    from FES_Fabric_Uploader import warm_up_fabric_engine, get_upload_outbox, new_upload_run, collect_uploads
+    from FES_Meteologica import get_meteologica_password, PASSWORD_MISSING_MESSAGE
 except ImportError:
     print("ERROR: Cannot import FES_MasterScript_PRODUCTION. Make sure FES_MasterScript_PRODUCTION.py is in the same directory.")
     sys.exit(1)
@@ -30,6 +34,8 @@ class FESBidApp:
         self.root.geometry("900x900")
         self.root.resizable(True, True)
         self.root.minsize(800, 700)  # Minimum size
+        self.running = False  # A compilation is in progress (inputs locked)
+        self.d1_forecasts = {}  # Trading day -> D-1 forecast made in this session (reused by IDA-1)
 
         # Apply modern styling
         style = ttk.Style()
@@ -394,6 +400,16 @@ class FESBidApp:
         self.log_status("Ready to compile bids.")
         self.log_status("Select trading date and bid type, then click RUN COMPILATION.")
         self.log_status("SQL upload is disabled by default - check box to enable.")
+
+        # Start the upload outbox so batches left from an earlier session are replayed
+        pending = len(get_upload_outbox().pending())
+        if pending:
+            self.log_status(f"[OUTBOX] Replaying {pending} upload(s) left from an earlier session.")
+
+        # Launched with pythonw there is no console - say it here if the forecast login cannot work
+        if not get_meteologica_password():
+            self.log_status("")
+            self.log_status(f"[ERROR] {PASSWORD_MISSING_MESSAGE}")
         self.status_text.config(state="disabled")
 
         # ==========================================
@@ -411,6 +427,32 @@ class FESBidApp:
             fg="#95a5a6"
         ).pack(pady=8)
 
+    def set_inputs_enabled(self, enabled):
+        """Enable or disable every input control (date, bid type, options, buttons)"""
+        state = "normal" if enabled else "disabled"
+        widgets = list(self.root.winfo_children())
+        while widgets:
+            widget = widgets.pop()
+            widgets.extend(widget.winfo_children())
+            if isinstance(widget, (tk.Button, tk.Checkbutton, tk.Radiobutton, ttk.Spinbox)):
+                widget.configure(state=state)
+
+    def wait_until(self, is_done, poll_ms=100):
+        """
+        Keep the window responsive until is_done() returns True.
+        is_done is polled with root.after from the Tk event loop.
+        """
+        finished = tk.BooleanVar(value=False)
+
+        def check():
+            if is_done():
+                finished.set(True)
+            else:
+                self.root.after(poll_ms, check)
+
+        check()
+        self.root.wait_variable(finished)
+
     def get_tomorrow(self):
         """Get tomorrow's date for D-1 bidding"""
         tomorrow = datetime.now() + timedelta(days=1)
@@ -469,10 +511,16 @@ class FESBidApp:
 
     def run_workflow(self):
         """Main workflow execution"""
+        if self.running:
+            return
         input_date = self.validate_date()
         if not input_date:
             return
 
+        if not get_meteologica_password():
+            messagebox.showerror("Meteologica Password Missing", PASSWORD_MISSING_MESSAGE)
+            return
+
         upload_sql = self.upload_sql_var.get()
         create_ppt = self.create_ppt_var.get()
         friday_mode = self.friday_mode_var.get()
@@ -492,7 +540,7 @@ class FESBidApp:
             confirm_msg += f"PowerPoint: {ppt_status}{friday_status}\n\n"
             confirm_msg += "Steps:\n"
             confirm_msg += "  1. Generate Generation Forecast\n"
-            confirm_msg += "  2. Compile Murley GU Bids\n"
+            confirm_msg += "  2. Compile GU Bids (in parallel with step 3)\n"
             confirm_msg += "  3. Compile Supply Unit Bids\n"
             confirm_msg += "  4. Save all files to I: drive\n"
 
@@ -533,21 +581,41 @@ class FESBidApp:
         if not confirm:
             return
 
-        # Disable button and change text
+        # Lock the inputs and change the button text until the run is over
+        self.running = True
+        self.set_inputs_enabled(False)
         self.run_button.config(state="disabled", text="RUNNING...", bg="#7f8c8d")
         self.clear_status()
 
         try:
+            # Log in to Fabric in the background while the forecast downloads.
+            # Result goes to the console - Tk widgets must only be touched from this thread.
+            run_id = None
+            if upload_sql:
+                run_id = new_upload_run(bid_type)
+                warm_up_fabric_engine()
+
             # ==========================================
             # ROUTE TO CORRECT WORKFLOW
             # ==========================================
-            if bid_type == "IDA-1":
-                # IDA-1 WORKFLOW
-                self.run_ida1_workflow(input_date, upload_sql)
-            else:
-                # D-1 WORKFLOW (original)
-                self.run_d1_workflow(input_date, upload_sql, create_ppt, friday_mode)
-            
+            # The run's tables are collected and uploaded together at the end, in one
+            # transaction - if any step fails, nothing reaches the warehouse
+            with collect_uploads(run_id) if upload_sql else nullcontext() as uploads:
+                if bid_type == "IDA-1":
+                    # IDA-1 WORKFLOW
+                    self.run_ida1_workflow(input_date, upload_sql)
+                else:
+                    # D-1 WORKFLOW (original)
+                    self.run_d1_workflow(input_date, upload_sql, create_ppt, friday_mode)
+
+            if upload_sql:
+                self.log_status("")
+                if uploads.sent:
+                    self.log_status(f"[UPLOAD] {uploads.summary()} sent as one transaction")
+                    self.log_status("[UPLOAD] Uploading in background - failed uploads are retried automatically")
+                else:
+                    self.log_status(f"[ERROR] FAILED to queue upload: {uploads.summary()}")
+
             # SUCCESS
             self.log_status("")
             self.log_status("=" * 70)
@@ -564,8 +632,10 @@ class FESBidApp:
             messagebox.showerror("Execution Failed", f"Error during {bid_type} compilation:\n\n{str(e)}")
 
         finally:
-            # Re-enable button
+            # Re-enable inputs and button
+            self.set_inputs_enabled(True)
             self.run_button.config(state="normal", text="RUN COMPILATION", bg=self.colors['accent'])
+            self.running = False
     
     def run_d1_workflow(self, input_date, upload_sql, create_ppt, friday_mode):
         """Execute D-1 bid workflow"""
@@ -590,14 +660,33 @@ class FESBidApp:
             self.log_status(f"SQL Upload: {upload_status}")
 
             try:
-                forecast_df, lag, gen_upload_success = grab_forecast_data(input_date, upload_to_sql=upload_sql)
+                if create_ppt and friday_mode:
+                    # Friday pack: trading day + Sat/Sun/Mon in one Meteologica request.
+                    # Each day is saved under its own lag; only the trading day is uploaded
+                    window = grab_forecast_window(
+                        input_date,
+                        extra_days=len(WEEKEND_FORECAST_LAGS),
+                        upload_to_sql=upload_sql,
+                        upload_days=1
+                    )
+                    _, forecast_df, lag, gen_upload_success = window[0]
+                    forecasts = {lag: forecast_df}
+                    # The PPT knows the weekend days by its own labels (Sat D-3, Sun D-4, Mon D-5)
+                    for ppt_lag, (day_str, day_df, day_lag, _) in zip(WEEKEND_FORECAST_LAGS, window[1:]):
+                        forecasts[ppt_lag] = day_df
+                        self.log_status(f"[OK] Weekend forecast saved: {day_str} {day_lag} (PPT {ppt_lag})")
+                else:
+                    forecast_df, lag, gen_upload_success = grab_forecast_data(input_date, upload_to_sql=upload_sql)
+                    forecasts = {lag: forecast_df}
+                if lag == "D-1":
+                    self.d1_forecasts[input_date] = forecast_df
                 self.log_status(f"[OK] Generation forecast complete: {len(forecast_df)} periods")
                 if upload_sql:
                     table_name = "Generation_D_Minus_1" if lag == "D-1" else "Generation_D_Minus_X"
                     if gen_upload_success:
-                        self.log_status(f"[OK] Uploaded to {table_name} (PRODUCTION)")
+                        self.log_status(f"[OK] Prepared upload for {table_name} (PRODUCTION, sent at the end of the run)")
                     else:
-                        self.log_status(f"[ERROR] FAILED to upload to {table_name}")
+                        self.log_status(f"[ERROR] FAILED to prepare upload for {table_name}")
                 else:
                     self.log_status("[SKIP] File saved to I: drive (SQL upload disabled)")
             except Exception as e:
@@ -605,33 +694,56 @@ class FESBidApp:
                 raise
 
             # ==========================================
-            # STEP 2: Murley GU Bids
+            # STEPS 2 & 3: GU and Supply Unit Bids
+            # ==========================================
+            # Independent once the forecast exists: compiled concurrently (Excel I/O,
+            # chart rendering and upload preparation overlap), logs reported in step order
+            self.log_status("")
+            self.log_status("Compiling GU and SU bids in parallel...")
+
+            gu_compiler = GeneratorUnitCompiler()
+            su_compiler = SupplyUnitCompiler()
+            compiler_args = dict(
+                bid_date=input_date,
+                lag=lag,
+                upload_sql=upload_sql,
+                use_production=True,  # ALWAYS use production table
+                forecast_df=forecast_df  # Hand over the forecast from step 1 (no re-read from I:)
+            )
+            def compile_with_output(compiler):
+                def job(output):
+                    compiler.output = output
+                    return compiler.run(**compiler_args)
+                return job
+
+            results = run_in_parallel({
+                "GU": compile_with_output(gu_compiler),
+                "SU": compile_with_output(su_compiler),
+            }, wait_until=self.wait_until)
+
+            # ==========================================
+            # STEP 2: GU Bids (Murley and any other registered generator units)
             # ==========================================
             self.log_status("")
             self.log_status("=" * 70)
-            self.log_status("STEP 2/3: MURLEY GU BIDS")
+            self.log_status("STEP 2/3: GU BIDS")
             self.log_status("=" * 70)
 
-            try:
-                gu_compiler = MurleyGUCompiler()
-                agg_gu, dam_gu, ets_gu, gu_upload_success = gu_compiler.run(
-                    bid_date=input_date,
-                    lag=lag,
-                    upload_sql=upload_sql,
-                    use_production=True  # ALWAYS use production table
-                )
-                self.log_status(f"[OK] GU bids compiled: {len(agg_gu)} periods")
+            gu_result, gu_error = results["GU"]
+            if gu_error is not None:
+                self.log_status(f"[ERROR] FAILED: {str(gu_error)}")
+            else:
+                agg_gu, dam_gu, ets_gu, gu_upload_success = gu_result
+                self.log_status(f"[OK] GU bids compiled: {len(agg_gu)} periods x {len(gu_compiler.units)} unit(s) "
+                                f"({', '.join(gu_compiler.units)})")
                 if upload_sql:
                     table_name = "Bids_Murley_D_Minus_1" if lag == "D-1" else "Bids_Murley_D_Minus_X"
                     if gu_upload_success:
-                        self.log_status(f"[OK] Uploaded to {table_name} (PRODUCTION)")
+                        self.log_status(f"[OK] Prepared upload for {table_name} (PRODUCTION, sent at the end of the run)")
                     else:
-                        self.log_status(f"[ERROR] FAILED to upload to {table_name}")
+                        self.log_status(f"[ERROR] FAILED to prepare upload for {table_name}")
                 else:
                     self.log_status("[SKIP] Files saved to I: drive (SQL upload disabled)")
-            except Exception as e:
-                self.log_status(f"[ERROR] FAILED: {str(e)}")
-                raise
 
             # ==========================================
             # STEP 3: Supply Unit Bids
@@ -641,26 +753,26 @@ class FESBidApp:
             self.log_status("STEP 3/3: SUPPLY UNIT BIDS")
             self.log_status("=" * 70)
 
-            try:
-                su_compiler = SupplyUnitCompiler()
-                agg_su, dam_su, ets_su, su_upload_success = su_compiler.run(
-                    bid_date=input_date,
-                    lag=lag,
-                    upload_sql=upload_sql,
-                    use_production=True  # ALWAYS use production table
-                )
+            su_result, su_error = results["SU"]
+            if su_error is not None:
+                self.log_status(f"[ERROR] FAILED: {str(su_error)}")
+            else:
+                agg_su, dam_su, ets_su, su_upload_success = su_result
                 self.log_status(f"[OK] SU bids compiled: {len(agg_su)} periods")
                 if upload_sql:
                     table_name = "Bids_SU_D_Minus_1" if lag == "D-1" else "Bids_SU_D_Minus_X"
                     if su_upload_success:
-                        self.log_status(f"[OK] Uploaded to {table_name} (PRODUCTION)")
+                        self.log_status(f"[OK] Prepared upload for {table_name} (PRODUCTION, sent at the end of the run)")
                     else:
-                        self.log_status(f"[ERROR] FAILED to upload to {table_name}")
+                        self.log_status(f"[ERROR] FAILED to prepare upload for {table_name}")
                 else:
                     self.log_status("[SKIP] Files saved to I: drive (SQL upload disabled)")
-            except Exception as e:
-                self.log_status(f"[ERROR] FAILED: {str(e)}")
-                raise
+
+            # A failed compiler fails the run (and its uploads are discarded)
+            if gu_error is not None:
+                raise gu_error
+            if su_error is not None:
+                raise su_error
 
             # ==========================================
             # STEP 4: PowerPoint Presentation (Optional)
@@ -688,7 +800,8 @@ class FESBidApp:
                         gu_chart_path if gu_chart_path.exists() else None,
                         su_chart_path if su_chart_path.exists() else None,
                         send_email=True,  # Always send email when PPT is generated
-                        force_friday_mode=friday_mode  # Pass Friday mode setting
+                        force_friday_mode=friday_mode,  # Pass Friday mode setting
+                        forecasts=forecasts  # Forecasts from step 1 (other lags read from I:)
                     )
                     
                     if ppt_path:
@@ -743,7 +856,9 @@ class FESBidApp:
                 self.log_status("[STEP 4/4] Creating IDA Excel with all sheets and charts...")
             
             # Run IDA-1 compilation (returns single Excel file)
-            ida_excel = compile_ida1_bids(input_date, upload_sql=upload_sql)
+            # D-1 forecast from this morning's run in this session, if any (else read from I:)
+            ida_excel = compile_ida1_bids(input_date, upload_sql=upload_sql,
+                                          d1_forecast_df=self.d1_forecasts.get(input_date))
             
             self.log_status("")
             self.log_status("File created:")
@@ -751,7 +866,7 @@ class FESBidApp:
             self.log_status("")
             if upload_sql:
                 self.log_status("SQL Upload:")
-                self.log_status(f"  OK Uploaded to dbo.ida1_bids and Generation_D_Minus_X")
+                self.log_status(f"  OK Prepared for dbo.ida1_bids and Generation_D_Minus_X (sent at the end of the run)")
                 self.log_status("")
             else:
                 self.log_status("SQL Upload: DISABLED (files saved to I: drive only)")
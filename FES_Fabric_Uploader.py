@@ -0,0 +1,1145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FES Fabric Uploader Module
+Shared access to the Fabric SQL warehouse for every upload path
+- One pooled SQLAlchemy engine per process (pre-ping, recycling, disposed at shutdown)
+- Entra ID token acquired once and reused for new connections (azure-identity, optional)
+- Background warm-up so the interactive login happens while the forecast downloads
+- Bulk insert through pyodbc fast_executemany with explicit SQL types per table
+- Optional idempotent uploads (FES_UPLOAD_MODE=merge): staging table + one MERGE keyed on (DateTime, Lag)
+- Existing tables are never altered by an append; missing columns are added with migrate_table
+- Durable outbox of Parquet batches uploaded by a background worker with retry/backoff,
+  permanent or exhausted failures moved to outbox/failed/
+- Run-level upload groups: all of a run's tables written in one transaction
+"""
+
+import atexit
+import json
+import os
+import re
+import struct
+import threading
+import time
+import urllib.parse
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, create_engine, event, inspect, text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.dialects import mssql
+
+# pyodbc is only needed for the explicit parameter types of the bulk insert
+try:
+    import pyodbc
+    PYODBC_AVAILABLE = True
+except ImportError:
+    PYODBC_AVAILABLE = False
+
+# The outbox stores batches as Parquet - without pyarrow uploads run inline as before
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    OUTBOX_AVAILABLE = True
+except ImportError:
+    OUTBOX_AVAILABLE = False
+
+# Token reuse needs azure-identity - without it the ODBC driver logs in interactively itself
+try:
+    from azure.identity import InteractiveBrowserCredential
+    TOKEN_AUTH_AVAILABLE = True
+except ImportError:
+    TOKEN_AUTH_AVAILABLE = False
+
+
+FABRIC_SERVER = "g3hsqkj33hsejptu6vliyt5gny-6novrz7kmrcuriuozi2uqi5sy4.datawarehouse.fabric.microsoft.com"
+FABRIC_DATABASE = "trading_data"
+FABRIC_DRIVER = "ODBC Driver 18 for SQL Server"
+
+# Pool settings - a D-1 run needs at most a couple of connections at once
+FABRIC_POOL_SIZE = 2
+FABRIC_MAX_OVERFLOW = 2
+# Recycle connections before the access token behind them expires
+FABRIC_POOL_RECYCLE_SECONDS = 45 * 60
+
+# Renew the access token when it has less than this left
+TOKEN_REFRESH_MARGIN_SECONDS = 5 * 60
+TOKEN_SCOPE = "https://database.windows.net/.default"
+SQL_COPT_SS_ACCESS_TOKEN = 1256  # msodbcsql connection attribute for an access token
+
+# Upload outbox (local folder next to the scripts unless FES_OUTBOX_DIR is set)
+OUTBOX_DIR = Path(os.environ.get("FES_OUTBOX_DIR", Path.cwd() / "outbox"))
+OUTBOX_METADATA_KEY = b"fes_upload"
+OUTBOX_BACKOFF_BASE_SECONDS = 5
+OUTBOX_BACKOFF_MAX_SECONDS = 15 * 60
+OUTBOX_EXIT_DRAIN_SECONDS = 30
+# Attempts before a group that keeps failing is moved to the dead-letter folder (~1.5h of backoff)
+OUTBOX_MAX_ATTEMPTS = 12
+OUTBOX_FAILED_FOLDER = "failed"
+# A group whose manifest never appeared (crash while it was being queued) is moved to the
+# dead-letter folder once it is this old; until then it is skipped without blocking later groups
+OUTBOX_INCOMPLETE_GROUP_MINUTES = 10
+
+# Engines already built in this process, keyed by (server, database)
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+# ==========================================
+# 1. ACCESS TOKEN
+# ==========================================
+class FabricToken:
+    """Entra ID access token for Fabric, fetched interactively once and reused until near expiry"""
+
+    def __init__(self):
+        self.credential = None
+        self.access_token = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return a valid token string, logging in only when needed"""
+        with self._lock:
+            now = datetime.now(timezone.utc).timestamp()
+            if self.access_token is None or self.access_token.expires_on - now < TOKEN_REFRESH_MARGIN_SECONDS:
+                if self.credential is None:
+                    self.credential = InteractiveBrowserCredential()
+                self.access_token = self.credential.get_token(TOKEN_SCOPE)
+                expires = datetime.fromtimestamp(self.access_token.expires_on).strftime('%H:%M')
+                print(f"[FABRIC] Access token acquired (valid until {expires})")
+            return self.access_token.token
+
+    def odbc_struct(self):
+        """Token packed the way the ODBC driver expects it (length-prefixed UTF-16-LE)"""
+        token_bytes = self.get().encode("UTF-16-LE")
+        return struct.pack(f"<I{len(token_bytes)}s", len(token_bytes), token_bytes)
+
+
+_token = FabricToken()
+
+
+# ==========================================
+# 2. ENGINE PROVIDER
+# ==========================================
+def fabric_connection_string(server=FABRIC_SERVER, database=FABRIC_DATABASE, use_token=False):
+    """ODBC connection string for the Fabric warehouse"""
+    conn_str = (
+        f"Driver={{{FABRIC_DRIVER}}};"
+        f"Server={server};"
+        f"Database={database};"
+    )
+    if not use_token:
+        conn_str += "Authentication=ActiveDirectoryInteractive;"
+    conn_str += "Encrypt=yes;TrustServerCertificate=no;Connection Timeout=60;"
+    return conn_str
+
+
+def get_fabric_engine(server=FABRIC_SERVER, database=FABRIC_DATABASE):
+    """
+    Return the process-wide pooled engine for a Fabric warehouse.
+
+    Connections are checked with a ping before use and recycled before their
+    token expires. With azure-identity installed, every new connection reuses
+    one cached access token; otherwise the driver's interactive login is used.
+
+    Args:
+        server: Fabric SQL endpoint
+        database: Database name
+
+    Returns:
+        sqlalchemy.engine.Engine
+    """
+    key = (server, database)
+    with _engines_lock:
+        if key in _engines:
+            return _engines[key]
+
+        use_token = TOKEN_AUTH_AVAILABLE
+        params = urllib.parse.quote_plus(fabric_connection_string(server, database, use_token))
+        engine = create_engine(
+            f"mssql+pyodbc:///?odbc_connect={params}",
+            pool_size=FABRIC_POOL_SIZE,
+            max_overflow=FABRIC_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=FABRIC_POOL_RECYCLE_SECONDS,
+            fast_executemany=True,
+        )
+
+        if use_token:
+            @event.listens_for(engine, "do_connect")
+            def _inject_token(dialect, conn_rec, cargs, cparams):
+                cparams["attrs_before"] = {SQL_COPT_SS_ACCESS_TOKEN: _token.odbc_struct()}
+
+        _engines[key] = engine
+        return engine
+
+
+def warm_up_fabric_engine(server=FABRIC_SERVER, database=FABRIC_DATABASE, log=print):
+    """
+    Open one pooled connection in a background thread, so the login and TLS
+    handshake are done by the time the first upload runs.
+
+    Args:
+        log: Function used to report the result (e.g. the GUI's log_status)
+
+    Returns:
+        The started threading.Thread
+    """
+    def _warm_up():
+        try:
+            with get_fabric_engine(server, database).connect() as conn:
+                conn.execute(text("SELECT 1"))
+            log("[FABRIC] Connection ready")
+        except Exception as e:
+            log(f"[FABRIC] Warm-up failed (uploads will retry): {e}")
+
+    thread = threading.Thread(target=_warm_up, name="fabric-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@atexit.register
+def dispose_fabric_engines():
+    """Close every pooled connection (runs automatically at shutdown)"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+# ==========================================
+# 3. BULK INSERT / MERGE
+# ==========================================
+# Column types: every timestamp is DATETIME2 (the warehouse has no DATETIME), every MW value FLOAT
+SQL_DATETIME = "datetime"
+SQL_FLOAT = "float"
+SQL_TEXT = "text"
+
+TIMESTAMP_COLUMNS = ["DateTime", "Upload_Timestamp"]
+LAG_COLUMN = "Lag"
+LAG_LENGTH = 8
+
+GENERATION_VALUE_COLUMNS = (
+    ["Meteo ROI _MW_", "Meteo NI _MW_", "Meteo TB _MW_", "Meteo CK _MW_", "Meteo LD _MW_", "Meteo CD _MW_",
+     "Naïve Nonwind _MW_", "Self-forecast _MW_", "Meteo DT _MW_", "Meteo MUR _MW_"]
+    + [f"Meteo S{i} _MW_" for i in range(1, 26)]
+)
+GU_VALUE_COLUMNS = ["GU_504260"]
+SU_VALUE_COLUMNS = (
+    ["Adj. QH _MW_", "Adj. NQH _MW_", "Unmetered _MW_", "Adj. ROI Wind _MW_", "Adj. NI Wind _MW_",
+     "Adj. Tullabrack _MW_", "Adj. Cloghaneleskirt _MW_", "Adj. Lisdowney _MW_", "Adj. Curraghderrig _MW_",
+     "Adj. Nonwind _MW_", "Self-forecast _MW_", "Adj. Davidstown _MW_", "Trading Qty _MW_", "SU_400130"]
+    + [f"S{i}" for i in range(1, 26)]
+)
+IDA1_VALUE_COLUMNS = (
+    ["IDA1_Bid_MW", "Meteo ROI (MW)", "Meteo NI (MW)", "Meteo TB (MW)", "Meteo CK (MW)", "Meteo LD (MW)",
+     "Meteo CD (MW)", "Naïve Nonwind (MW)", "Self-forecast (MW)", "Meteo DT (MW)", "Meteo MUR (MW)",
+     "Meteo S1 (MW)", "Meteo S2 (MW)"]
+)
+
+
+def _table_types(value_columns):
+    types = {col: SQL_DATETIME for col in TIMESTAMP_COLUMNS}
+    types[LAG_COLUMN] = SQL_TEXT
+    types.update({col: SQL_FLOAT for col in value_columns})
+    return types
+
+
+TABLE_SQL_TYPES = {
+    "Generation_D_Minus_1": _table_types(GENERATION_VALUE_COLUMNS),
+    "Generation_D_Minus_X": _table_types(GENERATION_VALUE_COLUMNS),
+    "Bids_Murley_D_Minus_1": _table_types(GU_VALUE_COLUMNS),
+    "Bids_Murley_D_Minus_X": _table_types(GU_VALUE_COLUMNS),
+    "test_Bids_Murley": _table_types(GU_VALUE_COLUMNS),
+    "Bids_SU_D_Minus_1": _table_types(SU_VALUE_COLUMNS),
+    "Bids_SU_D_Minus_X": _table_types(SU_VALUE_COLUMNS),
+    "test_Bids_SU": _table_types(SU_VALUE_COLUMNS),
+    "ida1_bids": _table_types(IDA1_VALUE_COLUMNS),
+}
+
+# Numbered site and unit columns: one per registered site (or generator unit), so any
+# number is accepted (columns an existing table lacks are added once with migrate_table)
+GENERATION_SITE_COLUMN = re.compile(r"Meteo S\d+ _MW_")
+SU_SITE_COLUMN = re.compile(r"S\d+")
+GU_UNIT_COLUMN = re.compile(r"GU_\d+")
+TABLE_SITE_COLUMNS = {
+    "Bids_Murley_D_Minus_1": GU_UNIT_COLUMN,
+    "Bids_Murley_D_Minus_X": GU_UNIT_COLUMN,
+    "test_Bids_Murley": GU_UNIT_COLUMN,
+    "Generation_D_Minus_1": GENERATION_SITE_COLUMN,
+    "Generation_D_Minus_X": GENERATION_SITE_COLUMN,
+    "Bids_SU_D_Minus_1": SU_SITE_COLUMN,
+    "Bids_SU_D_Minus_X": SU_SITE_COLUMN,
+    "test_Bids_SU": SU_SITE_COLUMN,
+}
+
+# Upload mode: "append" adds the rows of a rerun again (the production behaviour), "merge"
+# replaces them (same DateTime and lag). Merge is opt-in until it is verified on the warehouse
+UPLOAD_MODES = ("append", "merge")
+UPLOAD_MODE = os.environ.get("FES_UPLOAD_MODE", "append")
+MERGE_KEY = ["DateTime", LAG_COLUMN]
+
+# Rows sent per executemany call
+BULK_INSERT_CHUNK_ROWS = 5000
+
+# Tables already checked against their column types, per engine URL (saves catalogue queries):
+# (url, table, column types, add_missing) -> columns to send
+_known_tables = {}
+
+
+def sql_types_for(table_name, df):
+    """
+    SQL type of every column of an upload frame.
+
+    Known tables use TABLE_SQL_TYPES (numbered site/unit columns beyond those are FLOAT,
+    see TABLE_SITE_COLUMNS). Other tables (e.g. new test tables) fall
+    back to DATETIME2 for datetime columns, VARCHAR for Lag and FLOAT for everything else.
+
+    Raises:
+        ValueError: The frame has a column the table does not define
+    """
+    known = TABLE_SQL_TYPES.get(table_name)
+    if known is None:
+        return {col: SQL_DATETIME if pd.api.types.is_datetime64_any_dtype(df[col])
+                else SQL_TEXT if col == LAG_COLUMN else SQL_FLOAT
+                for col in df.columns}
+
+    site_column = TABLE_SITE_COLUMNS.get(table_name)
+    unknown = [col for col in df.columns
+               if col not in known and not (site_column and site_column.fullmatch(col))]
+    if unknown:
+        raise ValueError(f"Columns not defined for {table_name}: {unknown}")
+    return {col: known.get(col, SQL_FLOAT) for col in df.columns}
+
+
+def _sqlalchemy_type(sql_type):
+    if sql_type == SQL_DATETIME:
+        return DateTime().with_variant(mssql.DATETIME2(precision=6), "mssql")
+    if sql_type == SQL_TEXT:
+        return String(LAG_LENGTH)
+    return Float(precision=53)
+
+
+def _input_sizes(types):
+    """pyodbc parameter types, so fast_executemany never guesses from the first row (e.g. all-None S columns)"""
+    sizes = {SQL_DATETIME: (pyodbc.SQL_TYPE_TIMESTAMP, 26, 6), SQL_FLOAT: (pyodbc.SQL_DOUBLE, 0, 0),
+             SQL_TEXT: (pyodbc.SQL_VARCHAR, LAG_LENGTH, 0)}
+    return [sizes[t] for t in types]
+
+
+def _column_values(series, sql_type):
+    """Column as a list of plain Python values, with NaN/NaT as None"""
+    if sql_type == SQL_DATETIME:
+        values = pd.Series(pd.to_datetime(series).dt.to_pydatetime(), index=series.index, dtype=object)
+    elif sql_type == SQL_TEXT:
+        values = series.astype(object)
+    else:
+        values = pd.to_numeric(series, errors="coerce").astype(float).astype(object)
+    return values.where(series.notna() & values.notna(), None).tolist()
+
+
+def ensure_table(engine, table_name, types, add_missing=False):
+    """
+    Create the table with the given column types if it does not exist yet, and
+    check an existing table has every column of the upload.
+
+    An existing table is only altered when add_missing is set (merge mode, whose
+    key needs Lag, or migrate_table). Otherwise a table created before the Lag
+    column existed takes the rows without it, and any other missing column stops
+    the upload before anything is written.
+
+    Returns:
+        list: Columns of types to send
+
+    Raises:
+        ValueError: The table lacks columns of the upload and add_missing is not set
+    """
+    key = (str(engine.url), table_name, tuple(types), add_missing)
+    if key in _known_tables:
+        return _known_tables[key]
+    columns = list(types)
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        _table(table_name, types).create(engine)
+        print(f"[FABRIC] Created table {table_name}")
+    else:
+        existing = {col['name'] for col in inspector.get_columns(table_name)}
+        missing = [col for col in types if col not in existing]
+        if missing and add_missing:
+            preparer = engine.dialect.identifier_preparer
+            with engine.begin() as conn:
+                for col in missing:
+                    col_type = _sqlalchemy_type(types[col]).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {preparer.quote(table_name)} "
+                                      f"ADD {preparer.quote(col)} {col_type} NULL"))
+            print(f"[FABRIC] Added column(s) {missing} to {table_name}")
+        elif missing:
+            if LAG_COLUMN in missing:
+                missing.remove(LAG_COLUMN)
+                columns.remove(LAG_COLUMN)
+                print(f"[FABRIC] [INFO] {table_name} has no {LAG_COLUMN} column - appending without it")
+            if missing:
+                raise ValueError(f"Table {table_name} has no column(s) {missing} - add them once with "
+                                 f"migrate_table('{table_name}', ...) before uploading")
+    _known_tables[key] = columns
+    return columns
+
+
+def _forget_table(engine, table_name):
+    """Drop every cached column check of a table, so the next upload looks at it again"""
+    for key in [key for key in _known_tables if key[:2] == (str(engine.url), table_name)]:
+        del _known_tables[key]
+
+
+def migrate_table(table_name, columns=None, engine=None):
+    """
+    One-off migration: add the columns an existing table lacks as NULLable.
+
+    Args:
+        table_name: Table to migrate
+        columns: Columns to make sure of (default: every column defined in TABLE_SQL_TYPES);
+                 numbered site/unit columns beyond those can be listed here
+        engine: SQLAlchemy engine (defaults to the shared Fabric engine)
+    """
+    engine = engine or get_fabric_engine()
+    known = TABLE_SQL_TYPES.get(table_name, {})
+    columns = columns or list(known)
+    types = {col: known.get(col, SQL_TEXT if col == LAG_COLUMN else SQL_FLOAT) for col in columns}
+    _forget_table(engine, table_name)
+    ensure_table(engine, table_name, types, add_missing=True)
+
+
+def _prepare_upload(engine, table_name, df, mode):
+    """Check the frame against the table; returns the frame to send and its column types"""
+    types = sql_types_for(table_name, df)
+    columns = ensure_table(engine, table_name, types, add_missing=mode == "merge")
+    return df[columns], {col: types[col] for col in columns}
+
+
+def _table(table_name, types):
+    return Table(table_name, MetaData(), *[Column(col, _sqlalchemy_type(t)) for col, t in types.items()])
+
+
+def _insert_rows(cursor, dialect, table_name, df, types, chunk_rows=BULK_INSERT_CHUNK_ROWS):
+    """Run the parameterised INSERT for a frame on an open DBAPI cursor (no commit)"""
+    preparer = dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(col) for col in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    sql = f"INSERT INTO {preparer.quote(table_name)} ({columns}) VALUES ({placeholders})"
+
+    rows = list(zip(*[_column_values(df[col], types[col]) for col in df.columns]))
+    if hasattr(cursor, "fast_executemany"):
+        cursor.fast_executemany = True
+        if PYODBC_AVAILABLE:
+            cursor.setinputsizes(_input_sizes(types[col] for col in df.columns))
+    for start in range(0, len(rows), chunk_rows):
+        cursor.executemany(sql, rows[start:start + chunk_rows])
+    return len(rows)
+
+
+def _merge_rows(cursor, dialect, table_name, df, types, key=MERGE_KEY):
+    """
+    Upsert a frame on an open DBAPI cursor (no commit): bulk-load it into a
+    staging table, then apply it to the target with one set-based statement.
+
+    On SQL Server / Fabric this is a MERGE keyed on `key`. Other dialects (the
+    local stand-in) get the equivalent DELETE of matching keys + INSERT.
+    """
+    missing_key = [col for col in key if col not in df.columns]
+    if missing_key:
+        raise ValueError(f"Merge into {table_name} needs key column(s) {missing_key}")
+
+    # MERGE rejects a source with duplicate keys - the last row for a key wins
+    df = df.drop_duplicates(subset=key, keep="last")
+
+    preparer = dialect.identifier_preparer
+    target = preparer.quote(table_name)
+    staging_name = f"{table_name}_stage_{uuid.uuid4().hex[:8]}"
+    staging = preparer.quote(staging_name)
+    columns = [preparer.quote(col) for col in df.columns]
+    values = [preparer.quote(col) for col in df.columns if col not in key]
+
+    # The staging table lives inside the caller's transaction, so a rollback removes it as well
+    cursor.execute(str(CreateTable(_table(staging_name, types)).compile(dialect=dialect)))
+    _insert_rows(cursor, dialect, staging_name, df, types)
+    if dialect.name == "mssql":
+        on = " AND ".join(f"t.{preparer.quote(col)} = s.{preparer.quote(col)}" for col in key)
+        cursor.execute(
+            f"MERGE INTO {target} AS t USING {staging} AS s ON {on} "
+            f"WHEN MATCHED THEN UPDATE SET {', '.join(f't.{c} = s.{c}' for c in values)} "
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f's.{c}' for c in columns)});"
+        )
+    else:
+        matches = " AND ".join(f"{target}.{preparer.quote(col)} = s.{preparer.quote(col)}" for col in key)
+        cursor.execute(f"DELETE FROM {target} WHERE EXISTS (SELECT 1 FROM {staging} AS s WHERE {matches})")
+        cursor.execute(f"INSERT INTO {target} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging}")
+    cursor.execute(f"DROP TABLE {staging}")
+    return len(df)
+
+
+def _run_on_connection(engine, work):
+    """Run work(cursor) on a pooled DBAPI connection and commit (roll back on error)"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        result = work(cursor)
+        raw.commit()
+        cursor.close()
+        return result
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def bulk_insert(df, table_name, engine=None, chunk_rows=BULK_INSERT_CHUNK_ROWS):
+    """
+    Append a DataFrame to a table with one parameterised INSERT run through
+    executemany. On pyodbc the cursor uses fast_executemany (rows are sent as
+    parameter arrays) with explicit parameter types; other drivers, such as the
+    sqlite stand-in used for benchmarks, run a plain executemany.
+
+    Unlike to_sql(method='multi') the statement size does not grow with the
+    row count, so wide tables stay under SQL Server's 2100 parameter limit.
+
+    Args:
+        df: Upload frame (column names as in the table)
+        table_name: Target table
+        engine: SQLAlchemy engine (defaults to the shared Fabric engine)
+        chunk_rows: Rows per executemany call
+
+    Returns:
+        int: Number of rows inserted
+    """
+    engine = engine or get_fabric_engine()
+    df, types = _prepare_upload(engine, table_name, df, "append")
+    if df.empty:
+        return 0
+    return _run_on_connection(
+        engine, lambda cursor: _insert_rows(cursor, engine.dialect, table_name, df, types, chunk_rows))
+
+
+def merge_upsert(df, table_name, engine=None, key=MERGE_KEY):
+    """
+    Upsert a DataFrame: rows whose (DateTime, Lag) already exist are updated,
+    new ones are inserted, so rerunning a trading day and lag does not add
+    duplicates. Staging load, MERGE and cleanup run in one transaction.
+
+    Rows appended before the Lag column existed have Lag NULL and are left as they are.
+
+    Args:
+        df: Upload frame including the DateTime and Lag columns
+        table_name: Target table
+        engine: SQLAlchemy engine (defaults to the shared Fabric engine)
+        key: Columns identifying a row
+
+    Returns:
+        int: Number of rows merged
+    """
+    engine = engine or get_fabric_engine()
+    df, types = _prepare_upload(engine, table_name, df, "merge")
+    if df.empty:
+        return 0
+    return _run_on_connection(
+        engine, lambda cursor: _merge_rows(cursor, engine.dialect, table_name, df, types, key))
+
+
+def upload_frame(df, table_name, engine=None, mode=None):
+    """
+    Upload a frame with the given mode ("append" or "merge", default UPLOAD_MODE).
+
+    Returns:
+        int: Number of rows written
+    """
+    mode = mode or UPLOAD_MODE
+    if mode not in UPLOAD_MODES:
+        raise ValueError(f"Unknown upload mode '{mode}' (expected one of {UPLOAD_MODES})")
+    if mode == "merge":
+        return merge_upsert(df, table_name, engine)
+    return bulk_insert(df, table_name, engine)
+
+
+def write_upload_group(frames, engine=None):
+    """
+    Write several tables in one connection and one transaction - either every
+    table is updated or none is.
+
+    Args:
+        frames: List of (table_name, DataFrame, mode) tuples
+        engine: SQLAlchemy engine (defaults to the shared Fabric engine)
+
+    Returns:
+        List of {'table', 'mode', 'rows', 'seconds'} dicts, one per frame
+    """
+    engine = engine or get_fabric_engine()
+    prepared = []
+    for table_name, df, mode in frames:
+        mode = mode or UPLOAD_MODE
+        if mode not in UPLOAD_MODES:
+            raise ValueError(f"Unknown upload mode '{mode}' (expected one of {UPLOAD_MODES})")
+        df, types = _prepare_upload(engine, table_name, df, mode)
+        prepared.append((table_name, df, mode, types))
+
+    def _write_all(cursor):
+        stats = []
+        for table_name, df, mode, types in prepared:
+            start = time.perf_counter()
+            if df.empty:
+                rows = 0
+            elif mode == "merge":
+                rows = _merge_rows(cursor, engine.dialect, table_name, df, types)
+            else:
+                rows = _insert_rows(cursor, engine.dialect, table_name, df, types)
+            stats.append({'table': table_name, 'mode': mode, 'rows': rows,
+                          'seconds': round(time.perf_counter() - start, 3)})
+        return stats
+
+    return _run_on_connection(engine, _write_all)
+
+
+def format_upload_summary(stats, seconds, run_id=None):
+    """One block of text summarising an upload: rows and time per table, then totals"""
+    title = f"UPLOAD SUMMARY (run {run_id})" if run_id else "UPLOAD SUMMARY"
+    lines = [title]
+    for stat in stats:
+        lines.append(f"  {stat['table']:<24} {stat['rows']:>6} rows  {stat['mode']:<6} {stat['seconds']:>7.2f}s")
+    lines.append(f"  {'Total':<24} {sum(s['rows'] for s in stats):>6} rows  "
+                 f"{len(stats)} table(s) in one transaction, {seconds:.2f}s")
+    return "\n".join(lines)
+
+
+# ==========================================
+# 4. UPLOAD OUTBOX
+# ==========================================
+def new_upload_run(label="run"):
+    """
+    Start a new upload run id (e.g. once per GUI execution).
+    Every batch queued afterwards is tagged with it.
+    """
+    global _run_id
+    _run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{label}"
+    return _run_id
+
+
+def current_upload_run():
+    """Run id batches are currently tagged with"""
+    return _run_id
+
+
+_run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+
+class UploadOutbox:
+    """
+    Durable queue of pending Fabric uploads.
+
+    submit() writes the upload frames as Parquet batches in OUTBOX_DIR, tagged
+    with the target table, run id, server, database and upload group, then
+    renames the group's manifest into place, and returns at once. Only a group
+    with its manifest and every batch it lists is uploaded; one left without a
+    manifest by a crash is skipped, and dead-lettered once it is
+    OUTBOX_INCOMPLETE_GROUP_MINUTES old. A background worker uploads the groups oldest first, each
+    group in one transaction, and deletes its batches once they are in the
+    warehouse. A group that fails with a transient error (connection, login,
+    timeout) stays on disk and is retried with exponential backoff; later groups
+    touching the same tables wait behind it so rows still arrive in the order
+    they were produced. A group that fails with a permanent error (unknown
+    column, type mismatch, ...) or is still failing after OUTBOX_MAX_ATTEMPTS is
+    moved whole to the failed/ folder with its run id and the error recorded, and
+    the queue moves on. A group is never split: a run reaches the warehouse
+    completely or not at all.
+    Batches left over from an earlier session are picked up when the worker starts.
+    """
+
+    def __init__(self, folder=None):
+        self.folder = Path(folder) if folder else OUTBOX_DIR
+        self.failed_folder = self.folder / OUTBOX_FAILED_FOLDER
+        self.attempts = {}      # group id -> failed attempts so far
+        self.retry_at = {}      # group id -> monotonic time of the next attempt
+        self.last_error = {}    # group id -> last error message
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread (no-op if it is already running)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="fabric-outbox", daemon=True)
+                self._thread.start()
+                pending = len(self.pending())
+                if pending:
+                    print(f"[OUTBOX] Replaying {pending} pending upload batch(es)")
+        return self
+
+    def submit(self, frames, run_id=None, server=FABRIC_SERVER, database=FABRIC_DATABASE):
+        """
+        Queue one upload group: frames that are written together in one transaction.
+
+        Args:
+            frames: List of (table_name, DataFrame, mode) tuples (mode None = UPLOAD_MODE)
+
+        Returns:
+            List of batch file paths
+        """
+        run_id = run_id or current_upload_run()
+        created = datetime.now()
+        group = f"{created:%Y%m%d%H%M%S%f}__{run_id}"
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        # Write every batch first and rename the manifest into place last: the group
+        # only exists for the worker once its manifest does
+        tmp_files = []
+        for index, (table_name, df, mode) in enumerate(frames):
+            metadata = {
+                'table': table_name, 'run_id': run_id, 'server': server, 'database': database,
+                'mode': mode or UPLOAD_MODE, 'rows': len(df), 'queued': created.isoformat(timespec='seconds'),
+                'group': group, 'group_size': len(frames), 'manifest': True,
+            }
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   OUTBOX_METADATA_KEY: json.dumps(metadata).encode()})
+            batch_file = self.folder / f"{created:%Y%m%d%H%M%S%f}-{index:02d}__{run_id}__{table_name}.parquet"
+            tmp_file = batch_file.with_suffix(".tmp")
+            pq.write_table(table, tmp_file)
+            tmp_files.append((tmp_file, batch_file))
+
+        for tmp_file, batch_file in tmp_files:
+            os.replace(tmp_file, batch_file)
+
+        manifest = {'group': group, 'run_id': run_id, 'queued': created.isoformat(timespec='seconds'),
+                    'files': [batch_file.name for _, batch_file in tmp_files]}
+        manifest_file = self._manifest_file(group)
+        tmp_manifest = manifest_file.with_suffix(".tmp")
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_manifest, manifest_file)
+
+        self._idle.clear()
+        self._wake.set()
+        return [batch_file for _, batch_file in tmp_files]
+
+    def pending(self):
+        """Batch files still waiting for upload, oldest first"""
+        if not self.folder.exists():
+            return []
+        return sorted(self.folder.glob("*.parquet"))
+
+    def _manifest_file(self, group, folder=None):
+        return (folder or self.folder) / f"{group}.manifest.json"
+
+    def _group_complete(self, group, batches):
+        """True once the group's manifest is in place and every batch it lists is on disk"""
+        if not batches[0][1].get('manifest'):
+            # Queued before manifests existed: batches were published together
+            return len(batches) >= batches[0][1].get('group_size', 1)
+        try:
+            with open(self._manifest_file(group), encoding="utf-8") as f:
+                files = json.load(f)['files']
+        except (OSError, ValueError, KeyError):
+            return False
+        return set(files) <= {batch_file.name for batch_file, _ in batches}
+
+    def pending_groups(self):
+        """
+        Pending upload groups, oldest first.
+
+        Returns:
+            List of (group id, [(batch file, metadata), ...], complete) tuples
+        """
+        groups = {}
+        for batch_file in self.pending():
+            try:
+                _, metadata = read_outbox_batch(batch_file, frame=False)
+            except Exception as e:
+                print(f"[OUTBOX] [WARNING] Skipping unreadable batch {batch_file.name}: {e}")
+                continue
+            # Batches queued before upload groups existed form a group of their own
+            group = metadata.get('group', batch_file.name)
+            groups.setdefault(group, []).append((batch_file, metadata))
+        return [(group, batches, self._group_complete(group, batches)) for group, batches in groups.items()]
+
+    def status(self):
+        """One row per pending batch: table, run id, rows, attempts, last error"""
+        rows = []
+        for group, batches, _ in self.pending_groups():
+            for batch_file, metadata in batches:
+                rows.append({**metadata, 'file': batch_file.name,
+                             'attempts': self.attempts.get(group, 0),
+                             'error': self.last_error.get(group)})
+        return rows
+
+    def failed(self):
+        """Dead-lettered batch files, oldest first (see failed/<group>.error.json for the reason)"""
+        if not self.failed_folder.exists():
+            return []
+        return sorted(self.failed_folder.glob("*.parquet"))
+
+    def retry_failed(self):
+        """
+        Move every dead-lettered batch back into the queue (e.g. once the table has been fixed).
+
+        Returns:
+            int: Number of batches requeued
+        """
+        batches = self.failed()
+        for batch_file in batches:
+            os.replace(batch_file, self.folder / batch_file.name)
+        for manifest_file in self.failed_folder.glob("*.manifest.json"):
+            os.replace(manifest_file, self.folder / manifest_file.name)
+        for error_file in self.failed_folder.glob("*.error.json"):
+            error_file.unlink()
+        if batches:
+            self._idle.clear()
+            self._wake.set()
+        return len(batches)
+
+    def _dead_letter(self, group, batches, error, attempts):
+        """Move a whole group's batches to failed/ with the error next to them"""
+        self.failed_folder.mkdir(parents=True, exist_ok=True)
+        record = {
+            'group': group, 'run_id': batches[0][1].get('run_id'), 'error': f"{type(error).__name__}: {error}", 'attempts': attempts,
+            'failed': datetime.now().isoformat(timespec='seconds'),
+            'batches': [{**metadata, 'file': batch_file.name} for batch_file, metadata in batches],
+        }
+        error_file = self.failed_folder / f"{group}.error.json"
+        tmp_file = error_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_file, error_file)
+        for batch_file, _ in batches:
+            os.replace(batch_file, self.failed_folder / batch_file.name)
+        if self._manifest_file(group).exists():
+            os.replace(self._manifest_file(group), self._manifest_file(group, self.failed_folder))
+        for state in (self.attempts, self.retry_at, self.last_error):
+            state.pop(group, None)
+
+    def drain(self, timeout=None):
+        """
+        Wait until every batch has been uploaded.
+
+        Returns:
+            bool: True if the outbox is empty, False if the timeout ran out first
+        """
+        if not self.pending():
+            return True
+        self.start()
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def _deliver(self, batches):
+        metadata = batches[0][1]
+        frames = [(meta['table'], read_outbox_batch(batch_file)[0], meta.get('mode', 'append'))
+                  for batch_file, meta in batches]
+        start = time.perf_counter()
+        stats = write_upload_group(frames, get_fabric_engine(metadata['server'], metadata['database']))
+        return metadata['run_id'], stats, time.perf_counter() - start
+
+    def _worker(self):
+        while True:
+            self._wake.clear()
+            blocked_tables = set()
+            next_retry = None
+            now = time.monotonic()
+
+            for group, batches, complete in self.pending_groups():
+                tables = {metadata['table'] for _, metadata in batches}
+                if not complete:
+                    # Never fully queued (no manifest): it does not hold back later groups
+                    stale_at = (datetime.fromisoformat(batches[0][1]['queued'])
+                                + timedelta(minutes=OUTBOX_INCOMPLETE_GROUP_MINUTES))
+                    wait = (stale_at - datetime.now()).total_seconds()
+                    if wait > 0:
+                        next_retry = now + wait if next_retry is None else min(next_retry, now + wait)
+                        continue
+                    try:
+                        self._dead_letter(group, batches, RuntimeError("upload group was never fully queued "
+                                                                       "(no manifest)"), 0)
+                        print(f"[OUTBOX] [DEAD] Incomplete group of run {batches[0][1].get('run_id')} "
+                              f"({', '.join(sorted(tables))}) moved to {self.failed_folder}")
+                    except OSError as move_error:
+                        print(f"[OUTBOX] [WARNING] Could not move incomplete batches aside: {move_error}")
+                    continue
+                if tables & blocked_tables:
+                    blocked_tables |= tables
+                    continue
+                retry_at = self.retry_at.get(group, 0)
+                if retry_at > now:
+                    blocked_tables |= tables
+                    next_retry = retry_at if next_retry is None else min(next_retry, retry_at)
+                    continue
+
+                try:
+                    run_id, stats, seconds = self._deliver(batches)
+                    for batch_file, _ in batches:
+                        batch_file.unlink()
+                    self._manifest_file(group).unlink(missing_ok=True)
+                    for state in (self.attempts, self.retry_at, self.last_error):
+                        state.pop(group, None)
+                    print(f"[OUTBOX] [OK] {format_upload_summary(stats, seconds, run_id)}")
+                except Exception as e:
+                    attempts = self.attempts.get(group, 0) + 1
+                    transient = is_transient_upload_error(e)
+                    if not transient or attempts >= OUTBOX_MAX_ATTEMPTS:
+                        reason = f"{attempts} attempts" if transient else "a permanent error"
+                        try:
+                            self._dead_letter(group, batches, e, attempts)
+                        except OSError as move_error:
+                            print(f"[OUTBOX] [WARNING] Could not move failed batches aside: {move_error}")
+                            blocked_tables |= tables
+                            continue
+                        print(f"[OUTBOX] [DEAD] Run {batches[0][1].get('run_id')} ({', '.join(sorted(tables))}) "
+                              f"moved to {self.failed_folder} after {reason} - nothing of it was written: {e}")
+                        continue
+                    delay = min(OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+                    self.attempts[group] = attempts
+                    self.retry_at[group] = time.monotonic() + delay
+                    self.last_error[group] = str(e)
+                    blocked_tables |= tables
+                    next_retry = self.retry_at[group] if next_retry is None else min(next_retry, self.retry_at[group])
+                    print(f"[OUTBOX] [FAIL] Upload of {', '.join(sorted(tables))} (attempt {attempts}), "
+                          f"retrying in {delay:.0f}s: {e}")
+
+            if not self.pending():
+                self._idle.set()
+            self._wake.wait(None if next_retry is None else max(0.0, next_retry - time.monotonic()))
+
+
+# Errors worth retrying: the warehouse, network or login was unavailable, not the data
+TRANSIENT_UPLOAD_ERRORS = (sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.TimeoutError,
+                           sa_exc.DisconnectionError, ConnectionError, TimeoutError, ImportError)
+if PYODBC_AVAILABLE:
+    TRANSIENT_UPLOAD_ERRORS += (pyodbc.OperationalError, pyodbc.InterfaceError)
+
+
+def is_transient_upload_error(error):
+    """
+    True if an upload failed for a reason that may go away on its own (connection,
+    timeout, login, missing driver); False for errors in the data or table
+    definition (unknown column, type mismatch, constraint), which retrying cannot fix.
+    """
+    if isinstance(error, TRANSIENT_UPLOAD_ERRORS):
+        return True
+    # Entra ID login failures (azure.identity / azure.core) clear up once the user signs in
+    return type(error).__module__.startswith("azure.")
+
+
+def read_outbox_batch(batch_file, frame=True):
+    """
+    Read a queued batch.
+
+    Returns:
+        (DataFrame or None, metadata dict with table, run_id, server, database, mode, rows, queued, group)
+    """
+    schema = pq.read_schema(batch_file)
+    metadata = json.loads(schema.metadata[OUTBOX_METADATA_KEY])
+    return (pq.read_table(batch_file).to_pandas() if frame else None), metadata
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_upload_outbox():
+    """Return the process-wide outbox, with its worker running"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = UploadOutbox()
+    return _outbox.start()
+
+
+def _send_group(frames, run_id, server, database):
+    """Queue a group to the outbox, or write it straight away when there is no outbox"""
+    if OUTBOX_AVAILABLE:
+        get_upload_outbox().submit(frames, run_id, server, database)
+        return "Queued"
+    start = time.perf_counter()
+    stats = write_upload_group(frames, get_fabric_engine(server, database))
+    print(f"[OK] {format_upload_summary(stats, time.perf_counter() - start, run_id)}")
+    return "Uploaded"
+
+
+def queue_upload(df, table_name, server=FABRIC_SERVER, database=FABRIC_DATABASE, run_id=None, mode=None):
+    """
+    Hand an upload frame to the background outbox. Inside collect_uploads()
+    the frame is held back and sent with the rest of the run instead. Without
+    pyarrow there is no outbox, and the frame is uploaded straight away as before.
+
+    Returns:
+        bool: True if the frame was collected, queued or uploaded, False if that failed
+    """
+    collector = _collector
+    if collector is not None and (collector.server, collector.database) == (server, database):
+        collector.add(df, table_name, mode)
+        print(f"[OUTBOX] Collected {len(df)} rows for {table_name} (sent with the rest of run {collector.run_id})")
+        return True
+    try:
+        action = _send_group([(table_name, df, mode)], run_id, server, database)
+        print(f"[OUTBOX] {action} {len(df)} rows for {table_name}")
+        return True
+    except Exception as e:
+        print(f"[FAIL] Upload of {table_name} failed: {e}")
+        return False
+
+
+class UploadCollector:
+    """
+    Upload frames of one run, held back so they are written together at the
+    end in one connection and one transaction (see collect_uploads).
+    """
+
+    def __init__(self, run_id=None, server=FABRIC_SERVER, database=FABRIC_DATABASE):
+        self.run_id = run_id or current_upload_run()
+        self.server = server
+        self.database = database
+        self.frames = []    # (table_name, DataFrame, mode)
+        self.sent = None    # True/False once send() has run
+        self._lock = threading.Lock()
+
+    def add(self, df, table_name, mode=None):
+        with self._lock:
+            self.frames.append((table_name, df, mode))
+
+    def summary(self):
+        """Short description of what the run will upload"""
+        rows = sum(len(df) for _, df, _ in self.frames)
+        tables = ", ".join(table_name for table_name, _, _ in self.frames)
+        return f"{len(self.frames)} table(s), {rows} rows ({tables})"
+
+    def send(self):
+        """
+        Send every collected frame as one upload group (all-or-nothing).
+
+        Returns:
+            bool: True if the group was queued or uploaded, False if that failed
+        """
+        if not self.frames:
+            return True
+        try:
+            action = _send_group(self.frames, self.run_id, self.server, self.database)
+            print(f"[OUTBOX] {action} run {self.run_id} as one transaction: {self.summary()}")
+            return True
+        except Exception as e:
+            print(f"[FAIL] Upload of run {self.run_id} failed: {e}")
+            return False
+
+
+_collector = None
+
+
+@contextmanager
+def collect_uploads(run_id=None, server=FABRIC_SERVER, database=FABRIC_DATABASE):
+    """
+    Hold back every queue_upload() made inside the block and send them as one
+    group when it ends, so the run's tables are written in one transaction.
+    If the block raises, nothing is uploaded.
+
+    Usage:
+        with collect_uploads(run_id) as uploads:
+            ...  # generation, GU and SU steps
+        print(uploads.summary())
+    """
+    global _collector
+    collector = UploadCollector(run_id, server, database)
+    previous, _collector = _collector, collector
+    try:
+        yield collector
+    except Exception:
+        if collector.frames:
+            print(f"[OUTBOX] Run {collector.run_id} failed - {collector.summary()} not uploaded")
+        raise
+    finally:
+        _collector = previous
+    collector.sent = collector.send()
+
+
+@atexit.register
+def _drain_outbox_at_exit():
+    """Give queued uploads a short chance to finish; anything left is replayed next session"""
+    if _outbox is not None and _outbox.pending():
+        print(f"[OUTBOX] Waiting up to {OUTBOX_EXIT_DRAIN_SECONDS}s for {len(_outbox.pending())} pending upload(s)...")
+        if not _outbox.drain(OUTBOX_EXIT_DRAIN_SECONDS):
+            print(f"[OUTBOX] {len(_outbox.pending())} batch(es) kept in {_outbox.folder} for the next session")
+
+
+# ==========================================
+# 5. BENCHMARK
+# ==========================================
+def _benchmark_frame(days, value_columns):
+    """SU-shaped upload frame: half-hourly rows, one FLOAT per value column, S3+ left empty"""
+    times = pd.date_range("2026-01-01", periods=48 * days, freq="30min")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"DateTime": times, LAG_COLUMN: "D-2"})
+    for col in value_columns:
+        df[col] = None if col.startswith("S") and col[1:].isdigit() and int(col[1:]) > 2 else rng.random(len(times)) * 100
+    df["Upload_Timestamp"] = datetime.now()
+    return df
+
+
+def benchmark_upload_methods(engine, days=(1, 7, 30), table_name="Bids_SU_D_Minus_X"):
+    """
+    Time the current to_sql paths against bulk_insert and merge_upsert on a given engine.
+
+    Args:
+        engine: Engine to test against (a local stand-in, or Fabric for a real run)
+        days: Upload sizes to try, in trading days of half-hourly rows
+        table_name: Table whose column layout is used (a _bench copy is written)
+
+    Returns:
+        DataFrame with one row per (rows, method) and the elapsed seconds
+    """
+    bench_table = f"{table_name}_bench"
+    value_columns = [c for c in TABLE_SQL_TYPES[table_name] if c not in TIMESTAMP_COLUMNS + [LAG_COLUMN]]
+    TABLE_SQL_TYPES[bench_table] = TABLE_SQL_TYPES[table_name]
+    max_params = 2100 if engine.dialect.name == "mssql" else 32766
+
+    results = []
+    try:
+        for n_days in days:
+            df = _benchmark_frame(n_days, value_columns)
+            methods = {
+                "to_sql (row by row)": lambda: df.to_sql(bench_table, engine, if_exists="append", index=False),
+                "to_sql (multi)": lambda: df.to_sql(bench_table, engine, if_exists="append", index=False,
+                                                    method="multi", chunksize=max(1, max_params // len(df.columns) - 1)),
+                "bulk_insert": lambda: bulk_insert(df, bench_table, engine),
+                "merge_upsert": lambda: merge_upsert(df, bench_table, engine),
+            }
+            for method, upload in methods.items():
+                start = time.perf_counter()
+                upload()
+                results.append({"Rows": len(df), "Columns": len(df.columns), "Method": method,
+                                "Seconds": round(time.perf_counter() - start, 4)})
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {engine.dialect.identifier_preparer.quote(bench_table)}"))
+        _forget_table(engine, bench_table)
+        del TABLE_SQL_TYPES[bench_table]
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    # One-off migration of a warehouse table: migrate <table> [<column> ...]
+    if len(sys.argv) > 2 and sys.argv[1] == "migrate":
+        migrate_table(sys.argv[2], sys.argv[3:] or None)
+        sys.exit(0)
+
+    # Local SQL stand-in by default; pass "fabric" to run the same comparison against the warehouse
+    if len(sys.argv) > 1 and sys.argv[1] == "fabric":
+        bench_engine = get_fabric_engine()
+    else:
+        bench_engine = create_engine(f"sqlite:///{Path(tempfile.gettempdir()) / 'fes_upload_bench.db'}")
+
+    print(f"[FABRIC] Benchmarking uploads against {bench_engine.url}")
+    print(benchmark_upload_methods(bench_engine).to_string(index=False))
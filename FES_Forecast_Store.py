@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FES Forecast Store Module
+Columnar sidecar files next to the Generation Forecast workbooks
+- Parquet copy of every saved forecast, written atomically next to the .xlsx
+- Schema version, source workbook mtime/size and per-column content hashes in the file metadata
+- Loaders read only the columns they need and fall back to the .xlsx when the sidecar is missing or stale
+- Memory-mapped archive of every saved forecast laid out as (trading day, lag, period, column)
+- Archive columns follow the facility registry; the layout is kept in the archive header and grows with it
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from FES_Meteologica import FORECAST_FACILITIES
+
+# Cross-process lock for the archive (msvcrt on Windows, fcntl elsewhere)
+try:
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+except ImportError:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# Parquet support is optional - without pyarrow everything reads the .xlsx as before
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    SIDECAR_AVAILABLE = True
+except ImportError:
+    SIDECAR_AVAILABLE = False
+
+
+# Bump whenever the sidecar layout changes; older sidecars are then ignored
+SIDECAR_SCHEMA_VERSION = 1
+SIDECAR_METADATA_KEY = b"fes_forecast"
+
+# Forecast archive (local folder next to the scripts unless FES_ARCHIVE_DIR is set)
+ARCHIVE_DIR = Path(os.environ.get("FES_ARCHIVE_DIR", Path.cwd() / "archive"))
+ARCHIVE_SCHEMA_VERSION = 1
+ARCHIVE_EPOCH = datetime(2025, 1, 1)    # Trading day stored at index 0
+ARCHIVE_GROW_DAYS = 366                 # Days added to the file whenever it has to grow
+ARCHIVE_PERIODS = 48
+ARCHIVE_LAGS = ["D-1", "D-2", "D-3", "D-4", "D-5", "D-6", "D-7", "IDA-1"]
+# Archived besides the forecast column of every registry facility
+ARCHIVE_EXTRA_COLUMNS = ['Naïve Nonwind (MW)', 'Self-forecast (MW)']
+# Seconds to wait for another process writing the archive
+ARCHIVE_LOCK_TIMEOUT_SECONDS = 30
+
+
+# ==========================================
+# 1. SIDECAR WRITER
+# ==========================================
+def sidecar_path(xlsx_path):
+    """Sidecar file for a Generation Forecast workbook (same name, .parquet)"""
+    return Path(xlsx_path).with_suffix(".parquet")
+
+
+def _column_hashes(df):
+    """Content hash per column (stable across a Parquet round trip)"""
+    return {col: str(int(pd.util.hash_pandas_object(df[col], index=False).sum()))
+            for col in df.columns}
+
+
+def write_forecast_sidecar(df, xlsx_path):
+    """
+    Write the Parquet sidecar for a workbook that has just been saved.
+
+    The workbook's mtime and size are recorded so a later edit of the .xlsx
+    (e.g. a manual correction) makes the sidecar stale. The file is written
+    under a temporary name and renamed, so readers never see a partial file.
+
+    Args:
+        df: Forecast DataFrame with a datetime64 DateTime column
+        xlsx_path: Path of the workbook the sidecar belongs to
+
+    Returns:
+        Path of the sidecar, or None if it could not be written
+    """
+    if not SIDECAR_AVAILABLE:
+        return None
+
+    xlsx_path = Path(xlsx_path)
+    target = sidecar_path(xlsx_path)
+    tmp_file = target.with_name(target.name + ".tmp")
+    try:
+        stat = os.stat(xlsx_path)
+        metadata = {
+            'schema_version': SIDECAR_SCHEMA_VERSION,
+            'xlsx_mtime_ns': stat.st_mtime_ns,
+            'xlsx_size': stat.st_size,
+            'column_hashes': _column_hashes(df),
+        }
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            SIDECAR_METADATA_KEY: json.dumps(metadata).encode(),
+        })
+        pq.write_table(table, tmp_file)
+        os.replace(tmp_file, target)
+        return target
+    except Exception as e:
+        print(f"[WARNING] Could not write forecast sidecar {target.name}: {e}")
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        return None
+
+
+# ==========================================
+# 2. SIDECAR READER
+# ==========================================
+def _read_sidecar(xlsx_path, columns=None):
+    """
+    Columns from the sidecar, or None if it is missing, from another schema
+    version, older than the workbook, or fails its content hash check.
+    """
+    target = sidecar_path(xlsx_path)
+    if not SIDECAR_AVAILABLE or not target.exists():
+        return None
+    try:
+        metadata = json.loads(pq.read_schema(target).metadata[SIDECAR_METADATA_KEY])
+        stat = os.stat(xlsx_path)
+        if (metadata['schema_version'] != SIDECAR_SCHEMA_VERSION
+                or metadata['xlsx_mtime_ns'] != stat.st_mtime_ns
+                or metadata['xlsx_size'] != stat.st_size):
+            print(f"[INFO] Sidecar {target.name} is stale - reading the workbook")
+            return None
+
+        hashes = metadata['column_hashes']
+        if columns is not None:
+            missing = [c for c in columns if c not in hashes]
+            if missing:
+                print(f"[INFO] Sidecar {target.name} has no column(s) {missing} - reading the workbook")
+                return None
+        df = pq.read_table(target, columns=list(columns) if columns is not None else None).to_pandas()
+        if _column_hashes(df) != {c: hashes[c] for c in df.columns}:
+            print(f"[WARNING] Sidecar {target.name} failed its content check - reading the workbook")
+            return None
+        return df
+    except Exception as e:
+        print(f"[WARNING] Could not read sidecar {target.name}: {e}")
+        return None
+
+
+def read_generation_forecast(xlsx_path, columns=None):
+    """
+    Read a Generation Forecast, preferring its Parquet sidecar.
+
+    Args:
+        xlsx_path: Path of the Generation Forecast workbook
+        columns: Columns to return (default: all). DateTime is always included.
+                 Columns an older workbook does not have are returned as NaN.
+
+    Returns:
+        DataFrame with DateTime as datetime64
+    """
+    if columns is not None and "DateTime" not in columns:
+        columns = ["DateTime"] + list(columns)
+
+    df = _read_sidecar(xlsx_path, columns)
+    if df is not None:
+        return df
+
+    if columns is None:
+        df = pd.read_excel(xlsx_path)
+    else:
+        header = pd.read_excel(xlsx_path, nrows=0).columns
+        df = pd.read_excel(xlsx_path, usecols=[c for c in columns if c in header]).reindex(columns=columns)
+    df["DateTime"] = pd.to_datetime(df["DateTime"], format="%d/%m/%Y %H:%M")
+    return df
+
+
+# ==========================================
+# 3. FORECAST ARCHIVE
+# ==========================================
+_archive_lock = threading.Lock()
+
+
+def archive_columns():
+    """Columns a new archive holds: every facility in the forecast registry plus ARCHIVE_EXTRA_COLUMNS"""
+    return list(FORECAST_FACILITIES.values()) + [c for c in ARCHIVE_EXTRA_COLUMNS
+                                                 if c not in FORECAST_FACILITIES.values()]
+
+
+@contextmanager
+def archive_file_lock(archive_dir=None, timeout=ARCHIVE_LOCK_TIMEOUT_SECONDS):
+    """
+    Hold the archive's lock file, so only one thread or process writes it at a time.
+
+    Raises:
+        TimeoutError: Another writer held the lock for longer than timeout seconds
+    """
+    archive_dir = Path(archive_dir) if archive_dir else ARCHIVE_DIR
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    with _archive_lock, open(archive_dir / "forecast_archive.lock", "a+b") as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _lock_file(f)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Forecast archive in {archive_dir} is locked by another process")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+class ForecastArchive:
+    """
+    Every saved forecast in one float32 file, memory-mapped on read.
+
+    data[day, lag, period, column] holds trading day ARCHIVE_EPOCH + day, lag
+    ARCHIVE_LAGS[lag], the 48 half-hour periods from 23:00 the day before and
+    the columns listed in the header (the .json next to the data). Slots never
+    written are NaN. The file only ever grows; saving the same trading day and
+    lag again replaces that slot.
+
+    When the facility registry gains a site, the next write widens the layout:
+    the data is copied to a new file with the extra columns and the header is
+    switched to it, so readers always see a header and data file that match.
+    Writers must hold archive_file_lock.
+    """
+
+    def __init__(self, archive_dir=None):
+        self.archive_dir = Path(archive_dir) if archive_dir else ARCHIVE_DIR
+        self.meta_file = self.archive_dir / f"forecast_archive_v{ARCHIVE_SCHEMA_VERSION}.json"
+        self.lags = list(ARCHIVE_LAGS)
+        self.columns = archive_columns()
+        self.layout = 0
+        self.capacity = 0
+        if self.meta_file.exists():
+            with open(self.meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            self.lags, self.columns = meta['lags'], meta['columns']
+            self.layout = meta.get('layout', 0)
+        self.data_file = self._data_file(self.layout)
+        if self.data_file.exists():
+            # Capacity from the file itself, so an interrupted grow can't desync it from the metadata
+            day_bytes = int(np.prod(self._day_shape)) * np.dtype(np.float32).itemsize
+            self.capacity = self.data_file.stat().st_size // day_bytes
+
+    @property
+    def _day_shape(self):
+        return (len(self.lags), ARCHIVE_PERIODS, len(self.columns))
+
+    def _data_file(self, layout):
+        suffix = f".{layout}" if layout else ""
+        return self.archive_dir / f"forecast_archive_v{ARCHIVE_SCHEMA_VERSION}{suffix}.f32"
+
+    def _save_meta(self):
+        tmp_file = self.meta_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({'schema_version': ARCHIVE_SCHEMA_VERSION, 'epoch': ARCHIVE_EPOCH.strftime("%Y-%m-%d"),
+                       'lags': self.lags, 'columns': self.columns, 'periods': ARCHIVE_PERIODS,
+                       'capacity_days': self.capacity, 'layout': self.layout,
+                       'data_file': self.data_file.name}, f)
+        os.replace(tmp_file, self.meta_file)
+
+    def _add_columns(self, columns):
+        """Widen the layout by new columns (NaN for every day saved so far)"""
+        old_data, old_file = self.memmap(), self.data_file
+        old_count = len(self.columns)
+        self.columns = self.columns + list(columns)
+        self.layout += 1
+        self.data_file = self._data_file(self.layout)
+        if old_data is not None:
+            new_data = np.memmap(self.data_file, dtype=np.float32, mode="w+",
+                                 shape=(self.capacity,) + self._day_shape)
+            new_data[..., old_count:] = np.nan
+            for start in range(0, self.capacity, ARCHIVE_GROW_DAYS):
+                new_data[start:start + ARCHIVE_GROW_DAYS, ..., :old_count] = old_data[start:start + ARCHIVE_GROW_DAYS]
+            new_data.flush()
+            del new_data, old_data
+        self._save_meta()
+        print(f"[INFO] Forecast archive layout extended with {', '.join(columns)}")
+        try:
+            old_file.unlink()
+        except OSError:
+            pass   # Still mapped by a reader (Windows) - left for the next layout change
+
+    def _grow(self, days_needed):
+        """Append NaN-filled days to the file until it holds days_needed days"""
+        new_capacity = self.capacity
+        while new_capacity < days_needed:
+            new_capacity += ARCHIVE_GROW_DAYS
+        chunk = np.full((new_capacity - self.capacity,) + self._day_shape, np.nan, dtype=np.float32)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.data_file, "r+b" if self.data_file.exists() else "wb") as f:
+            f.seek(self.capacity * chunk[0].nbytes)   # Overwrite any partly written day
+            chunk.tofile(f)
+            f.truncate()
+        self.capacity = new_capacity
+        self._save_meta()
+
+    def day_index(self, trading_date):
+        return (trading_date.replace(hour=0, minute=0, second=0, microsecond=0) - ARCHIVE_EPOCH).days
+
+    def memmap(self, mode="r"):
+        """The whole archive as a (day, lag, period, column) memmap (None if empty)"""
+        if not self.capacity or not self.data_file.exists():
+            return None
+        return np.memmap(self.data_file, dtype=np.float32, mode=mode,
+                         shape=(self.capacity,) + self._day_shape)
+
+    def write(self, df, trading_date, lag):
+        """
+        Store one saved forecast.
+
+        Args:
+            df: Forecast DataFrame (48 rows in period order)
+            trading_date: datetime of the trading day
+            lag: Lag label (must be in ARCHIVE_LAGS)
+
+        Returns:
+            True if stored
+        """
+        day = self.day_index(trading_date)
+        if lag not in self.lags or day < 0 or len(df) != ARCHIVE_PERIODS:
+            return False
+        added = [c for c in archive_columns() if c not in self.columns]
+        if added:
+            self._add_columns(added)
+        block = np.full((ARCHIVE_PERIODS, len(self.columns)), np.nan, dtype=np.float32)
+        for i, col in enumerate(self.columns):
+            if col in df.columns:
+                block[:, i] = df[col].to_numpy(dtype=np.float32)
+
+        if day >= self.capacity:
+            self._grow(day + 1)
+        data = self.memmap(mode="r+")
+        data[day, self.lags.index(lag)] = block
+        data.flush()
+        del data
+        return True
+
+    def history(self, first_date, last_date, lag="D-1"):
+        """
+        Zero-copy view of the trading days first_date..last_date for one lag.
+
+        Returns:
+            (days, period, column) float32 array view (NaN where nothing was saved),
+            or None if the archive is empty or does not reach first_date
+        """
+        data = self.memmap()
+        if data is None or lag not in self.lags:
+            return None
+        start = max(self.day_index(first_date), 0)
+        stop = min(self.day_index(last_date) + 1, self.capacity)
+        if start >= stop:
+            return None
+        return data[start:stop, self.lags.index(lag)]
+
+    def totals(self, first_date, last_date, lag="D-1", columns=None):
+        """
+        Total of the given columns per period for each archived trading day.
+
+        Returns:
+            DataFrame with TradingDay, DateTime and Total (days that were never saved are left out)
+        """
+        view = self.history(first_date, last_date, lag)
+        missing = [c for c in (columns or []) if c not in self.columns]
+        if missing:
+            print(f"[INFO] Forecast archive has no column(s) {missing} yet")
+        if view is None or missing:
+            return pd.DataFrame({'TradingDay': pd.Series(dtype='datetime64[ns]'),
+                                 'DateTime': pd.Series(dtype='datetime64[ns]'), 'Total': pd.Series(dtype=float)})
+        picked = [self.columns.index(c) for c in (columns or self.columns)]
+        values = view[:, :, picked]
+        saved = ~np.isnan(values).all(axis=(1, 2))
+        totals = np.nansum(values[saved], axis=2, dtype=np.float64)
+
+        first_day = ARCHIVE_EPOCH + timedelta(days=max(self.day_index(first_date), 0))
+        day_starts = np.array([first_day + timedelta(days=int(i)) for i in np.flatnonzero(saved)],
+                              dtype='datetime64[m]')
+        times = (day_starts[:, None] - np.timedelta64(60, 'm')
+                 + np.arange(ARCHIVE_PERIODS) * np.timedelta64(30, 'm'))
+        return pd.DataFrame({'TradingDay': np.repeat(day_starts, ARCHIVE_PERIODS).astype('datetime64[ns]'),
+                             'DateTime': times.ravel().astype('datetime64[ns]'), 'Total': totals.ravel()})
+
+
+def archive_forecast(df, trading_date, lag):
+    """Add a saved forecast to the archive (failures are reported, never raised)"""
+    try:
+        with archive_file_lock():
+            if not ForecastArchive().write(df, trading_date, lag):
+                print(f"[INFO] {lag} forecast for {trading_date:%d/%m/%Y} not archived (outside archive layout)")
+    except Exception as e:
+        print(f"[WARNING] Could not archive forecast: {e}")
+
+
+if __name__ == "__main__":
+    archive = ForecastArchive()
+    start = time.perf_counter()
+    year = archive.totals(datetime.now() - timedelta(days=365), datetime.now())
+    print(f"{len(year) // ARCHIVE_PERIODS} archived D-1 days totalled in {(time.perf_counter() - start) * 1000:.1f} ms")
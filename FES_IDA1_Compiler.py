@@ -8,13 +8,15 @@ Adjustment = IDA-1 Total - D-1 Total (horizontally summed)
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from openpyxl.styles import Font, PatternFill, Alignment
-from zeep import Client
-from zeep.settings import Settings
+from FES_Meteologica import fetch_forecast, site_slots
+from FES_Forecast_Store import read_generation_forecast
+from FES_Fabric_Uploader import queue_upload
+from FES_Price_Ladder import build_bids
 
 
 class IDA1BidCompiler:
@@ -39,121 +41,15 @@ class IDA1BidCompiler:
         """
         print(f"\n[IDA1] Downloading IDA-1 forecast from Meteologica API...")
         
-        date_obj_1 = datetime.strptime(trading_date_str, "%d/%m/%Y") - timedelta(days=1)
-        date_obj_2 = datetime.strptime(trading_date_str, "%d/%m/%Y")
+        forecast = fetch_forecast(datetime.strptime(trading_date_str, "%d/%m/%Y"))
 
-        y1, m1, d1 = date_obj_1.year, date_obj_1.month, date_obj_1.day
-        y2, m2, d2 = date_obj_2.year, date_obj_2.month, date_obj_2.day
-
-        settings = Settings(strict=False)
-        wsdl = "https://webservice.meteologica.com/api/wsdl/MeteologicaDataExchangeService.wsdl"
-        client = Client(wsdl=wsdl)
-
-        login_req_type = client.get_type('ns0:LoginReq')
-        login_req = login_req_type(
-            username="Flogas",
-            password="uc:DF824"
-        )
-        login_response = client.service.login(request=login_req)
-        session_token = login_response.header.sessionToken
-
-        forecast_req_type = client.get_type('ns0:GetForecastMultiReq')
-        req = forecast_req_type(
-            header={'sessionToken': session_token},
-            variableId='prod',
-            predictorId='aggregated',
-            fromDate=datetime(y1, m1, d1, 23, 0, 0).isoformat(),
-            toDate=datetime(y2, m2, d2, 22, 30, 0).isoformat(),
-            granularity='30',
-            percentiles='50',
-            facilitiesId=[])
-
-        forecast_response = client.service.getForecastMulti(request=req)
-
-        all_timestamps = set()
-        facility_data = {}
-
-        for facility in forecast_response.facilitiesForecastData.item:
-            facility_id = facility.facilityId
-            facility_data[facility_id] = {}
-
-            forecast_pairs = facility.forecastData.split(':')
-            start_idx = 1 if forecast_pairs[0] == '' else 0
-
-            for i in range(start_idx, len(forecast_pairs)):
-                parts = forecast_pairs[i].split('~')
-                if len(parts) >= 2:
-                    timestamp = int(parts[0])
-                    value = float(parts[1])
-                    dt_obj = datetime.utcfromtimestamp(timestamp)
-                    all_timestamps.add(dt_obj)
-                    facility_data[facility_id][dt_obj] = value / 1000  # Convert to MW
-
-        df = pd.DataFrame(
-            index=pd.to_datetime(sorted(all_timestamps)),
-            columns=[
-                'Meteo ROI (MW)', 'Meteo NI (MW)', 'Meteo TB (MW)',
-                'Meteo CK (MW)', 'Meteo LD (MW)', 'Meteo CD (MW)', 'Meteo DT (MW)', 
-                'Meteo MUR (MW)', 'Meteo S1 (MW)', 'Meteo S2 (MW)'
-            ]
-        )
-
-        column_mapping = {
-            'Vayu_Cluster1': 'Meteo ROI (MW)',
-            'Vayu_Cluster2': 'Meteo NI (MW)',
-            'Vayu_402050': 'Meteo TB (MW)',
-            'Vayu_GU_402280': 'Meteo CK (MW)',
-            'Flogas-solar_0587': 'Meteo LD (MW)',
-            'Vayu_0275': 'Meteo CD (MW)',
-            'Flogas-solar_0378__': 'Meteo DT (MW)',
-            'Vayu_GEN_504260': 'Meteo MUR (MW)',
-            'Flogas-solar_0670': 'Meteo S1 (MW)',
-            'Flogas-solar_0684': 'Meteo S2 (MW)'
-        }
-
-        for facility_id, col_name in column_mapping.items():
-            if facility_id in facility_data:
-                df[col_name] = [facility_data[facility_id].get(ts, 0) for ts in df.index]
-
-        df = df.reset_index().rename(columns={'index': 'time'})
-        df['time'] = df['time'] + pd.to_timedelta('1 hour')
-        df['time'] = df['time'].dt.strftime('%d/%m/%Y %H:%M')
-
-        # Process forecast data (add nonwind, self-forecast, etc.)
-        # Import process_forecast_data from master script
-        from FES_MasterScript_PRODUCTION import process_forecast_data
-        df = process_forecast_data(trading_date_str, df)
-        df.rename(columns={"time": "DateTime"}, inplace=True)
-
-        # Set proper timestamps
-        input_date_obj = datetime.strptime(trading_date_str, "%d/%m/%Y")
-        previous_day = input_date_obj - timedelta(days=1)
-        timestamps = []
-        for minute in [0, 30]:
-            timestamp = previous_day.replace(hour=23, minute=minute)
-            timestamps.append(timestamp)
-        for hour in range(0, 23):
-            for minute in [0, 30]:
-                timestamp = input_date_obj.replace(hour=hour, minute=minute)
-                timestamps.append(timestamp)
-
-        df['DateTime'] = timestamps
-        df['DateTime'] = df['DateTime'].dt.strftime('%d/%m/%Y %H:%M')
-
-        df.loc[:, df.columns != 'DateTime'] = df.loc[:, df.columns != 'DateTime'].round(1)
+        # Process forecast data (add nonwind, self-forecast, timestamps, rounding)
+        # Import build_forecast_frame from master script
+        from FES_MasterScript_PRODUCTION import build_forecast_frame, save_forecast_file
+        df = build_forecast_frame(trading_date_str, forecast)
 
         # === SAVE AS IDA-1 ===
-        date_obj = datetime.strptime(trading_date_str, "%d/%m/%Y")
-        year = str(date_obj.year)
-        month = date_obj.strftime("%B")
-        
-        output_path = Path(rf"I:\Daily Generation Forecasts\Daily Generation to Submit\{year}\{month}")
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        file_name = f"Generation Forecast {date_obj.strftime('%d.%m.%Y')} IDA-1.xlsx"
-        full_path = output_path / file_name
-        df.to_excel(full_path, index=False)
-        print(f"[IDA1] OK Forecast saved: {file_name}")
+        full_path, file_name = save_forecast_file(df, trading_date_str, "IDA-1")
         
         # === UPLOAD TO FABRIC SQL (ONLY IF ENABLED) ===
         # IDA-1 is not D-1, so it goes to Generation_D_Minus_X table
@@ -172,14 +68,21 @@ class IDA1BidCompiler:
         else:
             print(f"[IDA1] SKIP SQL upload (disabled)")
 
-        logout_req_type = client.get_type('ns0:LogoutReq')(
-            header={'sessionToken': session_token})
-        client.service.logout(request=logout_req_type)
-
         return df
         
-    def load_d1_forecast(self, trading_date_str):
-        """Load D-1 forecast from morning"""
+    def load_d1_forecast(self, trading_date_str, forecast_df=None):
+        """
+        Load D-1 forecast from morning
+        
+        Args:
+            trading_date_str: Trading date in DD/MM/YYYY format
+            forecast_df: Optional D-1 forecast DataFrame still in memory (skips reading the file)
+        """
+        if forecast_df is not None:
+            self.d1_forecast_df = forecast_df.copy()
+            print(f"[IDA1] OK D-1 forecast taken from memory: {len(self.d1_forecast_df)} periods")
+            return
+
         date_obj = datetime.strptime(trading_date_str, "%d/%m/%Y")
         year = str(date_obj.year)
         month = date_obj.strftime("%B")
@@ -193,8 +96,7 @@ class IDA1BidCompiler:
         if not d1_file.exists():
             raise FileNotFoundError(f"D-1 forecast not found: {d1_file}\nPlease run D-1 compilation first (morning)")
         
-        self.d1_forecast_df = pd.read_excel(d1_file)
-        self.d1_forecast_df["DateTime"] = pd.to_datetime(self.d1_forecast_df["DateTime"], format="%d/%m/%Y %H:%M")
+        self.d1_forecast_df = read_generation_forecast(d1_file)
         print(f"[IDA1] OK D-1 forecast loaded: {len(self.d1_forecast_df)} periods")
         
     def load_forecasts(self, trading_date_str):
@@ -219,8 +121,7 @@ class IDA1BidCompiler:
         if not d1_file.exists():
             raise FileNotFoundError(f"D-1 forecast not found: {d1_file}")
         
-        self.d1_forecast_df = pd.read_excel(d1_file)
-        self.d1_forecast_df["DateTime"] = pd.to_datetime(self.d1_forecast_df["DateTime"], format="%d/%m/%Y %H:%M")
+        self.d1_forecast_df = read_generation_forecast(d1_file)
         print(f"[IDA1] OK D-1 forecast loaded: {len(self.d1_forecast_df)} periods")
         
         # Load IDA-1 forecast
@@ -231,8 +132,7 @@ class IDA1BidCompiler:
             raise FileNotFoundError(f"IDA-1 forecast not found: {ida1_file}\n" + 
                                    "Please generate IDA-1 forecast first (evening update)")
         
-        self.ida1_forecast_df = pd.read_excel(ida1_file)
-        self.ida1_forecast_df["DateTime"] = pd.to_datetime(self.ida1_forecast_df["DateTime"], format="%d/%m/%Y %H:%M")
+        self.ida1_forecast_df = read_generation_forecast(ida1_file)
         print(f"[IDA1] OK IDA-1 forecast loaded: {len(self.ida1_forecast_df)} periods")
         
     def calculate_adjustment(self):
@@ -249,9 +149,8 @@ class IDA1BidCompiler:
                     'Naïve Nonwind (MW)', 'Self-forecast (MW)', 'Meteo DT (MW)', 
                     'Meteo MUR (MW)']
         
-        # Add S1-S25 columns if they exist
-        for i in range(1, 26):
-            col_name = f'Meteo S{i} (MW)'
+        # Add the registered site columns (S1, S2, ...) if they exist
+        for col_name in site_slots().values():
             if col_name in self.d1_forecast_df.columns:
                 gen_cols.append(col_name)
         
@@ -284,19 +183,9 @@ class IDA1BidCompiler:
     def generate_ida1_bids(self):
         """Generate IDA-1 bid format (period, -150, 3000 structure)"""
         
-        bid_data = []
-        
-        for i, row in self.adjustment_df.iterrows():
-            adj = row['Adjustment']
-            
-            # IDA-1 bid structure: adjustment goes to both price columns
-            bid_data.append({
-                'period': i + 1,
-                '-150': adj,
-                '3000.00': adj
-            })
-        
-        bid_df = pd.DataFrame(bid_data)
+        # IDA-1 bid structure: adjustment goes to both price columns (IDA1 price ladder)
+        bid_df = build_bids("IDA1", "ida", self.adjustment_df['Adjustment'],
+                            self.adjustment_df['DateTime'], self.adjustment_df.index + 1)
         
         # Add total row
         total_adj = self.adjustment_df['Adjustment'].sum()
@@ -445,10 +334,6 @@ class IDA1BidCompiler:
         - Upload_Timestamp
         """
         try:
-            import pyodbc
-            import urllib.parse
-            from sqlalchemy import create_engine
-            
             print(f"[IDA1] Uploading IDA-1 bids to SQL (dbo.ida1_bids)...")
             
             # Prepare upload dataframe
@@ -477,41 +362,28 @@ class IDA1BidCompiler:
             # Select only columns that exist in the dataframe and are in the mapping
             available_cols = ['DateTime', 'IDA1_Bid_MW'] + [col for col in column_map.keys() if col in upload_df.columns and col != 'DateTime']
             upload_df = upload_df[available_cols]
+            upload_df.insert(1, 'Lag', 'IDA-1')
             
             # Add upload timestamp
             upload_df['Upload_Timestamp'] = datetime.now()
             
-            # Create connection
-            server = 'g3hsqkj33hsejptu6vliyt5gny-6novrz7kmrcuriuozi2uqi5sy4.datawarehouse.fabric.microsoft.com'
-            database = 'trading_data'
-            
-            conn_str = (
-                f"Driver={{ODBC Driver 18 for SQL Server}};"
-                f"Server={server};"
-                f"Database={database};"
-                f"Authentication=ActiveDirectoryInteractive;"
-                f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout=60;"
-            )
-            params = urllib.parse.quote_plus(conn_str)
-            engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
-            
-            # Upload to SQL
-            upload_df.to_sql('ida1_bids', engine, if_exists='append', index=False, method='multi')
-            
-            print(f"[IDA1] OK Uploaded {len(upload_df)} rows to dbo.ida1_bids")
-            print(f"[IDA1] Columns: DateTime, IDA1_Bid_MW, Generation Components, Upload_Timestamp")
+            # Queue for upload (the outbox worker uploads and retries in the background)
+            if queue_upload(upload_df, 'ida1_bids'):
+                print(f"[IDA1] OK Queued {len(upload_df)} rows for dbo.ida1_bids")
+                print(f"[IDA1] Columns: DateTime, IDA1_Bid_MW, Generation Components, Upload_Timestamp")
             
         except Exception as e:
             print(f"[IDA1] WARNING: SQL upload failed: {str(e)}")
             print(f"[IDA1] Continuing without SQL upload...")
 
-    def run_ida1_compilation(self, trading_date_str, upload_sql=False):
+    def run_ida1_compilation(self, trading_date_str, upload_sql=False, d1_forecast_df=None):
         """
         Main workflow for IDA-1 bid compilation
         
         Args:
             trading_date_str: Trading date in DD/MM/YYYY format
             upload_sql: Whether to upload to SQL (default: False)
+            d1_forecast_df: Optional D-1 forecast DataFrame from the morning run in this session
         
         Returns:
             Path to IDA Excel file
@@ -530,7 +402,7 @@ class IDA1BidCompiler:
         
         # Step 2: Load D-1 forecast
         print("\n[STEP 2/4] Loading D-1 forecast (from morning)...")
-        self.load_d1_forecast(trading_date_str)
+        self.load_d1_forecast(trading_date_str, d1_forecast_df)
         
         # Step 3: Calculate adjustment
         print("\n[STEP 3/4] Calculating adjustment (D-1 - IDA-1)...")
@@ -558,19 +430,20 @@ class IDA1BidCompiler:
 
 
 # Standalone function for easy calling
-def compile_ida1_bids(trading_date_str, upload_sql=False):
+def compile_ida1_bids(trading_date_str, upload_sql=False, d1_forecast_df=None):
     """
     Compile IDA-1 adjustment bids
     
     Args:
         trading_date_str: Trading date in DD/MM/YYYY format
         upload_sql: Whether to upload to SQL (default: False)
+        d1_forecast_df: Optional D-1 forecast DataFrame already in memory (default: read the D-1 file)
     
     Returns:
         Path to IDA Excel file
     """
     compiler = IDA1BidCompiler()
-    return compiler.run_ida1_compilation(trading_date_str, upload_sql=upload_sql)
+    return compiler.run_ida1_compilation(trading_date_str, upload_sql=upload_sql, d1_forecast_df=d1_forecast_df)
 
 
 if __name__ == "__main__":
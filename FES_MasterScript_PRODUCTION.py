@@ -8,23 +8,30 @@
 
 import pandas as pd
 from datetime import datetime, timedelta
-from zeep import Client, Settings
 import os
-import calendar
 import datetime as dt
 import numpy as np
 from pathlib import Path
-from sqlalchemy import create_engine
-import urllib
-import matplotlib.pyplot as plt
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
 import matplotlib.dates as mdates
+from FES_Meteologica import (fetch_all, fetch_forecast, cached_forecast, split_trading_days,
+                             fetch_availability_events, availability_matrix, facilities_for,
+                             site_slots, FORECAST_FACILITIES, AVAILABILITY_FACILITIES, FORECAST_PERCENTILES)
+from FES_Self_Forecast import find_latest_self_forecast, read_self_forecast
+from FES_Forecast_Store import write_forecast_sidecar, read_generation_forecast, archive_forecast
+from FES_Fabric_Uploader import queue_upload, FABRIC_SERVER, FABRIC_DATABASE
+from FES_Price_Ladder import build_bids, ladder_for
 
 # Import PPT Generator (optional - only if python-pptx is installed)
 try:
-    from FES_PPT_Generator import generate_forecast_presentation
+    from FES_PPT_Generator import generate_forecast_presentation, WEEKEND_FORECAST_LAGS
     PPT_AVAILABLE = True
 except ImportError:
     PPT_AVAILABLE = False
+    WEEKEND_FORECAST_LAGS = ["D-3", "D-4", "D-5"]
     print("[WARNING] python-pptx not installed - PowerPoint generation disabled")
     print("[INFO] Install with: pip install python-pptx")
 
@@ -37,24 +44,19 @@ def upload_to_fabric(df, file_name):
     PRODUCTION: Uses Generation_D_Minus_1 or Generation_D_Minus_X tables
     
     Returns:
-        bool: True if upload succeeded, False if failed
+        bool: True if the upload was queued, False if it could not be
     """
-    # 1. CONFIGURATION
-    server = 'g3hsqkj33hsejptu6vliyt5gny-6novrz7kmrcuriuozi2uqi5sy4.datawarehouse.fabric.microsoft.com'
-    database = 'trading_data'
-
-    # 2. TABLE SELECTION
+    # 1. TABLE SELECTION (file names end in the lag: "Generation Forecast dd.mm.yyyy D-1.xlsx")
+    lag = Path(file_name).stem.rsplit(" ", 1)[-1]
     if "D-1" in file_name:
         table_name = "Generation_D_Minus_1"
     else:
         table_name = "Generation_D_Minus_X"
 
     print(f"Detected File: {file_name}")
-    print(f"Target Table: {table_name}")
-
-    # 3. PREPARE DATAFRAME
-    sql_df = df.copy()
+    print(f"Target Table: {table_name} (lag {lag})")
 
+    # 2. PREPARE DATAFRAME
     # --- STRICT COLUMN MAPPING ---
     column_map = {
         'DateTime': 'DateTime',
@@ -72,143 +74,58 @@ def upload_to_fabric(df, file_name):
         'Meteo S2 (MW)': 'Meteo S2 _MW_'
     }
 
-    # Add mappings for S3 to S25 (Future-proofing)
-    for i in range(3, 26):
+    # Add mappings for S3 to S25 (Future-proofing) and any registered site beyond
+    for i in range(3, max([25, *site_slots()]) + 1):
         source_col = f'Meteo S{i} (MW)'
         target_col = f'Meteo S{i} _MW_'
         column_map[source_col] = target_col
 
-    # Apply the renaming
-    sql_df.rename(columns=column_map, inplace=True)
+    # Apply the renaming (returns a new frame, the caller's df is left untouched)
+    sql_df = df.rename(columns=column_map)
 
-    # Add Upload Timestamp
+    # Add Lag (merge key with DateTime) and Upload Timestamp
+    sql_df['Lag'] = lag
     sql_df['Upload_Timestamp'] = datetime.now()
 
-    # Filter DataFrame to strictly match the columns we mapped (plus Timestamp)
-    valid_db_columns = list(column_map.values()) + ['Upload_Timestamp']
+    # Filter DataFrame to strictly match the columns we mapped (plus Lag and Timestamp)
+    valid_db_columns = list(column_map.values()) + ['Lag', 'Upload_Timestamp']
     final_cols = [c for c in valid_db_columns if c in sql_df.columns]
     sql_df = sql_df[final_cols]
 
-    # Ensure DateTime is correct format
-    if 'DateTime' in sql_df.columns:
+    # DateTime arrives typed from build_forecast_frame; only parse strings (e.g. from a saved file)
+    if 'DateTime' in sql_df.columns and not pd.api.types.is_datetime64_any_dtype(sql_df['DateTime']):
         sql_df['DateTime'] = pd.to_datetime(sql_df['DateTime'], format='%d/%m/%Y %H:%M')
 
-    # 4. UPLOAD
-    conn_str = (
-        f"Driver={{ODBC Driver 18 for SQL Server}};"
-        f"Server={server};"
-        f"Database={database};"
-        f"Authentication=ActiveDirectoryInteractive;"
-        f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout=60;"
-    )
-    params = urllib.parse.quote_plus(conn_str)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
-
-    try:
-        sql_df.to_sql(table_name, engine, if_exists='append', index=False)
-        print(f"[OK] Uploaded {len(sql_df)} rows to {table_name} at {datetime.now().strftime('%H:%M:%S')}")
-        return True
-    except Exception as e:
-        print(f"[FAIL] Upload Failed: {e}")
-        return False
+    # 3. UPLOAD (queued to the outbox - the background worker uploads and retries)
+    return queue_upload(sql_df, table_name, FABRIC_SERVER, FABRIC_DATABASE)
 
 # ==========================================
 # 2. HELPER FUNCTIONS
 # ==========================================
 
-lolu = ['0275', '402050', '402280']
-
-def large_unit_availability(input_date):
-    date_obj_1 = datetime.strptime(input_date, "%d/%m/%Y") - timedelta(days=1)
-    date_obj_2 = datetime.strptime(input_date, "%d/%m/%Y")
-
-    y1, m1, d1 = date_obj_1.year, date_obj_1.month, date_obj_1.day
-    y2, m2, d2 = date_obj_2.year, date_obj_2.month, date_obj_2.day
-
-    roi_unit_ids = ['Vayu_0275','Vayu_402050','Vayu_GU_402280']
-    remaining = []
-
-    settings = Settings(strict=False)
-    wsdl = 'https://webservice.meteologica.com/api/wsdl/MeteologicaDataExchangeService.wsdl'
-    client = Client(wsdl=wsdl, settings=settings)
-
-    login_req = client.get_type('ns0:LoginReq')(
-            username="Flogas",
-            password="uc:DF824")
-
-    login_response = client.service.login(request=login_req)
-    session_token = login_response.header.sessionToken
-
-    availability_req_type = client.get_type('ns0:getAvailabilityMultiReq')
-    req = availability_req_type(
-        header={'sessionToken': session_token},
-        fromDate=datetime(y1, m1, d1, 22, 0, 0).isoformat() + 'Z',
-        toDate=datetime(y2, m2, d2, 23, 0, 0).isoformat() + 'Z',
-        facilitiesId=[],
-        unit='MW')
-
-    availability_response = client.service.getAvailabilityMulti(request=req)
-
-    for item in availability_response.facilityAvailabilityData.item:
-        if item.facilityId in roi_unit_ids :
-            remaining.append(item) 
-
-    logout_req_type = client.get_type('ns0:LogoutReq')(
-        header={'sessionToken': session_token})
-    client.service.logout(request=logout_req_type)
-
+def large_unit_availability(input_date, force_refresh=False, events=None):
+    """
+    Availability factor, max and current output per large unit for the 48 periods
+    of a trading day, from the Meteologica outage events.
+    Events come from the availability cache unless force_refresh is True,
+    or can be passed in when they were already fetched (see fetch_all).
+    """
     input_date_obj = datetime.strptime(input_date, "%d/%m/%Y")
-    previous_day = input_date_obj - timedelta(days=1)
-    timestamps = []
-    for minute in [0, 30]:
-        timestamp = previous_day.replace(hour=23, minute=minute)
-        timestamps.append(timestamp)
-    for hour in range(0, 23):
-        for minute in [0, 30]:
-            timestamp = input_date_obj.replace(hour=hour, minute=minute)
-            timestamps.append(timestamp)
-    df = pd.DataFrame(timestamps, columns=['datetime'])
-
-    id_availability_map = {'Vayu_0275':'CD Availability', 'Vayu_402050':'TB Availability' , 'Vayu_GU_402280':'CK Availability' }
-
-    df['CD Availability'] = 1
-    df['TB Availability'] = 1
-    df['CK Availability'] = 1
-
-    df['CD Max'] = 4.5
-    df['TB Max'] = 13.8
-    df['CK Max'] = 11.5
-
-    for facility in remaining:
-        if facility.availabilityData == None:
-            pass
-        else:
-            for event in facility.availabilityData['item']:
-                json_format = "%Y-%m-%dT%H:%M:%S%z"
-                start_date = datetime.strptime(event['fromDate'], json_format)
-                end_date = datetime.strptime(event['toDate'], json_format)
+    if events is None:
+        events = fetch_availability_events(input_date_obj, force_refresh=force_refresh)
 
-                start_date = start_date.replace(tzinfo=None)
-                end_date = end_date.replace(tzinfo=None)
-                date_series = pd.date_range(start=start_date, end=end_date, freq='30min')
+    timestamps = pd.date_range(input_date_obj - timedelta(hours=1), periods=48, freq='30min')
+    df = pd.DataFrame({'datetime': timestamps})
 
-                temp_df = pd.DataFrame({'datetime': date_series,'availability': float(event['powerPercentage'])/100})   
+    factors = availability_matrix(timestamps.values, events, facilities_for('availability'))
 
-                col_name = id_availability_map[facility.facilityId]
-
-                temp_df = temp_df.rename(columns={'availability': col_name})
-                temp_df[col_name] = temp_df[col_name].replace(0, 1)
-                temp_df['datetime'] = temp_df['datetime'].dt.tz_localize(None)
-
-                df.set_index('datetime', inplace=True)
-                temp_df.set_index('datetime', inplace=True)
-
-                df.update(temp_df)
-                df.reset_index(inplace=True)
-
-    df['CD Current Output'] = df['CD Availability'] * df['CD Max']
-    df['TB Current Output'] = df['TB Availability'] * df['TB Max']
-    df['CK Current Output'] = df['CK Availability'] * df['CK Max']
+    for i, unit in enumerate(AVAILABILITY_FACILITIES.values()):
+        df[f"{unit['name']} Availability"] = factors[:, i]
+    for unit in AVAILABILITY_FACILITIES.values():
+        df[f"{unit['name']} Max"] = unit['max_mw']
+    for unit in AVAILABILITY_FACILITIES.values():
+        name = unit['name']
+        df[f'{name} Current Output'] = df[f'{name} Availability'] * df[f'{name} Max']
     return df
 
 def to_excel_serial_date(d):
@@ -220,60 +137,27 @@ def to_excel_serial_date(d):
     delta = d - excel_epoch
     return delta.total_seconds() / (24 * 60 * 60)
 
-def find_latest_self_forecast(input_date_str, max_lookback_days=14):
-    base_root = Path(r"V:\Renewables\Self-Forecasting\2) Forecasts Received by Trading Day")
-    dt0 = datetime.strptime(input_date_str, "%d/%m/%Y")
-
-    for delta in range(0, max_lookback_days + 1):
-        dt = dt0 - timedelta(days=delta)
-        year = dt.year
-        month = dt.month
-        month_name = calendar.month_name[month]
-        day_folder = dt.strftime('%d.%m.%Y')
-
-        month_folder = base_root / f"{year}" / f"{month}) {month_name}" / day_folder
-        if not month_folder.exists():
-            continue 
-
-        expected_name = f"1) Aggregated Naturgy_Self_Forecast_Template_v1_{day_folder}.xlsx"
-        candidate = month_folder / expected_name
-        if candidate.exists():
-            return candidate 
-
-        matches = sorted(month_folder.glob("1) Aggregated Naturgy_Self_Forecast_Template_v1_*.xlsx"))
-        if matches:
-            return matches[-1]
-
-    raise FileNotFoundError(f"No self-forecast file found within {max_lookback_days} days back from {input_date_str}.")
-
 def process_forecast_data(input_date, base_df):
+    """
+    Resample the Meteologica frame to half-hours and add the self-forecast and nonwind columns.
+    base_df['time'] and the returned 'time' column are datetime64.
+    """
     file_path = find_latest_self_forecast(input_date)
-    self_forecast = pd.read_excel(
-        file_path,
-        skiprows=16,
-        nrows=24,
-        usecols="C",
-        header=None,
-        names=['Self-forecast (MW)']
-    )
-
-    final_df = base_df.copy()
-    final_df['time'] = pd.to_datetime(final_df['time'], format='%d/%m/%Y %H:%M')
+    hourly_forecast = read_self_forecast(file_path)
 
-    min_time = final_df['time'].min()
-    max_time = final_df['time'].max()
+    min_time = base_df['time'].min()
+    max_time = base_df['time'].max()
 
     half_hourly_times = pd.date_range(start=min_time, end=max_time, freq='30min')
     half_hourly_df = pd.DataFrame({'time': half_hourly_times})
     final_df = pd.merge_asof(
-        half_hourly_df.sort_values('time'),
-        final_df.sort_values('time'),
+        half_hourly_df,
+        base_df.sort_values('time'),
         on='time',
         direction='backward'
     )
 
     final_df = final_df.ffill()
-    hourly_forecast = self_forecast['Self-forecast (MW)'].values
     half_hourly_forecast = np.repeat(hourly_forecast, 2)
 
     if len(half_hourly_forecast) > len(final_df):
@@ -284,7 +168,6 @@ def process_forecast_data(input_date, base_df):
 
     final_df['Self-forecast (MW)'] = half_hourly_forecast
     final_df['Naïve Nonwind (MW)'] = 0.7
-    final_df['time'] = final_df['time'].dt.strftime('%d/%m/%Y %H:%M')
 
     column_order = [
         'time',
@@ -298,8 +181,7 @@ def process_forecast_data(input_date, base_df):
         'Self-forecast (MW)',
         'Meteo DT (MW)', 
         'Meteo MUR (MW)',
-        'Meteo S1 (MW)',
-        'Meteo S2 (MW)'
+        *site_slots().values()
     ]
     for col in column_order:
         if col not in final_df.columns:
@@ -310,136 +192,83 @@ def process_forecast_data(input_date, base_df):
 # ==========================================
 # 3. MAIN FUNCTION - WITH UPLOAD CONTROL
 # ==========================================
-def grab_forecast_data(input_date, upload_to_sql=False):
+def trading_lag(trading_date):
+    """Days ahead and lag string (D-1, D-2, ...) of a trading day relative to today"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    days_ahead = (trading_date - today).days
+    return days_ahead, f"D-{days_ahead}"
+
+def build_forecast_frame(input_date, forecast, apply_availability=False, availability_events=None,
+                         percentile=None):
     """
-    Get generation forecast data and save to production location.
-    Automatically determines lag (D-1, D-2, D-3, etc.) based on trading date.
+    Turn one trading day of Meteologica forecast into the Generation Forecast table.
 
     Args:
-        input_date: Date string in format 'dd/mm/YYYY' (trading day)
-        upload_to_sql: Boolean - True to upload to Fabric SQL, False to skip upload
+        input_date: Trading day in format 'dd/mm/YYYY'
+        forecast: ForecastMatrix covering that trading day
+        apply_availability: If True, adjust the ROI forecast for large unit outages
+        availability_events: Outage events already fetched (default: fetch them)
+        percentile: Forecast percentile band to use (default: P50)
 
     Returns:
-        tuple: (DataFrame with forecast data, lag_string like 'D-1' or 'D-2')
+        DataFrame in the Generation Forecast file layout, DateTime as datetime64
+        (formatted to text only when written, see save_forecast_file)
     """
-    # Calculate lag dynamically
-    trading_date = datetime.strptime(input_date, "%d/%m/%Y")
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    days_ahead = (trading_date - today).days
-    lag = f"D-{days_ahead}"  # e.g., D-1, D-2, D-3
-    
-    print(f"[INFO] Trading Date: {input_date}")
-    print(f"[INFO] Days Ahead: {days_ahead}")
-    print(f"[INFO] Lag: {lag}")
-    
-    date_obj_1 = datetime.strptime(input_date, "%d/%m/%Y") - timedelta(days=1)
-    date_obj_2 = datetime.strptime(input_date, "%d/%m/%Y")
-
-    y1, m1, d1 = date_obj_1.year, date_obj_1.month, date_obj_1.day
-    y2, m2, d2 = date_obj_2.year, date_obj_2.month, date_obj_2.day
-
-    settings = Settings(strict=False)
-    wsdl = "https://webservice.meteologica.com/api/wsdl/MeteologicaDataExchangeService.wsdl"
-    client = Client(wsdl=wsdl)
-
-    login_req_type = client.get_type('ns0:LoginReq')
-    login_req = login_req_type(
-        username="Flogas",
-        password="uc:DF824"
-    )
-    login_response = client.service.login(request=login_req)
-    session_token = login_response.header.sessionToken
-
-    forecast_req_type = client.get_type('ns0:GetForecastMultiReq')
-    req = forecast_req_type(
-        header={'sessionToken': session_token},
-        variableId='prod',
-        predictorId='aggregated',
-        fromDate=datetime(y1, m1, d1, 23, 0, 0).isoformat(),
-        toDate=datetime(y2, m2, d2, 22, 30, 0).isoformat(),
-        granularity='30',
-        percentiles='50',
-        facilitiesId=[])
-
-    forecast_response = client.service.getForecastMulti(request=req)
-
-    all_timestamps = set()
-    facility_data = {}
-
-    for facility in forecast_response.facilitiesForecastData.item:
-        facility_id = facility.facilityId
-        facility_data[facility_id] = {}
-
-        forecast_pairs = facility.forecastData.split(':')
-        start_idx = 1 if forecast_pairs[0] == '' else 0
-
-        for i in range(start_idx, len(forecast_pairs)):
-            parts = forecast_pairs[i].split('~')
-            if len(parts) >= 2:
-                timestamp = int(parts[0])
-                value = float(parts[1])
-                dt_obj = datetime.utcfromtimestamp(timestamp)
-                all_timestamps.add(dt_obj)
-                facility_data[facility_id][dt_obj] = value / 1000  # Convert to MW
-
-    df = pd.DataFrame(
-        index=pd.to_datetime(sorted(all_timestamps)),
-        columns=[
-            'Meteo ROI (MW)', 'Meteo NI (MW)', 'Meteo TB (MW)',
-            'Meteo CK (MW)', 'Meteo LD (MW)' , 'Meteo CD (MW)', 'Meteo DT (MW)', 'Meteo MUR (MW)','Meteo S1 (MW)','Meteo S2 (MW)'
-        ]
-    )
-
-    column_mapping = {
-        'Vayu_Cluster1': 'Meteo ROI (MW)',
-        'Vayu_Cluster2': 'Meteo NI (MW)',
-        'Vayu_402050': 'Meteo TB (MW)',
-        'Vayu_GU_402280': 'Meteo CK (MW)',
-        'Flogas-solar_0587' : 'Meteo LD (MW)',
-        'Vayu_0275': 'Meteo CD (MW)',
-        'Flogas-solar_0378__': 'Meteo DT (MW)',
-        'Vayu_GEN_504260': 'Meteo MUR (MW)',
-        'Flogas-solar_0670' : 'Meteo S1 (MW)',
-        'Flogas-solar_0684' : 'Meteo S2 (MW)'
-    }
-
-    for facility_id, col_name in column_mapping.items():
-        if facility_id in facility_data:
-            df[col_name] = [facility_data[facility_id].get(ts, 0) for ts in df.index]
-
-    df = df.reset_index().rename(columns={'index': 'time'})
-    df['time'] = df['time'] + pd.to_timedelta('1 hour')
-    df['time'] = df['time'].dt.strftime('%d/%m/%Y %H:%M')
+    df = forecast.frame(FORECAST_FACILITIES, percentile)
+    df.index = df.index + pd.Timedelta(hours=1)
+    df = df.rename_axis('time').reset_index()
 
     df = process_forecast_data(input_date, df)
     df.rename(columns={"time": "DateTime"}, inplace=True)
 
+    # Trading day periods: 23:00 the day before to 22:30 (local labels)
+    if len(df) != 48:
+        raise ValueError(f"Forecast for trading day {input_date} has {len(df)} half-hour periods, expected 48")
     input_date_obj = datetime.strptime(input_date, "%d/%m/%Y")
-    previous_day = input_date_obj - timedelta(days=1)
-    timestamps = []
-    for minute in [0, 30]:
-        timestamp = previous_day.replace(hour=23, minute=minute)
-        timestamps.append(timestamp)
-    for hour in range(0, 23):
-        for minute in [0, 30]:
-            timestamp = input_date_obj.replace(hour=hour, minute=minute)
-            timestamps.append(timestamp)
+    df['DateTime'] = pd.date_range(input_date_obj - timedelta(hours=1), periods=48, freq='30min')
 
-    df['DateTime'] = timestamps
-    df['DateTime'] = df['DateTime'].dt.strftime('%d/%m/%Y %H:%M')
+    # Large unit availability adjustment (off by default)
+    if apply_availability:
+        lsa = large_unit_availability(input_date, events=availability_events)
+        for facility_id, unit in AVAILABILITY_FACILITIES.items():
+            meteo_col = FORECAST_FACILITIES[facility_id]
+            df['Meteo ROI (MW)'] = df['Meteo ROI (MW)'] + 1.158*(df[meteo_col]/lsa[f"{unit['name']} Current Output"])
 
-    temp = df.copy(deep=True)
+    df.loc[:, df.columns != 'DateTime'] = df.loc[:, df.columns != 'DateTime'].round(1)
+    return df
 
-    # Commented out large unit availability - uncomment if needed
-    #  lsa = large_unit_availability(input_date)
-    # df['Meteo ROI (MW)'] = df['Meteo ROI (MW)'] + 1.158*(df['Meteo CD (MW)']/lsa['CD Current Output']) + 1.158*(df['Meteo TB (MW)']/lsa['TB Current Output']) + 1.158*(df['Meteo CK (MW)']/lsa['CK Current Output'])
+def forecast_for_percentile(input_date, percentile):
+    """
+    Generation Forecast table for any percentile band, built from the bands
+    already fetched this run. Only requests Meteologica again if the trading day
+    (or that percentile) was never fetched.
 
-    temp['ROI Linear'] = df['Meteo ROI (MW)']
-    temp['NI Linear'] = df['Meteo NI (MW)']
+    Args:
+        input_date: Trading day in format 'dd/mm/YYYY'
+        percentile: Percentile band, e.g. '10' or 90
 
-    df.loc[:, df.columns != 'DateTime'] = df.loc[:, df.columns != 'DateTime'].round(1)
+    Returns:
+        DataFrame in the Generation Forecast layout
+    """
+    trading_date = datetime.strptime(input_date, "%d/%m/%Y")
+    forecast = cached_forecast(trading_date, percentile)
+    if forecast is None:
+        print(f"[INFO] P{percentile} not fetched yet for {input_date} - requesting it")
+        percentiles = sorted(set(FORECAST_PERCENTILES) | {str(percentile)}, key=float)
+        forecast = fetch_forecast(trading_date, percentiles=percentiles)
 
-    # === SAVE TO EXCEL - DYNAMIC PATH BASED ON TRADING DATE ===
+    return build_forecast_frame(input_date, forecast, percentile=percentile)
+
+def save_forecast_file(df, input_date, lag):
+    """
+    Save a Generation Forecast to the production folder for its trading date.
+    DateTime is written as 'dd/mm/YYYY HH:MM' text, as the loaders expect.
+    A Parquet sidecar with the typed data is written next to the workbook,
+    and the forecast is added to the forecast archive.
+
+    Returns:
+        tuple: (full path, file name)
+    """
     date_obj = datetime.strptime(input_date, "%d/%m/%Y")
     year = str(date_obj.year)
     month = date_obj.strftime("%B")  # Full month name
@@ -449,8 +278,40 @@ def grab_forecast_data(input_date, upload_to_sql=False):
     
     file_name = f"Generation Forecast {date_obj.strftime('%d.%m.%Y')} {lag}.xlsx"
     full_path = output_path / file_name
-    df.to_excel(full_path, index=False)
+    df.assign(DateTime=df['DateTime'].dt.strftime('%d/%m/%Y %H:%M')).to_excel(full_path, index=False)
+    write_forecast_sidecar(df, full_path)
+    archive_forecast(df, date_obj, lag)
     print(f"[OK] File saved: {file_name}")
+    return full_path, file_name
+
+def grab_forecast_data(input_date, upload_to_sql=False, apply_availability=False):
+    """
+    Get generation forecast data and save to production location.
+    Automatically determines lag (D-1, D-2, D-3, etc.) based on trading date.
+
+    Args:
+        input_date: Date string in format 'dd/mm/YYYY' (trading day)
+        upload_to_sql: Boolean - True to upload to Fabric SQL, False to skip upload
+        apply_availability: Boolean - True to apply the large unit availability adjustment
+
+    Returns:
+        tuple: (DataFrame with forecast data, lag_string like 'D-1' or 'D-2')
+    """
+    # Calculate lag dynamically
+    trading_date = datetime.strptime(input_date, "%d/%m/%Y")
+    days_ahead, lag = trading_lag(trading_date)  # e.g., D-1, D-2, D-3
+    
+    print(f"[INFO] Trading Date: {input_date}")
+    print(f"[INFO] Days Ahead: {days_ahead}")
+    print(f"[INFO] Lag: {lag}")
+
+    # Forecast and outage events are independent - fetch them side by side
+    fetched = fetch_all(trading_date, include_availability=apply_availability)
+    df = build_forecast_frame(input_date, fetched.forecast, apply_availability=apply_availability,
+                              availability_events=fetched.availability)
+
+    # === SAVE TO EXCEL - DYNAMIC PATH BASED ON TRADING DATE ===
+    full_path, file_name = save_forecast_file(df, input_date, lag)
 
     # === UPLOAD TO FABRIC (ONLY IF ENABLED) ===
     upload_success = False
@@ -460,22 +321,106 @@ def grab_forecast_data(input_date, upload_to_sql=False):
     else:
         print("[SKIP] SQL upload disabled")
 
-    logout_req_type = client.get_type('ns0:LogoutReq')(
-        header={'sessionToken': session_token})
-    client.service.logout(request=logout_req_type)
-
     return df, lag, upload_success  # Return both forecast, lag string, and upload status
 
+def grab_forecast_window(input_date, extra_days, lags=None, upload_to_sql=False, apply_availability=False,
+                         upload_days=None):
+    """
+    Get the forecast for trading days D..D+extra_days with ONE Meteologica request,
+    split it into 23:00-22:30 trading-day frames and save a lag file for each day.
+
+    Args:
+        input_date: First trading day in format 'dd/mm/YYYY'
+        extra_days: Number of trading days after input_date to include
+        lags: Optional lag labels per day (default: computed from today, as in grab_forecast_data)
+        upload_to_sql: Boolean - True to upload to Fabric SQL
+        apply_availability: Boolean - True to apply the large unit availability adjustment
+        upload_days: Number of leading trading days to upload when upload_to_sql is set
+                     (default: every day in the window)
+
+    Returns:
+        list of tuples: (date string, DataFrame, lag string, upload status) per trading day
+    """
+    first_date = datetime.strptime(input_date, "%d/%m/%Y")
+    trading_dates = [first_date + timedelta(days=i) for i in range(extra_days + 1)]
+    if lags is None:
+        lags = [trading_lag(d)[1] for d in trading_dates]
+    if len(lags) != len(trading_dates):
+        raise ValueError(f"Expected {len(trading_dates)} lag labels, got {len(lags)}")
+
+    print(f"[INFO] Forecast window: {input_date} + {extra_days} days ({', '.join(lags)})")
+    fetched = fetch_all(trading_dates[0], trading_dates[-1], include_availability=apply_availability)
+
+    results = []
+    days = zip(trading_dates, split_trading_days(fetched.forecast, trading_dates), lags)
+    for index, (trading_date, day_forecast, lag) in enumerate(days):
+        date_str = trading_date.strftime("%d/%m/%Y")
+        df = build_forecast_frame(date_str, day_forecast, apply_availability=apply_availability,
+                                  availability_events=fetched.availability)
+        full_path, file_name = save_forecast_file(df, date_str, lag)
+
+        upload_success = False
+        if upload_to_sql and (upload_days is None or index < upload_days):
+            print(f"[UPLOAD] Uploading {file_name} to Fabric SQL...")
+            upload_success = upload_to_fabric(df, file_name)
+
+        results.append((date_str, df, lag, upload_success))
+
+    return results
+
 
 # ==========================================
-# 4. MURLEY GU COMPILER CLASS
+# 4. GENERATOR UNIT (GU) COMPILER CLASS
 # ==========================================
-class MurleyGUCompiler:
-    def __init__(self):
+# Generator units: unit -> Generation Forecast column it bids, chart title and colour.
+# Price ladders come from FES_Price_Ladder (GU family unless the unit has its own)
+GU_UNITS = {
+    "GU_504260": {"forecast": "Meteo MUR (MW)", "name": "Murley GU504260", "color": "#1f77b4"},
+}
+
+
+class CompilerOutput:
+    """
+    Console output of a compiler. Compilers log through self.log, which prints to
+    the writer they were given (the console by default), so compilers running side
+    by side can each keep their own log (see run_in_parallel).
+    """
+
+    output = None
+
+    def log(self, *args, **kwargs):
+        """print() to this compiler's output"""
+        print(*args, file=self.output or sys.stdout, **kwargs)
+
+
+class GeneratorUnitCompiler(CompilerOutput):
+    """
+    Bids for one or more generator units in one pass.
+
+    The traders table holds one column per unit (negative generation = sell),
+    the ETS/DAM bids of all units sharing a price ladder are built from that
+    (period x unit) matrix at once, every unit gets its own files and chart,
+    and all units go to Fabric as one upload.
+    """
+
+    def __init__(self, units=None, output=None):
+        """
+        Args:
+            units: Unit ids from GU_UNITS (default: all of them)
+            output: Writer for the console log (default: sys.stdout)
+        """
+        self.output = output
         self.cwd = Path.cwd()
-        self.fabric_server = (
-            "g3hsqkj33hsejptu6vliyt5gny-6novrz7kmrcuriuozi2uqi5sy4.datawarehouse.fabric.microsoft.com"
-        )
+        self.fabric_server = FABRIC_SERVER
+        self.units = list(GU_UNITS) if units is None else list(units)
+        unknown = [unit for unit in self.units if unit not in GU_UNITS]
+        if unknown:
+            raise ValueError(f"Unknown generator unit(s) {unknown} (expected one of {list(GU_UNITS)})")
+
+    @property
+    def forecast_columns(self):
+        """Generation Forecast column of each unit, in unit order"""
+        return [GU_UNITS[unit]["forecast"] for unit in self.units]
 
     def find_gen_file(self, bid_date, lag="D-1"):
         """Finds Generation Forecast BID_DATE {lag}.xlsx"""
@@ -487,24 +432,35 @@ class MurleyGUCompiler:
         gen_base = Path(r"I:\Daily Generation Forecasts\Daily Generation to Submit")
         gen_file = gen_base / year / month / f"Generation Forecast {day_str} {lag}.xlsx"
 
-        print(f"Looking for: {gen_file}")
+        self.log(f"Looking for: {gen_file}")
         if not gen_file.exists():
             raise FileNotFoundError(f"Not found: {gen_file}")
 
         return gen_file
 
-    def load_gen_data(self, bid_date, lag="D-1"):
-        """Load generation forecast"""
+    def load_gen_data(self, bid_date, lag="D-1", percentile=None, forecast_df=None):
+        """
+        Load generation forecast: the in-memory forecast from grab_forecast_data if given,
+        another percentile band if requested, otherwise the saved file
+        """
+        if forecast_df is not None and percentile is None:
+            self.log(f"Using in-memory generation forecast ({len(forecast_df)} rows)")
+            return forecast_df.sort_values("DateTime")
+
+        if percentile is not None:
+            df = forecast_for_percentile(bid_date, percentile)
+            self.log(f"Loaded {len(df)} rows from P{percentile} generation forecast")
+            return df.sort_values("DateTime")
+
         gen_file = self.find_gen_file(bid_date, lag)
-        df = pd.read_excel(gen_file)
+        df = read_generation_forecast(gen_file, columns=self.forecast_columns)
 
-        print(f"Loaded {len(df)} rows from generation forecast")
-        df["DateTime"] = pd.to_datetime(df["DateTime"], format="%d/%m/%Y %H:%M")
+        self.log(f"Loaded {len(df)} rows from generation forecast")
         return df.sort_values("DateTime")
 
-    def create_aggregation(self, bid_date, lag="D-1"):
+    def create_aggregation(self, bid_date, lag="D-1", percentile=None, forecast_df=None):
         """Create GU Traders Table"""
-        gen_df = self.load_gen_data(bid_date, lag)
+        gen_df = self.load_gen_data(bid_date, lag, percentile, forecast_df)
 
         # Trading day starts at 23:00 on D-1
         delivery_date = datetime.strptime(bid_date, "%d/%m/%Y")
@@ -513,93 +469,85 @@ class MurleyGUCompiler:
 
         agg_df = pd.DataFrame({"DateTime": times})
 
-        # Merge generation data
-        gen_df["time_str"] = gen_df["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
+        # Merge generation data (all units' forecast columns at once)
+        gen_merge = gen_df[["DateTime"] + self.forecast_columns].copy()
+        gen_merge["time_str"] = gen_merge["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
         agg_df["time_str"] = agg_df["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
 
-        gen_merge = gen_df[["time_str", "Meteo MUR (MW)"]].copy()
-
-        agg_df = agg_df.merge(gen_merge, on="time_str", how="left").fillna(0.0)
-        agg_df.drop("time_str", axis=1, inplace=True)
+        merged = agg_df.merge(gen_merge.drop(columns="DateTime"), on="time_str", how="left").fillna(0.0)
 
-        # GU traders table format - round to 1 decimal
-        agg_df["GU_504260"] = (-agg_df["Meteo MUR (MW)"]).round(1)
+        # GU traders table format - one column per unit, round to 1 decimal
+        bids = (-merged[self.forecast_columns].to_numpy(dtype=float)).round(1)
+        agg_df = pd.DataFrame({"DateTime": merged["DateTime"]})
+        agg_df[self.units] = bids
         agg_df["Price"] = ""
         agg_df["Time"] = agg_df["DateTime"].dt.strftime("%H:%M")
 
-        return agg_df[["DateTime", "GU_504260", "Price", "Time"]]
+        return agg_df
 
-    def generate_ets_bids(self, agg_df):
-        """ETS bids format - GU always sells at columns 3&4 only
-        
-        GU Logic (based on actual Excel output):
-        - Columns 1&2 must be EMPTY (not 0) to avoid ETS rejection
-        - Columns 3&4 contain the negative quantity
+    def unit_table(self, agg_df, unit):
+        """Traders table of one unit (DateTime, unit, Price, Time)"""
+        return agg_df[["DateTime", unit, "Price", "Time"]]
+
+    def generate_bids(self, agg_df, output):
+        """
+        Bids of every unit for one output, built per price ladder over the (period x unit) matrix.
+
+        Args:
+            agg_df: GU traders table (create_aggregation)
+            output: "ets" or "dam"
+
+        Returns:
+            dict unit -> bid DataFrame, in unit order
         """
-        ets_data = []
-
-        for i, row in agg_df.iterrows():
-            qty = row["GU_504260"]
-            # GU always selling - values only in columns 3&4, columns 1&2 are EMPTY
-            ets_data.append([
-                row["Time"],
-                i + 1,
-                0,     # -1500 price: EMPTY (not 0!)
-                0,     # -41.7 price: EMPTY (not 0!)
-                qty,    # -41.7 price: negative quantity
-                qty     # 9000 price: negative quantity (same as column 3)
-            ])
-
-        ets_df = pd.DataFrame(ets_data, columns=["", "Period", "-1500", "-41.7", "-41.7", "9000"])
-        return ets_df
+        by_ladder = {}
+        for unit in self.units:
+            by_ladder.setdefault(ladder_for(unit, output), []).append(unit)
+
+        bids = {}
+        for ladder, units in by_ladder.items():
+            frames = ladder.frames(agg_df[units].to_numpy(dtype=float), agg_df["DateTime"], agg_df.index + 1)
+            bids.update(zip(units, frames))
+        return {unit: bids[unit] for unit in self.units}
+
+    def generate_ets_bids(self, agg_df):
+        """ETS bids format per unit - GU always sells at columns 3&4 only (GU_ETS price ladder)"""
+        return self.generate_bids(agg_df, "ets")
 
     def generate_dam_bids(self, agg_df):
-        """DAM bids CSV format"""
-        dam_rows = []
-        for idx, row in agg_df.iterrows():
-            qty = row["GU_504260"]
-            buy_sell = "SELL" if qty < 0 else "BUY"
-
-            dam_rows.append({
-                "Period": idx + 1,
-                "DateTime": row["DateTime"],
-                "BuySell": buy_sell,
-                "Curve-Price 1": -1500,
-                "Curve-Qty 1": 0.0,
-                "Curve-Price 2": -41.7,
-                "Curve-Qty 2": 0.0,
-                "Curve-Price 3": -41.7,
-                "Curve-Qty 3": abs(qty),
-                "Curve-Price 4": 9000.0,
-                "Curve-Qty 4": abs(qty),
-            })
-        return pd.DataFrame(dam_rows)
+        """DAM bids CSV format per unit (GU_DAM price ladder)"""
+        return self.generate_bids(agg_df, "dam")
 
-    def create_bid_chart(self, agg_df, bid_date):
-        """Create bid submission chart - saved to local output folder"""
+    def create_bid_chart(self, agg_df, bid_date, unit):
+        """Create a unit's bid submission chart - saved to local output folder"""
         output_dir = self.cwd / "output"
         output_dir.mkdir(exist_ok=True)
 
         day_str = datetime.strptime(bid_date, "%d/%m/%Y").strftime("%d.%m.%Y")
 
-        fig, ax = plt.subplots(figsize=(14, 8))
+        # Figure API (no pyplot): each chart has its own Agg canvas, so GU and SU can render concurrently
+        fig = Figure(figsize=(14, 8))
+        ax = fig.subplots()
 
         times = agg_df["DateTime"]
-        bids = agg_df["GU_504260"]
+        bids = agg_df[unit]
+        color = GU_UNITS[unit]["color"]
 
-        ax.plot(times, bids, linewidth=2.5, color='#1f77b4', label='GU_504260 Bids', marker='o', markersize=4)
-        ax.fill_between(times, bids, 0, alpha=0.3, color='#1f77b4')
+        ax.plot(times, bids, linewidth=2.5, color=color, label=f'{unit} Bids', marker='o', markersize=4)
+        ax.fill_between(times, bids, 0, alpha=0.3, color=color)
 
         ax.axhline(y=0, color='red', linestyle='--', linewidth=1, alpha=0.5, label='Zero Line')
 
         ax.set_xlabel('Time', fontsize=14, fontweight='bold')
         ax.set_ylabel('Bid Quantity (MW)', fontsize=14, fontweight='bold')
-        ax.set_title(f'Murley GU504260 Bid Submission\nDelivery Date: {day_str}', 
+        ax.set_title(f'{GU_UNITS[unit]["name"]} Bid Submission\nDelivery Date: {day_str}', 
                      fontsize=16, fontweight='bold', pad=20)
 
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
         ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-        plt.xticks(rotation=45, ha='right')
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
 
         ax.grid(True, alpha=0.3, linestyle='--')
         ax.set_axisbelow(True)
@@ -616,17 +564,25 @@ class MurleyGUCompiler:
                 fontsize=10, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
 
-        plt.tight_layout()
+        fig.tight_layout()
 
-        chart_file = output_dir / f"GU_504260_Bid_Chart_{day_str}.png"
-        plt.savefig(chart_file, dpi=300, bbox_inches='tight')
-        print(f"Chart saved: {chart_file}")
+        chart_file = output_dir / f"{unit}_Bid_Chart_{day_str}.png"
+        fig.savefig(chart_file, dpi=300, bbox_inches='tight')
+        self.log(f"Chart saved: {chart_file}")
 
-        plt.close()
         return chart_file
 
-    def save_files(self, bid_date, agg_df, dam_df, ets_df, lag="D-1"):
-        """Save output files to production locations"""
+    def save_files(self, bid_date, agg_df, dam_bids, ets_bids, lag="D-1"):
+        """Save every unit's output files (dam_bids/ets_bids: dict unit -> bid DataFrame)"""
+        return self._save_units(bid_date, agg_df, dam_bids, ets_bids, lag)
+
+    def _save_units(self, bid_date, agg_df, dam_bids, ets_bids, lag):
+        return {unit: self.save_unit_files(bid_date, unit, self.unit_table(agg_df, unit),
+                                           dam_bids[unit], ets_bids[unit], lag)
+                for unit in self.units}
+
+    def save_unit_files(self, bid_date, unit, agg_df, dam_df, ets_df, lag="D-1"):
+        """Save one unit's output files to production locations"""
         date_obj = datetime.strptime(bid_date, "%d/%m/%Y")
         day_str = date_obj.strftime("%d.%m.%Y")
         year = str(date_obj.year)
@@ -635,7 +591,7 @@ class MurleyGUCompiler:
         # Add totals row for traders table
         totals = pd.Series({
             "DateTime": "",
-            "GU_504260": agg_df["GU_504260"].sum(),
+            unit: agg_df[unit].sum(),
             "Price": "",
             "Time": ""
         })
@@ -644,13 +600,13 @@ class MurleyGUCompiler:
         # === 1. ETS BID FILE ===
         ets_path = Path(rf"I:\ETS Bids\DAM Bids\{year}\{month}\DAM Bids {day_str}")
         ets_path.mkdir(parents=True, exist_ok=True)
-        ets_file = ets_path / f"DAM GU_504260--ALL {lag}.csv"
+        ets_file = ets_path / f"DAM {unit}--ALL {lag}.csv"
         ets_df.to_csv(ets_file, index=False)
 
         # === 2. TRADERS TABLE ===
         traders_path = Path(rf"I:\Day-Ahead Process\Traders' Tables\{year}\{month}")
         traders_path.mkdir(parents=True, exist_ok=True)
-        traders_file = traders_path / f"DAM Traders' Table {day_str} {lag} GU_504260.xlsx"
+        traders_file = traders_path / f"DAM Traders' Table {day_str} {lag} {unit}.xlsx"
         
         with pd.ExcelWriter(traders_file, engine='openpyxl') as writer:
             agg_with_totals.to_excel(writer, index=False, sheet_name='Sheet1')
@@ -662,20 +618,20 @@ class MurleyGUCompiler:
         # === 3. DAM AUCTION RECONCILIATION ===
         auction_path = Path(rf"I:\Auction reconciliation tables\DAM\{year}\{month}\{day_str}")
         auction_path.mkdir(parents=True, exist_ok=True)
-        dam_file = auction_path / f"DAM GU_504260--ALL {lag} GU_504260.csv"
+        dam_file = auction_path / f"DAM {unit}--ALL {lag} {unit}.csv"
         dam_df.to_csv(dam_file, index=False)
 
-        print(f"\nFiles saved:")
-        print(f"  ETS Bid: {ets_file}")
-        print(f"  Traders Table: {traders_file}")
-        print(f"  DAM Auction: {dam_file}")
+        self.log(f"\nFiles saved:")
+        self.log(f"  ETS Bid: {ets_file}")
+        self.log(f"  Traders Table: {traders_file}")
+        self.log(f"  DAM Auction: {dam_file}")
 
-        self.create_bid_chart(agg_df, bid_date)
+        self.create_bid_chart(agg_df, bid_date, unit)
 
         return dam_file, ets_file, traders_file
 
     def upload_to_fabric(self, agg_df, bid_date, lag="D-1", use_production=True):
-        """Upload GU bids to Fabric warehouse
+        """Upload the GU bids of all units to Fabric warehouse (one column per unit, one upload)
         
         Args:
             lag: Lag string (D-1, D-2, etc.) to determine which table to use
@@ -683,13 +639,12 @@ class MurleyGUCompiler:
                            If False, uses test_Bids_Murley (test table)
         
         Returns:
-            bool: True if upload succeeded, False if failed
+            bool: True if the upload was queued, False if it could not be
         """
 
         # Prepare upload dataframe - simple structure for GU
-        upload_df = pd.DataFrame()
-        upload_df["DateTime"] = agg_df["DateTime"]
-        upload_df["GU_504260"] = agg_df["GU_504260"]
+        upload_df = agg_df[["DateTime"] + self.units].copy()
+        upload_df.insert(1, "Lag", lag)
         upload_df["Upload_Timestamp"] = datetime.now()
 
         # Choose table: production (D-1 or D-X) or test
@@ -701,49 +656,43 @@ class MurleyGUCompiler:
         else:
             table_name = "test_Bids_Murley"
 
-        conn_str = (
-            f"Driver={{ODBC Driver 18 for SQL Server}};"
-            f"Server={self.fabric_server};"
-            f"Database=trading_data;"
-            f"Authentication=ActiveDirectoryInteractive;"
-            f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout=60;"
-        )
-        params = urllib.parse.quote_plus(conn_str)
-        engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
-
-        try:
-            upload_df.to_sql(table_name, engine, if_exists="append", index=False, method='multi')
-            print(f"\n[OK] Fabric upload: {len(upload_df)} rows to {table_name}")
-            print(f"[OK] Uploaded columns: DateTime, GU_504260, Upload_Timestamp")
-            return True
-        except Exception as e:
-            print(f"\n[FAIL] Fabric upload failed: {str(e)}")
+        # Queued to the outbox - the background worker uploads and retries
+        if not queue_upload(upload_df, table_name, self.fabric_server, FABRIC_DATABASE):
             return False
+        self.log(f"[OK] Queued columns: DateTime, {', '.join(self.units)}, Upload_Timestamp")
+        return True
 
     def print_analysis(self, agg_df):
         """Print traders table preview and metrics"""
-        print("\n" + "="*70)
-        print("TRADERS TABLE PREVIEW")
-        print("="*70)
-        print(agg_df.head(10).to_string(index=False))
-        print("...")
-        print(agg_df.tail(5).to_string(index=False))
-
-        print("\n" + "="*70)
-        print("SUMMARY METRICS")
-        print("="*70)
-        print(f"Total periods: {len(agg_df)}")
-        print(f"Trading period: {agg_df['DateTime'].min()} to {agg_df['DateTime'].max()}")
-        print(f"\nGU_504260 Statistics:")
-        print(f"  Total: {agg_df['GU_504260'].sum():.2f} MW")
-        print(f"  Average: {agg_df['GU_504260'].mean():.2f} MW")
-        print(f"  Minimum: {agg_df['GU_504260'].min():.2f} MW")
-        print(f"  Maximum: {agg_df['GU_504260'].max():.2f} MW")
-        print(f"  Std Dev: {agg_df['GU_504260'].std():.2f} MW")
-        print("="*70 + "\n")
-
-    def run(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True):
-        """Full workflow execution
+        self.log("\n" + "="*70)
+        self.log("TRADERS TABLE PREVIEW")
+        self.log("="*70)
+        self.log(agg_df.head(10).to_string(index=False))
+        self.log("...")
+        self.log(agg_df.tail(5).to_string(index=False))
+
+        self.log("\n" + "="*70)
+        self.log("SUMMARY METRICS")
+        self.log("="*70)
+        self.log(f"Total periods: {len(agg_df)}")
+        self.log(f"Trading period: {agg_df['DateTime'].min()} to {agg_df['DateTime'].max()}")
+        for unit in self.units:
+            self.log(f"\n{unit} Statistics:")
+            self.log(f"  Total: {agg_df[unit].sum():.2f} MW")
+            self.log(f"  Average: {agg_df[unit].mean():.2f} MW")
+            self.log(f"  Minimum: {agg_df[unit].min():.2f} MW")
+            self.log(f"  Maximum: {agg_df[unit].max():.2f} MW")
+            self.log(f"  Std Dev: {agg_df[unit].std():.2f} MW")
+        self.log("="*70 + "\n")
+
+    def run(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True, percentile=None,
+            forecast_df=None):
+        """Full workflow execution for all units (see run_units)"""
+        return self.run_units(bid_date, lag, upload_sql, use_production, percentile, forecast_df)
+
+    def run_units(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True, percentile=None,
+                  forecast_df=None):
+        """Full workflow execution for all units
         
         Args:
             bid_date: Trading date in DD/MM/YYYY format
@@ -751,53 +700,241 @@ class MurleyGUCompiler:
             upload_sql: Whether to upload to SQL database
             use_production: If True, uses production table (Bids_Murley_D_Minus_1 or D_Minus_X)
                            If False, uses test table (test_Bids_Murley)
+            percentile: Optional forecast percentile to bid (default: the saved P50 file)
+            forecast_df: Optional forecast DataFrame from grab_forecast_data (skips reading the file)
+
+        Returns:
+            (traders table with one column per unit, dict unit -> DAM bids, dict unit -> ETS bids, upload queued)
         """
-        print("\n" + "="*70)
-        print("MURLEY GU504260 BID COMPILATION WORKFLOW")
-        print("="*70)
-        print(f"Trading Day: {bid_date}")
-        print(f"Lag: {lag}")
-        print(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.log("\n" + "="*70)
+        self.log(f"GU BID COMPILATION WORKFLOW: {', '.join(self.units)}")
+        self.log("="*70)
+        self.log(f"Trading Day: {bid_date}")
+        self.log(f"Lag: {lag}")
+        if percentile is not None:
+            self.log(f"Forecast Percentile: P{percentile}")
+        self.log(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         if upload_sql:
             if use_production:
                 table_name = "Bids_Murley_D_Minus_1" if lag == "D-1" else "Bids_Murley_D_Minus_X"
             else:
                 table_name = "test_Bids_Murley"
-            print(f"SQL Upload: ENABLED -> {table_name}")
+            self.log(f"SQL Upload: ENABLED -> {table_name}")
         else:
-            print(f"SQL Upload: DISABLED")
-        print("="*70 + "\n")
+            self.log(f"SQL Upload: DISABLED")
+        self.log("="*70 + "\n")
 
-        agg_df = self.create_aggregation(bid_date, lag)
-        print(f"Aggregation table created: {len(agg_df)} periods")
+        agg_df = self.create_aggregation(bid_date, lag, percentile, forecast_df)
+        self.log(f"Aggregation table created: {len(agg_df)} periods, {len(self.units)} unit(s)")
 
-        dam_df = self.generate_dam_bids(agg_df)
-        ets_df = self.generate_ets_bids(agg_df)
-        print(f"Bid files generated: DAM and ETS formats")
+        dam_bids = self.generate_bids(agg_df, "dam")
+        ets_bids = self.generate_bids(agg_df, "ets")
+        self.log(f"Bid files generated: DAM and ETS formats")
 
-        self.save_files(bid_date, agg_df, dam_df, ets_df, lag)
+        self._save_units(bid_date, agg_df, dam_bids, ets_bids, lag)
 
         upload_success = False
         if upload_sql:
             upload_success = self.upload_to_fabric(agg_df, bid_date, lag, use_production=use_production)
         else:
-            print("[SKIP] SQL upload disabled")
+            self.log("[SKIP] SQL upload disabled")
 
         self.print_analysis(agg_df)
 
-        return agg_df, dam_df, ets_df, upload_success
+        return agg_df, dam_bids, ets_bids, upload_success
+
+
+class MurleyGUCompiler(GeneratorUnitCompiler):
+    """
+    GU_504260 (Murley) only, with the single-unit interface: bids, saved files
+    and run() results are plain DataFrames/tuples rather than dicts per unit.
+    Use run_units() for the multi-unit result shape.
+    """
+
+    unit = "GU_504260"
+
+    def __init__(self, output=None):
+        super().__init__([self.unit], output=output)
+
+    def generate_ets_bids(self, agg_df):
+        """ETS bids format - GU always sells at columns 3&4 only (GU_ETS price ladder)"""
+        return self.generate_bids(agg_df, "ets")[self.unit]
+
+    def generate_dam_bids(self, agg_df):
+        """DAM bids CSV format (GU_DAM price ladder)"""
+        return self.generate_bids(agg_df, "dam")[self.unit]
+
+    def create_bid_chart(self, agg_df, bid_date, unit=None):
+        """Create bid submission chart - saved to local output folder"""
+        return super().create_bid_chart(agg_df, bid_date, unit or self.unit)
+
+    def save_files(self, bid_date, agg_df, dam_df, ets_df, lag="D-1"):
+        """Save all output files to production locations; returns (dam_file, ets_file, traders_file)"""
+        return self.save_unit_files(bid_date, self.unit, self.unit_table(agg_df, self.unit), dam_df, ets_df, lag)
+
+    def run(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True, percentile=None,
+            forecast_df=None):
+        """
+        Full workflow execution
+
+        Returns:
+            (traders table, DAM bids DataFrame, ETS bids DataFrame, upload queued)
+        """
+        agg_df, dam_bids, ets_bids, upload_success = self.run_units(
+            bid_date, lag, upload_sql, use_production, percentile, forecast_df)
+        return agg_df, dam_bids[self.unit], ets_bids[self.unit], upload_success
 
 
 # ==========================================
 # 5. SUPPLY UNIT COMPILER CLASS
 # ==========================================
-class SupplyUnitCompiler:
-    def __init__(self):
-        self.cwd = Path.cwd()
-        self.fabric_server = (
-            "g3hsqkj33hsejptu6vliyt5gny-6novrz7kmrcuriuozi2uqi5sy4.datawarehouse.fabric.microsoft.com"
+# Named SU sites: Generation Forecast column -> traders-table column (generation is negative = supply)
+SU_NAMED_SITES = {
+    "Meteo ROI (MW)": "Adj. ROI Wind (MW)",
+    "Meteo NI (MW)": "Adj. NI Wind (MW)",
+    "Meteo TB (MW)": "Adj. Tullabrack (MW)",
+    "Meteo CK (MW)": "Adj. Cloghaneleskirt (MW)",
+    "Meteo LD (MW)": "Adj. Lisdowney (MW)",
+    "Meteo CD (MW)": "Adj. Curraghderrig (MW)",
+    "Naïve Nonwind (MW)": "Adj. Nonwind (MW)",
+    "Self-forecast (MW)": "Self-forecast (MW)",
+    "Meteo DT (MW)": "Adj. Davidstown (MW)",
+}
+
+# The traders table and the SU Fabric tables always carry slots S1-S25
+SU_MIN_SITE_SLOTS = 25
+
+SU_DEMAND_COLUMNS = ["Adj. QH (MW)", "Adj. NQH (MW)", "Unmetered (MW)"]
+SU_NQH_MW = 0
+SU_UNMETERED_MW = 0.5
+
+
+def su_sites():
+    """SU sites: Generation Forecast column -> traders-table column (named sites, then registry slots S1, S2, ...)"""
+    sites = dict(SU_NAMED_SITES)
+    sites.update({column: f"S{slot}" for slot, column in site_slots().items()})
+    return sites
+
+
+class SupplyUnitPosition:
+    """
+    SU_400130 position for one trading day as a (period x site) matrix.
+
+    Trading Qty (net demand) is a single reduction over the demand and site
+    matrices. Only sites with a non-zero forecast are stored: sites that are
+    zero all day and slots no registered facility feeds are filled in as zeros
+    when the wide traders-table layout is built for output.
+    """
+
+    def __init__(self, times, qh, sites, generation, zero_sites, slot_count):
+        """
+        Args:
+            times: Period start times (datetime64 array)
+            qh: QH demand in MW, rounded to 1 decimal
+            sites: Traders-table columns of the stored sites
+            generation: (periods x sites) generation in MW, negative, rounded to 1 decimal
+            zero_sites: Traders-table columns of registered sites with a zero forecast all day
+            slot_count: Number of S slots in the traders table
+        """
+        self.times = times
+        self.qh = qh
+        self.sites = list(sites)
+        self.generation = generation
+        self.zero_sites = set(zero_sites)
+        self.slot_count = slot_count
+
+        n = len(times)
+        self.demand = np.column_stack([qh, np.full(n, SU_NQH_MW), np.full(n, SU_UNMETERED_MW)])
+        # Columns added left to right (demand, then sites), as the traders table total does
+        self.trading_qty = np.vstack([self.demand.T, generation.T]).sum(axis=0).round(1)
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_frame(cls, df, sites=None, min_slots=SU_MIN_SITE_SLOTS):
+        """
+        Build the position from a frame with DateTime, QH_MW and Generation Forecast columns.
+
+        Args:
+            df: Aligned demand and generation (missing site columns count as zero)
+            sites: Generation Forecast column -> traders-table column (default: su_sites())
+            min_slots: Minimum number of S slots in the traders table
+        """
+        sites = su_sites() if sites is None else sites
+        gen = (-df.reindex(columns=list(sites), fill_value=0.0).to_numpy(dtype=float)).round(1)
+
+        stored = np.any(gen != 0, axis=0)
+        names = list(sites.values())
+        slots = [int(name[1:]) for name in names if name[:1] == "S" and name[1:].isdigit()]
+
+        return cls(
+            times=df["DateTime"].to_numpy(),
+            qh=df["QH_MW"].to_numpy(dtype=float).round(1),
+            sites=[name for name, keep in zip(names, stored) if keep],
+            generation=gen[:, stored],
+            zero_sites=[name for name, keep in zip(names, stored) if not keep],
+            slot_count=max([min_slots, *slots]),
         )
 
+    def site(self, name):
+        """Generation of one site (zeros if it is not stored)"""
+        if name in self.sites:
+            return self.generation[:, self.sites.index(name)]
+        if name in self.zero_sites:
+            return np.zeros(len(self))
+        return np.zeros(len(self), dtype=int)
+
+    def bids(self):
+        """Frame the SU price ladders are applied to (DateTime, SU_400130)"""
+        return pd.DataFrame({"DateTime": self.times, "SU_400130": self.trading_qty})
+
+    def traders_table(self):
+        """Wide SU traders-table layout (demand, named sites, S1..Sn, Trading Qty, SU_400130, Price)"""
+        n = len(self)
+        data = {"DateTime": self.times}
+        data.update(zip(SU_DEMAND_COLUMNS, [self.qh, np.full(n, SU_NQH_MW), np.full(n, SU_UNMETERED_MW)]))
+        for name in SU_NAMED_SITES.values():
+            data[name] = self.site(name)
+        for slot in range(1, self.slot_count + 1):
+            data[f"S{slot}"] = self.site(f"S{slot}")
+        data["Trading Qty (MW)"] = self.trading_qty
+        data["SU_400130"] = self.trading_qty
+        data["Price"] = ""
+        return pd.DataFrame(data)
+
+
+class SupplyUnitCompiler(CompilerOutput):
+    # Generation Forecast columns used in the SU traders table
+    GEN_COLUMNS = list(su_sites())
+
+    # Traders-table column -> Fabric column (with SPACE before underscore); S slots keep their names
+    UPLOAD_COLUMNS = {
+        "Adj. QH (MW)": "Adj. QH _MW_",
+        "Adj. NQH (MW)": "Adj. NQH _MW_",
+        "Unmetered (MW)": "Unmetered _MW_",
+        "Adj. ROI Wind (MW)": "Adj. ROI Wind _MW_",
+        "Adj. NI Wind (MW)": "Adj. NI Wind _MW_",
+        "Adj. Tullabrack (MW)": "Adj. Tullabrack _MW_",
+        "Adj. Cloghaneleskirt (MW)": "Adj. Cloghaneleskirt _MW_",
+        "Adj. Lisdowney (MW)": "Adj. Lisdowney _MW_",
+        "Adj. Curraghderrig (MW)": "Adj. Curraghderrig _MW_",
+        "Adj. Nonwind (MW)": "Adj. Nonwind _MW_",
+        "Self-forecast (MW)": "Self-forecast _MW_",
+        "Adj. Davidstown (MW)": "Adj. Davidstown _MW_",
+        "Trading Qty (MW)": "Trading Qty _MW_",
+        "SU_400130": "SU_400130"
+    }
+
+    def __init__(self, output=None):
+        """
+        Args:
+            output: Writer for the console log (default: sys.stdout)
+        """
+        self.output = output
+        self.cwd = Path.cwd()
+        self.fabric_server = FABRIC_SERVER
+
     def find_demand_file(self, bid_date):
         """Find QH demand file (CSV: 2026-01-18.csv for trading day 18th)"""
         date_obj = datetime.strptime(bid_date, "%d/%m/%Y")
@@ -806,7 +943,7 @@ class SupplyUnitCompiler:
         demand_path = Path(r"I:\Daily Forecasts\Daily Demand Forecast - QH\D-1")
         demand_file = demand_path / file_name
 
-        print(f"Looking for QH Demand: {demand_file}")
+        self.log(f"Looking for QH Demand: {demand_file}")
         if not demand_file.exists():
             raise FileNotFoundError(f"QH Demand file not found: {demand_file}")
 
@@ -822,16 +959,18 @@ class SupplyUnitCompiler:
         gen_base = Path(r"I:\Daily Generation Forecasts\Daily Generation to Submit")
         gen_file = gen_base / year / month / f"Generation Forecast {day_str} {lag}.xlsx"
 
-        print(f"Looking for Generation: {gen_file}")
+        self.log(f"Looking for Generation: {gen_file}")
         if not gen_file.exists():
             raise FileNotFoundError(f"Generation file not found: {gen_file}")
 
         return gen_file
 
-    def load_forecasts(self, bid_date, lag="D-1"):
-        """Load QH demand (CSV) and generation (Excel) forecasts"""
+    def load_forecasts(self, bid_date, lag="D-1", percentile=None, forecast_df=None):
+        """
+        Load QH demand (CSV) and generation forecasts. Generation comes from the
+        in-memory forecast if given, another percentile band if requested, otherwise Excel
+        """
         demand_file = self.find_demand_file(bid_date)
-        gen_file = self.find_gen_file(bid_date, lag)
 
         # Load QH demand from CSV
         demand_df = pd.read_csv(demand_file)
@@ -840,17 +979,22 @@ class SupplyUnitCompiler:
         # Convert kWh to MW: (kWh * 2) / 1000 - keep 1 decimal
         demand_df["QH_MW"] = ((demand_df["Demand"] * 2) / 1000).round(1)
 
-        # Load generation from Excel
-        gen_df = pd.read_excel(gen_file)
-        gen_df["DateTime"] = pd.to_datetime(gen_df["DateTime"], format="%d/%m/%Y %H:%M")
+        # Load generation (requested percentile, in-memory forecast, or the Excel file)
+        if percentile is not None:
+            gen_df = forecast_for_percentile(bid_date, percentile)
+        elif forecast_df is not None:
+            gen_df = forecast_df
+        else:
+            gen_file = self.find_gen_file(bid_date, lag)
+            gen_df = read_generation_forecast(gen_file, columns=self.GEN_COLUMNS)
 
-        print(f"Loaded: QH Demand={len(demand_df)} rows, Generation={len(gen_df)} rows")
+        self.log(f"Loaded: QH Demand={len(demand_df)} rows, Generation={len(gen_df)} rows")
 
         return demand_df.sort_values("DateTime"), gen_df.sort_values("DateTime")
 
-    def create_aggregation(self, bid_date, lag="D-1"):
-        """Create SU Traders Table"""
-        demand_df, gen_df = self.load_forecasts(bid_date, lag)
+    def create_position(self, bid_date, lag="D-1", percentile=None, forecast_df=None):
+        """SU position (period x site matrix) for the trading day"""
+        demand_df, gen_df = self.load_forecasts(bid_date, lag, percentile, forecast_df)
 
         # Trading day starts at 23:00 on D-1
         delivery_date = datetime.strptime(bid_date, "%d/%m/%Y")
@@ -861,144 +1005,33 @@ class SupplyUnitCompiler:
 
         # Merge data
         demand_df["time_str"] = demand_df["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
+        gen_df = gen_df.reindex(columns=["DateTime"] + self.GEN_COLUMNS)
         gen_df["time_str"] = gen_df["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
         agg_df["time_str"] = agg_df["DateTime"].dt.strftime("%d/%m/%Y %H:%M")
 
-        # Merge QH demand
+        # Merge QH demand and generation columns (sites missing from the forecast count as zero)
         agg_df = agg_df.merge(demand_df[["time_str", "QH_MW"]], on="time_str", how="left")
+        agg_df = agg_df.merge(gen_df[["time_str"] + self.GEN_COLUMNS], on="time_str", how="left").fillna(0.0)
 
-        # Merge generation columns
-        gen_merge = gen_df[[
-            "time_str", "Meteo ROI (MW)", "Meteo NI (MW)", "Meteo TB (MW)",
-            "Meteo CK (MW)", "Meteo LD (MW)", "Meteo CD (MW)", 
-            "Naïve Nonwind (MW)", "Self-forecast (MW)", "Meteo DT (MW)",
-            "Meteo S1 (MW)", "Meteo S2 (MW)"
-        ]].copy()
-
-        agg_df = agg_df.merge(gen_merge, on="time_str", how="left").fillna(0.0)
-        agg_df.drop("time_str", axis=1, inplace=True)
-
-        # Build Traders Table columns with proper rounding
-        agg_df["Adj. QH (MW)"] = agg_df["QH_MW"].round(1)
-        agg_df["Adj. NQH (MW)"] = 0
-        agg_df["Unmetered (MW)"] = 0.5
-
-        # Generation (negative = supply) - round to 1 decimal
-        agg_df["Adj. ROI Wind (MW)"] = (-agg_df["Meteo ROI (MW)"]).round(1)
-        agg_df["Adj. NI Wind (MW)"] = (-agg_df["Meteo NI (MW)"]).round(1)
-        agg_df["Adj. Tullabrack (MW)"] = (-agg_df["Meteo TB (MW)"]).round(1)
-        agg_df["Adj. Cloghaneleskirt (MW)"] = (-agg_df["Meteo CK (MW)"]).round(1)
-        agg_df["Adj. Lisdowney (MW)"] = (-agg_df["Meteo LD (MW)"]).round(1)
-        agg_df["Adj. Curraghderrig (MW)"] = (-agg_df["Meteo CD (MW)"]).round(1)
-        agg_df["Adj. Nonwind (MW)"] = (-agg_df["Naïve Nonwind (MW)"]).round(1)
-        agg_df["Self-forecast (MW)"] = (-agg_df["Self-forecast (MW)"]).round(1)
-        agg_df["Adj. Davidstown (MW)"] = (-agg_df["Meteo DT (MW)"]).round(1)
-
-        # S1-S25 columns
-        for i in range(1, 26):
-            if i <= 2:
-                agg_df[f"S{i}"] = (-agg_df[f"Meteo S{i} (MW)"]).round(1)
-            else:
-                agg_df[f"S{i}"] = 0
-
-        # Trading Qty = Net Demand
-        demand_cols = ["Adj. QH (MW)", "Adj. NQH (MW)", "Unmetered (MW)"]
-        gen_cols = ["Adj. ROI Wind (MW)", "Adj. NI Wind (MW)", "Adj. Tullabrack (MW)",
-                    "Adj. Cloghaneleskirt (MW)", "Adj. Lisdowney (MW)", "Adj. Curraghderrig (MW)",
-                    "Adj. Nonwind (MW)", "Self-forecast (MW)", "Adj. Davidstown (MW)"] + [f"S{i}" for i in range(1, 26)]
-
-        agg_df["Trading Qty (MW)"] = agg_df[demand_cols + gen_cols].sum(axis=1).round(1)
-        agg_df["SU_400130"] = agg_df["Trading Qty (MW)"]
-        agg_df["Price"] = ""
-
-        # Reorder columns
-        final_cols = (["DateTime"] + demand_cols + 
-                      ["Adj. ROI Wind (MW)", "Adj. NI Wind (MW)", "Adj. Tullabrack (MW)",
-                       "Adj. Cloghaneleskirt (MW)", "Adj. Lisdowney (MW)", "Adj. Curraghderrig (MW)",
-                       "Adj. Nonwind (MW)", "Self-forecast (MW)", "Adj. Davidstown (MW)"] + 
-                      [f"S{i}" for i in range(1, 26)] + 
-                      ["Trading Qty (MW)", "SU_400130", "Price"])
+        return SupplyUnitPosition.from_frame(agg_df)
 
-        return agg_df[final_cols]
+    def create_aggregation(self, bid_date, lag="D-1", percentile=None, forecast_df=None):
+        """Create SU Traders Table"""
+        return self.create_position(bid_date, lag, percentile, forecast_df).traders_table()
 
     def generate_ets_bids(self, agg_df):
-        """ETS bids - SU format matching Excel VBA output exactly
+        """ETS bids - SU format matching Excel VBA output exactly (SU_ETS price ladder)
         
         VBA Logic:
         - Column 1 (-500 price): ALWAYS contains the bid quantity (negative or positive)
         - When SELLING (negative): Column 4 (4000 price) also gets the same negative value
         - When BUYING (positive): Column 2 (500 price) also gets the same positive value
         """
-        ets_data = []
-
-        for i, row in agg_df.iterrows():
-            qty = row["SU_400130"]
-            
-            if qty < 0:  # SELLING (excess generation)
-                # Column 1 has the negative value, Column 4 has same negative value
-                # Columns 2&3 must be EMPTY (not 0) to avoid ETS rejection
-                ets_data.append([
-                    row["DateTime"].strftime("%H:%M:%S"),
-                    i + 1,
-                    qty,           # -500 price: negative quantity
-                    "",            # 500 price: EMPTY (not 0!)
-                    "",            # 500 price: EMPTY (not 0!)
-                    qty            # 4000 price: negative quantity (same as column 1)
-                ])
-            else:  # BUYING (demand exceeds generation)
-                # Column 1 and Column 2 both have positive value
-                # Columns 3&4 are 0 (matching VBA output)
-                ets_data.append([
-                    row["DateTime"].strftime("%H:%M:%S"),
-                    i + 1,
-                    qty,           # -500 price: positive quantity
-                    qty,           # 500 price: positive quantity (same as column 1)
-                    0,             # 500 price: 0
-                    0              # 4000 price: 0
-                ])
-
-        ets_df = pd.DataFrame(ets_data, columns=["", "Period", "-500", "500", "500", "4000"])
-        return ets_df
+        return build_bids("SU_400130", "ets", agg_df["SU_400130"], agg_df["DateTime"], agg_df.index + 1)
 
     def generate_dam_bids(self, agg_df):
-        """DAM bids CSV with correct price placement logic (matching VBA)"""
-        dam_rows = []
-        for idx, row in agg_df.iterrows():
-            qty = row["SU_400130"]
-            abs_qty = abs(qty)  # Always work with absolute values
-            
-            # VBA Logic - quantities are ALWAYS positive
-            # Sign only determines placement
-            
-            if qty < 0:  # SELLING
-                dam_rows.append({
-                    "Period": idx + 1,
-                    "DateTime": row["DateTime"],
-                    "BuySell": "SELL",
-                    "Curve-Price 1": -500,
-                    "Curve-Qty 1": 0.0,
-                    "Curve-Price 2": 500,
-                    "Curve-Qty 2": 0.0,
-                    "Curve-Price 3": 500,
-                    "Curve-Qty 3": abs_qty,  # POSITIVE quantity
-                    "Curve-Price 4": 4000,
-                    "Curve-Qty 4": abs_qty,  # POSITIVE quantity
-                })
-            else:  # BUYING
-                dam_rows.append({
-                    "Period": idx + 1,
-                    "DateTime": row["DateTime"],
-                    "BuySell": "BUY",
-                    "Curve-Price 1": -500,
-                    "Curve-Qty 1": abs_qty,  # POSITIVE quantity
-                    "Curve-Price 2": 500,
-                    "Curve-Qty 2": abs_qty,  # POSITIVE quantity
-                    "Curve-Price 3": 500,
-                    "Curve-Qty 3": 0.0,
-                    "Curve-Price 4": 4000,
-                    "Curve-Qty 4": 0.0,
-                })
-        return pd.DataFrame(dam_rows)
+        """DAM bids CSV with correct price placement logic (matching VBA, SU_DAM price ladder)"""
+        return build_bids("SU_400130", "dam", agg_df["SU_400130"], agg_df["DateTime"], agg_df.index + 1)
 
     def create_bid_chart(self, agg_df, bid_date):
         """Create SU bid chart - saved to local output folder"""
@@ -1007,7 +1040,9 @@ class SupplyUnitCompiler:
 
         day_str = datetime.strptime(bid_date, "%d/%m/%Y").strftime("%d.%m.%Y")
 
-        fig, ax = plt.subplots(figsize=(14, 8))
+        # Figure API (no pyplot): each chart has its own Agg canvas, so GU and SU can render concurrently
+        fig = Figure(figsize=(14, 8))
+        ax = fig.subplots()
 
         times = agg_df["DateTime"]
         bids = agg_df["SU_400130"]
@@ -1024,7 +1059,9 @@ class SupplyUnitCompiler:
 
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
         ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-        plt.xticks(rotation=45, ha='right')
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
 
         ax.grid(True, alpha=0.3, linestyle='--')
         ax.set_axisbelow(True)
@@ -1041,13 +1078,12 @@ class SupplyUnitCompiler:
                 fontsize=10, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         chart_file = output_dir / f"SU_400130_Bid_Chart_{day_str}.png"
-        plt.savefig(chart_file, dpi=300, bbox_inches='tight')
-        print(f"Chart saved: {chart_file}")
+        fig.savefig(chart_file, dpi=300, bbox_inches='tight')
+        self.log(f"Chart saved: {chart_file}")
 
-        plt.close()
         return chart_file
 
     def save_files(self, bid_date, agg_df, dam_df, ets_df, lag="D-1"):
@@ -1061,7 +1097,7 @@ class SupplyUnitCompiler:
         totals = agg_df.select_dtypes(include=['number']).sum()
         totals["DateTime"] = ""
 
-        net_demand_row = pd.Series({col: "" for col in agg_df.columns})
+        net_demand_row = pd.Series({col: "" for col in agg_df.columns}, dtype=object)
         net_demand_row["DateTime"] = "Net Demand"
         net_demand_row["Trading Qty (MW)"] = totals["Trading Qty (MW)"]
 
@@ -1094,10 +1130,10 @@ class SupplyUnitCompiler:
         dam_file = auction_path / f"DAM SU_400130--ALL {lag} SU_400130.csv"
         dam_df.to_csv(dam_file, index=False)
 
-        print(f"\nFiles saved:")
-        print(f"  ETS Bid: {ets_file}")
-        print(f"  Traders Table: {traders_file}")
-        print(f"  DAM Auction: {dam_file}")
+        self.log(f"\nFiles saved:")
+        self.log(f"  ETS Bid: {ets_file}")
+        self.log(f"  Traders Table: {traders_file}")
+        self.log(f"  DAM Auction: {dam_file}")
 
         self.create_bid_chart(agg_df, bid_date)
 
@@ -1111,46 +1147,13 @@ class SupplyUnitCompiler:
                            If False, uses test_Bids_SU (test table)
         
         Returns:
-            bool: True if upload succeeded, False if failed
+            bool: True if the upload was queued, False if it could not be
         """
 
         # Prepare upload dataframe with database column names
-        upload_df = pd.DataFrame()
-        upload_df["DateTime"] = agg_df["DateTime"]
-
-        # Map Python column names to database column names (with SPACE before underscore)
-        column_mapping = {
-            "Adj. QH (MW)": "Adj. QH _MW_",
-            "Adj. NQH (MW)": "Adj. NQH _MW_",
-            "Unmetered (MW)": "Unmetered _MW_",
-            "Adj. ROI Wind (MW)": "Adj. ROI Wind _MW_",
-            "Adj. NI Wind (MW)": "Adj. NI Wind _MW_",
-            "Adj. Tullabrack (MW)": "Adj. Tullabrack _MW_",
-            "Adj. Cloghaneleskirt (MW)": "Adj. Cloghaneleskirt _MW_",
-            "Adj. Lisdowney (MW)": "Adj. Lisdowney _MW_",
-            "Adj. Curraghderrig (MW)": "Adj. Curraghderrig _MW_",
-            "Adj. Nonwind (MW)": "Adj. Nonwind _MW_",
-            "Self-forecast (MW)": "Self-forecast _MW_",
-            "Adj. Davidstown (MW)": "Adj. Davidstown _MW_",
-            "Trading Qty (MW)": "Trading Qty _MW_",
-            "SU_400130": "SU_400130"
-        }
-
-        # Add mapped columns
-        for src_col, db_col in column_mapping.items():
-            if src_col in agg_df.columns:
-                upload_df[db_col] = agg_df[src_col]
-            else:
-                upload_df[db_col] = None
-
-        # Add S1-S25 columns
-        for i in range(1, 26):
-            col_name = f"S{i}"
-            if col_name in agg_df.columns:
-                upload_df[col_name] = agg_df[col_name]
-            else:
-                upload_df[col_name] = None
-
+        slots = [col for col in agg_df.columns if col[:1] == "S" and col[1:].isdigit()]
+        upload_df = agg_df[["DateTime"] + list(self.UPLOAD_COLUMNS) + slots].rename(columns=self.UPLOAD_COLUMNS)
+        upload_df.insert(1, "Lag", lag)
         upload_df["Upload_Timestamp"] = datetime.now()
 
         # Choose table: production (D-1 or D-X) or test
@@ -1162,74 +1165,62 @@ class SupplyUnitCompiler:
         else:
             table_name = "test_Bids_SU"
 
-        # Connect to Fabric
-        conn_str = (
-            f"Driver={{ODBC Driver 18 for SQL Server}};"
-            f"Server={self.fabric_server};"
-            f"Database=trading_data;"
-            f"Authentication=ActiveDirectoryInteractive;"
-            f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout=60;"
-        )
-        params = urllib.parse.quote_plus(conn_str)
-        engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
-
-        try:
-            upload_df.to_sql(table_name, engine, if_exists="append", index=False, method='multi')
-            print(f"\n{'='*70}")
-            print("[OK] FABRIC UPLOAD SUCCESSFUL")
-            print(f"{'='*70}")
-            print(f"Table: {table_name}")
-            print(f"Rows uploaded: {len(upload_df)}")
-            print(f"Columns: {len(upload_df.columns)} (DateTime, Demand, Generation, S1-S25, SU_400130, Upload_Timestamp)")
-            print(f"Time range: {upload_df['DateTime'].min()} to {upload_df['DateTime'].max()}")
-            print(f"{'='*70}")
-            return True
-        except Exception as e:
-            print(f"\n{'='*70}")
-            print("[FAIL] FABRIC UPLOAD FAILED")
-            print(f"{'='*70}")
-            print(f"Error: {str(e)}")
-            print(f"{'='*70}")
+        # Queued to the outbox - the background worker uploads and retries
+        if not queue_upload(upload_df, table_name, self.fabric_server, FABRIC_DATABASE):
+            self.log(f"\n{'='*70}")
+            self.log("[FAIL] FABRIC UPLOAD NOT QUEUED")
+            self.log(f"{'='*70}")
             return False
 
+        self.log(f"\n{'='*70}")
+        self.log("[OK] FABRIC UPLOAD QUEUED")
+        self.log(f"{'='*70}")
+        self.log(f"Table: {table_name}")
+        self.log(f"Rows queued: {len(upload_df)}")
+        self.log(f"Columns: {len(upload_df.columns)} (DateTime, Demand, Generation, S1-S{len(slots)}, SU_400130, Upload_Timestamp)")
+        self.log(f"Time range: {upload_df['DateTime'].min()} to {upload_df['DateTime'].max()}")
+        self.log(f"{'='*70}")
+        return True
+
     def print_analysis(self, agg_df):
         """Print traders table preview and metrics"""
-        print("\n" + "="*70)
-        print("TRADERS TABLE PREVIEW")
-        print("="*70)
+        self.log("\n" + "="*70)
+        self.log("TRADERS TABLE PREVIEW")
+        self.log("="*70)
 
         # Select key columns for preview
         preview_cols = ["DateTime", "Adj. QH (MW)", "Adj. ROI Wind (MW)", 
                         "Adj. NI Wind (MW)", "Adj. Nonwind (MW)", "Trading Qty (MW)", "SU_400130"]
 
-        print(agg_df[preview_cols].head(10).to_string(index=False))
-        print("...")
-        print(agg_df[preview_cols].tail(5).to_string(index=False))
-
-        print("\n" + "="*70)
-        print("SUMMARY METRICS")
-        print("="*70)
-        print(f"Total periods: {len(agg_df)}")
-        print(f"Trading period: {agg_df['DateTime'].min()} to {agg_df['DateTime'].max()}")
-
-        print(f"\nDemand Statistics:")
-        print(f"  QH Total: {agg_df['Adj. QH (MW)'].sum():.2f} MW")
-        print(f"  QH Average: {agg_df['Adj. QH (MW)'].mean():.2f} MW")
-
-        print(f"\nGeneration Statistics:")
-        print(f"  ROI Wind Total: {agg_df['Adj. ROI Wind (MW)'].sum():.2f} MW")
-        print(f"  NI Wind Total: {agg_df['Adj. NI Wind (MW)'].sum():.2f} MW")
-        print(f"  Nonwind Total: {agg_df['Adj. Nonwind (MW)'].sum():.2f} MW")
-
-        print(f"\nNet Position (SU_400130):")
-        print(f"  Total: {agg_df['SU_400130'].sum():.2f} MW")
-        print(f"  Average: {agg_df['SU_400130'].mean():.2f} MW")
-        print(f"  Minimum: {agg_df['SU_400130'].min():.2f} MW")
-        print(f"  Maximum: {agg_df['SU_400130'].max():.2f} MW")
-        print(f"  Std Dev: {agg_df['SU_400130'].std():.2f} MW")
-        print("="*70 + "\n")
-
-    def run(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True):
+        self.log(agg_df[preview_cols].head(10).to_string(index=False))
+        self.log("...")
+        self.log(agg_df[preview_cols].tail(5).to_string(index=False))
+
+        self.log("\n" + "="*70)
+        self.log("SUMMARY METRICS")
+        self.log("="*70)
+        self.log(f"Total periods: {len(agg_df)}")
+        self.log(f"Trading period: {agg_df['DateTime'].min()} to {agg_df['DateTime'].max()}")
+
+        self.log(f"\nDemand Statistics:")
+        self.log(f"  QH Total: {agg_df['Adj. QH (MW)'].sum():.2f} MW")
+        self.log(f"  QH Average: {agg_df['Adj. QH (MW)'].mean():.2f} MW")
+
+        self.log(f"\nGeneration Statistics:")
+        self.log(f"  ROI Wind Total: {agg_df['Adj. ROI Wind (MW)'].sum():.2f} MW")
+        self.log(f"  NI Wind Total: {agg_df['Adj. NI Wind (MW)'].sum():.2f} MW")
+        self.log(f"  Nonwind Total: {agg_df['Adj. Nonwind (MW)'].sum():.2f} MW")
+
+        self.log(f"\nNet Position (SU_400130):")
+        self.log(f"  Total: {agg_df['SU_400130'].sum():.2f} MW")
+        self.log(f"  Average: {agg_df['SU_400130'].mean():.2f} MW")
+        self.log(f"  Minimum: {agg_df['SU_400130'].min():.2f} MW")
+        self.log(f"  Maximum: {agg_df['SU_400130'].max():.2f} MW")
+        self.log(f"  Std Dev: {agg_df['SU_400130'].std():.2f} MW")
+        self.log("="*70 + "\n")
+
+    def run(self, bid_date="21/01/2026", lag="D-1", upload_sql=False, use_production=True, percentile=None,
+            forecast_df=None):
         """Full SU workflow
         
         Args:
@@ -1238,37 +1229,45 @@ class SupplyUnitCompiler:
             upload_sql: Whether to upload to SQL database
             use_production: If True, uses production table (Bids_SU_D_Minus_1 or D_Minus_X)
                            If False, uses test table (test_Bids_SU)
+            percentile: Optional forecast percentile to bid (default: the saved P50 file)
+            forecast_df: Optional forecast DataFrame from grab_forecast_data (skips reading the file)
         """
-        print("\n" + "="*70)
-        print("SUPPLY UNIT SU400130 BID COMPILATION WORKFLOW")
-        print("="*70)
-        print(f"Trading Day: {bid_date}")
-        print(f"Lag: {lag}")
-        print(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self.log("\n" + "="*70)
+        self.log("SUPPLY UNIT SU400130 BID COMPILATION WORKFLOW")
+        self.log("="*70)
+        self.log(f"Trading Day: {bid_date}")
+        self.log(f"Lag: {lag}")
+        if percentile is not None:
+            self.log(f"Forecast Percentile: P{percentile}")
+        self.log(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         if upload_sql:
             if use_production:
                 table_name = "Bids_SU_D_Minus_1" if lag == "D-1" else "Bids_SU_D_Minus_X"
             else:
                 table_name = "test_Bids_SU"
-            print(f"SQL Upload: ENABLED -> {table_name}")
+            self.log(f"SQL Upload: ENABLED -> {table_name}")
         else:
-            print(f"SQL Upload: DISABLED")
-        print("="*70 + "\n")
+            self.log(f"SQL Upload: DISABLED")
+        self.log("="*70 + "\n")
 
-        agg_df = self.create_aggregation(bid_date, lag)
-        print(f"Aggregation table created: {len(agg_df)} periods")
+        position = self.create_position(bid_date, lag, percentile, forecast_df)
+        self.log(f"Aggregation table created: {len(position)} periods, "
+              f"{len(position.sites)} sites with generation ({len(position.zero_sites)} at zero)")
 
-        dam_df = self.generate_dam_bids(agg_df)
-        ets_df = self.generate_ets_bids(agg_df)
-        print(f"Bid files generated: DAM and ETS formats")
+        bids_df = position.bids()
+        dam_df = self.generate_dam_bids(bids_df)
+        ets_df = self.generate_ets_bids(bids_df)
+        self.log(f"Bid files generated: DAM and ETS formats")
 
+        # Wide traders-table layout only for the output files, chart and upload
+        agg_df = position.traders_table()
         self.save_files(bid_date, agg_df, dam_df, ets_df, lag)
 
         upload_success = False
         if upload_sql:
             upload_success = self.upload_to_fabric(agg_df, lag, use_production=use_production)
         else:
-            print("[SKIP] SQL upload disabled")
+            self.log("[SKIP] SQL upload disabled")
 
         self.print_analysis(agg_df)
 
@@ -1276,9 +1275,46 @@ class SupplyUnitCompiler:
 
 
 # ==========================================
-# 6. POWERPOINT GENERATION FUNCTION
+# 6. PARALLEL BID COMPILATION
+# ==========================================
+def run_in_parallel(jobs, wait_until=None):
+    """
+    Run independent jobs in threads and replay their console output in job order.
+
+    Each job is called with its own text writer and logs there (e.g. a compiler
+    built with output=writer), so the logs do not interleave and the process-wide
+    sys.stdout is left alone. Charts use the matplotlib Figure API (no pyplot) and
+    file writes are per job, so the compilers can share a process; threads also
+    keep the run's upload collector and the in-memory forecast shared.
+
+    Args:
+        jobs: dict name -> callable taking the job's writer
+        wait_until: Optional callable(is_done) that returns once is_done() is True,
+                    e.g. a GUI wait that keeps its event loop running
+                    (default: block until the jobs finish)
+
+    Returns:
+        dict name -> (result, exception or None), in job order
+    """
+    outputs = {name: io.StringIO() for name in jobs}
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="fes-bids") as pool:
+        futures = {name: pool.submit(job, outputs[name]) for name, job in jobs.items()}
+        if wait_until:
+            wait_until(lambda: all(future.done() for future in futures.values()))
+
+    results = {}
+    for name, future in futures.items():
+        sys.stdout.write(outputs[name].getvalue())
+        error = future.exception()
+        results[name] = (None if error else future.result(), error)
+    return results
+
+
+# ==========================================
+# 7. POWERPOINT GENERATION FUNCTION
 # ==========================================
-def create_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False):
+def create_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False,
+                                 forecasts=None):
     """
     Create PowerPoint presentation with forecast and bid charts
     Optionally send email to trading team
@@ -1290,6 +1326,8 @@ def create_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_
         su_chart_path: Path to SU bid chart PNG (optional)
         send_email: If True, send email to trading team with D-1 forecast attached
         force_friday_mode: If True, force Friday mode (load weekend forecasts)
+        forecasts: Optional dict of lag -> forecast DataFrame already in memory
+                   (e.g. {'D-1': df}); missing lags are read from the I: drive
     
     Returns:
         Path to presentation file or None if PPT generation unavailable
@@ -1299,7 +1337,8 @@ def create_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_
         return None
     
     try:
-        ppt_path = generate_forecast_presentation(trading_date_str, gu_chart_path, su_chart_path, send_email, force_friday_mode)
+        ppt_path = generate_forecast_presentation(trading_date_str, gu_chart_path, su_chart_path, send_email, force_friday_mode,
+                                                  forecasts=forecasts)
         return ppt_path
     except Exception as e:
         print(f"[ERROR] PowerPoint generation failed: {e}")
@@ -1307,7 +1346,7 @@ def create_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_
 
 
 # ==========================================
-# 7. NO AUTO-EXECUTION - GUI CONTROLLED
+# 8. NO AUTO-EXECUTION - GUI CONTROLLED
 # ==========================================
 # The following lines are COMMENTED OUT so the script doesn't auto-run
 # The GUI will call the functions as needed
@@ -0,0 +1,861 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FES Meteologica Module
+Shared access to the Meteologica DataExchange web service
+- Cached zeep client built from a local copy of the WSDL and its imported schemas
+- One login session per process, shared by every fetch and logged out at shutdown
+- Password from the METEOLOGICA_PASSWORD environment variable or the Windows Credential
+  Manager (one-off setup: python -m keyring set FES-Meteologica <username>)
+- Vectorized parser for the forecastData colon/tilde payload into percentile bands
+- Forecast fetch for one trading day or a multi-day D..D+N window
+- Facility registry: the exact facilitiesId list for each request type
+- Availability events and a vectorized interval engine for the outage adjustment
+- TTL cache for availability responses, shared by every run on the same day
+- Concurrent fetch stage: forecast, availability and extra requests in parallel
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from zeep import Client, Settings
+from zeep.exceptions import Fault
+from zeep.cache import SqliteCache
+from zeep.transports import Transport
+
+# Optional: read the password from the OS credential store (Windows Credential Manager)
+try:
+    import keyring
+    KEYRING_AVAILABLE = True
+except ImportError:
+    KEYRING_AVAILABLE = False
+
+
+METEOLOGICA_WSDL = "https://webservice.meteologica.com/api/wsdl/MeteologicaDataExchangeService.wsdl"
+METEOLOGICA_USERNAME = os.environ.get("METEOLOGICA_USERNAME", "Flogas")
+METEOLOGICA_PASSWORD = os.environ.get("METEOLOGICA_PASSWORD")   # Never stored in the code
+
+# Credential store entry used when METEOLOGICA_PASSWORD is not set (e.g. launched from Run_FES_GUI.bat)
+METEOLOGICA_KEYRING_SERVICE = "FES-Meteologica"
+PASSWORD_MISSING_MESSAGE = (
+    "Meteologica password not set. Store it once in the Windows Credential Manager with\n"
+    f"    python -m keyring set {METEOLOGICA_KEYRING_SERVICE} {METEOLOGICA_USERNAME}\n"
+    "or set the METEOLOGICA_PASSWORD environment variable before starting the scripts."
+)
+
+# Log in again once a session token is older than this
+SESSION_MAX_AGE_MINUTES = 30
+
+# Faults that mean the session token is no longer accepted (anything else is re-raised)
+SESSION_FAULT_PATTERN = re.compile(r"session|token|expired|not logged|logged out", re.IGNORECASE)
+
+# Local cache folder (next to the scripts - the launcher runs from the script directory)
+CACHE_DIR = Path.cwd() / "cache"
+
+# Bump the version whenever the cache layout changes so stale caches are ignored
+WSDL_CACHE_VERSION = 1
+WSDL_CACHE_MAX_AGE_HOURS = 24 * 7
+
+# Availability responses are reused from disk for this long (0 disables the cache)
+AVAILABILITY_CACHE_TTL_MINUTES = int(os.environ.get("METEOLOGICA_AVAILABILITY_TTL_MINUTES", 6 * 60))
+
+# Percentile bands requested with every forecast (comma separated override in the environment)
+FORECAST_PERCENTILES = tuple(os.environ.get("METEOLOGICA_PERCENTILES", "10,50,90").split(","))
+DEFAULT_PERCENTILE = "50"
+
+# Clients already built in this process, keyed by (wsdl, strict)
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Forecasts fetched in this process, keyed by (from_date, to_date) of the request.
+# Least recently used first; only the last FORECAST_MEMO_SIZE windows are kept
+FORECAST_MEMO_SIZE = 4
+_forecast_memo = OrderedDict()
+_forecast_memo_lock = threading.Lock()
+
+
+# ==========================================
+# 1. CLIENT FACTORY
+# ==========================================
+def _wsdl_cache_file(cache_dir):
+    """Path of the versioned WSDL/XSD cache database"""
+    return Path(cache_dir) / f"meteologica_wsdl_v{WSDL_CACHE_VERSION}.db"
+
+
+def _prune_old_wsdl_caches(cache_dir):
+    """Delete cache databases left behind by older cache versions"""
+    current = _wsdl_cache_file(cache_dir)
+    for old_file in Path(cache_dir).glob("meteologica_wsdl_v*.db"):
+        if old_file != current:
+            try:
+                old_file.unlink()
+            except OSError:
+                pass
+
+
+def get_meteologica_client(wsdl=METEOLOGICA_WSDL, strict=True, cache_dir=None,
+                           max_age_hours=WSDL_CACHE_MAX_AGE_HOURS, force_refresh=False):
+    """
+    Return a zeep client for the Meteologica service.
+
+    The WSDL and every schema it imports are stored in a versioned on-disk cache,
+    so after the first download the service definition is built from local disk.
+    Within one process the parsed client is reused.
+
+    Args:
+        wsdl: WSDL URL or path to a WSDL file on disk (useful for offline testing)
+        strict: zeep strict parsing mode (availability responses need strict=False)
+        cache_dir: Folder for the cache database (default: ./cache)
+        max_age_hours: Cached documents older than this are downloaded again
+        force_refresh: If True, discard the cache and download the WSDL/XSD again
+
+    Returns:
+        zeep.Client
+    """
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    key = (str(wsdl), strict)
+
+    # Held while building, so concurrent fetches share one client instead of each parsing the WSDL
+    with _clients_lock:
+        if force_refresh:
+            _clients.pop(key, None)
+            cache_file = _wsdl_cache_file(cache_dir)
+            if cache_file.exists():
+                cache_file.unlink()
+                print(f"[METEO] WSDL cache cleared: {cache_file}")
+
+        if key in _clients:
+            return _clients[key]
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _prune_old_wsdl_caches(cache_dir)
+
+        cache = SqliteCache(path=str(_wsdl_cache_file(cache_dir)), timeout=int(max_age_hours * 3600))
+        transport = Transport(cache=cache)
+        client = Client(wsdl=str(wsdl), transport=transport, settings=Settings(strict=strict))
+
+        _clients[key] = client
+        return client
+
+
+# ==========================================
+# 2. SESSION MANAGER
+# ==========================================
+def get_meteologica_password(username=METEOLOGICA_USERNAME):
+    """
+    Look up the Meteologica password: the METEOLOGICA_PASSWORD environment
+    variable first, then the OS credential store entry for username.
+
+    Returns:
+        The password, or None if neither source has one
+    """
+    if METEOLOGICA_PASSWORD:
+        return METEOLOGICA_PASSWORD
+    if KEYRING_AVAILABLE:
+        try:
+            return keyring.get_password(METEOLOGICA_KEYRING_SERVICE, username)
+        except keyring.errors.KeyringError as e:
+            print(f"[METEO] [WARNING] Credential store not readable: {e}")
+    return None
+
+
+class MeteologicaSession:
+    """Single Meteologica login shared by every caller in the process"""
+
+    def __init__(self, client=None, username=METEOLOGICA_USERNAME, password=None,
+                 max_age_minutes=SESSION_MAX_AGE_MINUTES):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.max_age = timedelta(minutes=max_age_minutes)
+        self.session_token = None
+        self.login_time = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        if self.client is None:
+            self.client = get_meteologica_client()
+        return self.client
+
+    def token(self, force_renew=False):
+        """Return a valid session token, logging in only when needed"""
+        with self._lock:
+            expired = self.login_time is None or datetime.now() - self.login_time > self.max_age
+            if force_renew or self.session_token is None or expired:
+                if not self.password:
+                    self.password = get_meteologica_password(self.username)
+                if not self.password:
+                    raise RuntimeError(PASSWORD_MISSING_MESSAGE)
+                client = self._client()
+                login_req = client.get_type('ns0:LoginReq')(
+                    username=self.username,
+                    password=self.password
+                )
+                login_response = client.service.login(request=login_req)
+                self.session_token = login_response.header.sessionToken
+                self.login_time = datetime.now()
+                print(f"[METEO] Logged in at {self.login_time.strftime('%H:%M:%S')}")
+            return self.session_token
+
+    def call(self, operation, request_type, client=None, **fields):
+        """
+        Call a service operation with the shared session token in the header.
+        If the server rejects the session (invalid or expired token), log in
+        again and retry once; any other fault is raised as is.
+
+        Args:
+            operation: Service operation name (e.g. 'getForecastMulti')
+            request_type: Request type name (e.g. 'ns0:GetForecastMultiReq')
+            client: zeep client to call through (default: the session's own client)
+            **fields: Request fields other than the header
+
+        Returns:
+            The operation response
+        """
+        client = client or self._client()
+        req_type = client.get_type(request_type)
+
+        try:
+            req = req_type(header={'sessionToken': self.token()}, **fields)
+            return getattr(client.service, operation)(request=req)
+        except Fault as e:
+            if not SESSION_FAULT_PATTERN.search(f"{e.code or ''} {e.message or ''}"):
+                raise
+            print(f"[METEO] {operation} rejected ({e}) - renewing session and retrying")
+            req = req_type(header={'sessionToken': self.token(force_renew=True)}, **fields)
+            return getattr(client.service, operation)(request=req)
+
+    def logout(self):
+        """Log out if a session is open"""
+        with self._lock:
+            if self.session_token is None:
+                return
+            try:
+                client = self._client()
+                logout_req = client.get_type('ns0:LogoutReq')(
+                    header={'sessionToken': self.session_token})
+                client.service.logout(request=logout_req)
+                print("[METEO] Logged out")
+            except Exception as e:
+                print(f"[METEO] Logout failed: {e}")
+            finally:
+                self.session_token = None
+                self.login_time = None
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide Meteologica session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = MeteologicaSession()
+    return _session
+
+
+@atexit.register
+def _logout_at_exit():
+    if _session is not None:
+        _session.logout()
+
+
+# ==========================================
+# 3. FACILITY REGISTRY
+# ==========================================
+# Forecast facilities -> Generation Forecast column (column order follows this dict)
+FORECAST_FACILITIES = {
+    'Vayu_Cluster1': 'Meteo ROI (MW)',
+    'Vayu_Cluster2': 'Meteo NI (MW)',
+    'Vayu_402050': 'Meteo TB (MW)',
+    'Vayu_GU_402280': 'Meteo CK (MW)',
+    'Flogas-solar_0587': 'Meteo LD (MW)',
+    'Vayu_0275': 'Meteo CD (MW)',
+    'Flogas-solar_0378__': 'Meteo DT (MW)',
+    'Vayu_GEN_504260': 'Meteo MUR (MW)',
+    'Flogas-solar_0670': 'Meteo S1 (MW)',
+    'Flogas-solar_0684': 'Meteo S2 (MW)'
+}
+
+# Large units whose availability adjusts the ROI forecast -> short name and max output (MW)
+AVAILABILITY_FACILITIES = {
+    'Vayu_0275': {'name': 'CD', 'max_mw': 4.5},
+    'Vayu_402050': {'name': 'TB', 'max_mw': 13.8},
+    'Vayu_GU_402280': {'name': 'CK', 'max_mw': 11.5}
+}
+
+# Numbered solar/wind sites use "Meteo S{n} (MW)" columns - add sites as S3, S4, ...
+SITE_SLOT_PREFIX = "Meteo S"
+SITE_SLOT_SUFFIX = " (MW)"
+
+FACILITY_REGISTRY = {
+    'forecast': FORECAST_FACILITIES,
+    'availability': AVAILABILITY_FACILITIES
+}
+
+
+def facilities_for(request_type):
+    """Facility ids to request for 'forecast' or 'availability'"""
+    return list(FACILITY_REGISTRY[request_type])
+
+
+def site_slots():
+    """
+    Numbered sites of the forecast registry ("Meteo S{n} (MW)" columns).
+    Each is bid through slot S{n} of the supply unit traders table.
+
+    Returns:
+        dict slot number -> Generation Forecast column, ordered by slot
+    """
+    slots = {}
+    for column in FORECAST_FACILITIES.values():
+        number = column[len(SITE_SLOT_PREFIX):-len(SITE_SLOT_SUFFIX)]
+        if column.startswith(SITE_SLOT_PREFIX) and column.endswith(SITE_SLOT_SUFFIX) and number.isdigit():
+            slots[int(number)] = column
+    return dict(sorted(slots.items()))
+
+
+def validate_facilities(received_ids, request_type):
+    """
+    Compare the facilities in a response with the ones requested.
+    Prints a warning for missing or unexpected facilities.
+
+    Returns:
+        list of requested facility ids missing from the response
+    """
+    expected = facilities_for(request_type)
+    received = set(received_ids)
+    missing = [f for f in expected if f not in received]
+    unexpected = sorted(received - set(expected))
+
+    if missing:
+        print(f"[METEO] WARNING: {request_type} response missing facilities: {', '.join(missing)}")
+    if unexpected:
+        print(f"[METEO] WARNING: {request_type} response has unrequested facilities: {', '.join(unexpected)}")
+    return missing
+
+
+def facilities_arg(client, request_type, facility_ids):
+    """
+    Build the facilitiesId request value. Array wrapper types (one repeated
+    child element) get the ids under that child, plain lists are passed as-is.
+    """
+    for name, element in client.get_type(request_type).elements:
+        if name != 'facilitiesId':
+            continue
+        children = getattr(element.type, 'elements', [])
+        if len(children) == 1 and children[0][1].max_occurs == 'unbounded' and not element.accepts_multiple:
+            return {children[0][0]: list(facility_ids)}
+    return list(facility_ids)
+
+
+# ==========================================
+# 4. FORECAST PAYLOAD PARSER
+# ==========================================
+class ForecastMatrix:
+    """
+    Parsed getForecastMulti response.
+
+    Attributes:
+        times: datetime64 array of the UTC timestamps (sorted, unique)
+        facility_ids: Facility ids in response order
+        percentiles: Percentile labels, one per value in each record (e.g. ['10', '50', '90'])
+        values: float64 array (percentile x timestamp x facility) in kW as received;
+                column() and frame() hand back MW.
+    """
+
+    def __init__(self, times, facility_ids, values, percentiles=None):
+        self.times = times
+        self.facility_ids = list(facility_ids)
+        self.values = values
+        self.percentiles = [str(p) for p in percentiles] if percentiles else [DEFAULT_PERCENTILE]
+        self._positions = {facility_id: i for i, facility_id in enumerate(self.facility_ids)}
+
+    def __contains__(self, facility_id):
+        return facility_id in self._positions
+
+    def percentile_index(self, percentile=None):
+        """Position of a percentile in values (default: DEFAULT_PERCENTILE, else the first one)"""
+        if percentile is None:
+            percentile = DEFAULT_PERCENTILE if DEFAULT_PERCENTILE in self.percentiles else self.percentiles[0]
+        try:
+            return self.percentiles.index(str(percentile))
+        except ValueError:
+            raise ValueError(f"Percentile P{percentile} not in forecast "
+                             f"(have {', '.join('P' + p for p in self.percentiles)})") from None
+
+    def column(self, facility_id, percentile=None):
+        """MW values for one facility (0 where the facility has no record for a timestamp)"""
+        kw = self.values[self.percentile_index(percentile), :, self._positions[facility_id]]
+        return kw / 1000
+
+    def window(self, start, end):
+        """Sub-matrix with the timestamps between start and end (inclusive)"""
+        mask = (self.times >= np.datetime64(start)) & (self.times <= np.datetime64(end))
+        return ForecastMatrix(self.times[mask], self.facility_ids, self.values[:, mask, :], self.percentiles)
+
+    def trading_day(self, offset=0):
+        """
+        Sub-matrix of one trading day, counted from the first timestamp: the 24 hours
+        starting offset days after times[0]. The timestamps are UTC as received, so the
+        day is cut relative to the response rather than against local clock times.
+        """
+        if not len(self.times):
+            return self
+        start = self.times[0] + np.timedelta64(offset, 'D')
+        mask = (self.times >= start) & (self.times < start + np.timedelta64(1, 'D'))
+        return ForecastMatrix(self.times[mask], self.facility_ids, self.values[:, mask, :], self.percentiles)
+
+    def frame(self, column_mapping, percentile=None):
+        """
+        Build a DataFrame indexed by timestamp with one column per mapped facility.
+        Facilities missing from the response give an empty (NaN) column.
+
+        Args:
+            column_mapping: dict of facility_id -> column name (column order follows the dict)
+            percentile: Which percentile to use, e.g. '10' or 90 (default: DEFAULT_PERCENTILE)
+        """
+        index = self.percentile_index(percentile)
+        data = {}
+        for facility_id, col_name in column_mapping.items():
+            if facility_id in self._positions:
+                data[col_name] = self.column(facility_id, self.percentiles[index])
+            else:
+                data[col_name] = np.full(len(self.times), np.nan)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.times))
+
+
+def parse_forecast_data(items, percentiles=None):
+    """
+    Parse every facility's forecastData string in one pass.
+
+    Each forecastData string looks like ':ts~v1[~v2...]:ts~v1[~v2...]' with unix
+    timestamps (UTC) and values in kW, one value per requested percentile. All strings
+    are joined and split with a single numeric parse, then scattered into a
+    (percentile x timestamp x facility) matrix. If the payload does not have the
+    same layout throughout, it is parsed record by record instead: records without
+    a timestamp and value are skipped (and counted in the log), and missing
+    percentile values are left NaN.
+
+    Args:
+        items: facilitiesForecastData.item from a getForecastMulti response
+        percentiles: Percentile labels in request order (default: [DEFAULT_PERCENTILE])
+
+    Returns:
+        ForecastMatrix
+    """
+    facility_ids = []
+    chunks = []
+    counts = []
+    for facility in items:
+        data = (facility.forecastData or '').strip(':')
+        facility_ids.append(facility.facilityId)
+        counts.append(data.count(':') + 1 if data else 0)
+        if data:
+            chunks.append(data)
+
+    # Later items for the same facility replace earlier ones
+    positions = {facility_id: i for i, facility_id in enumerate(dict.fromkeys(facility_ids))}
+    unique_ids = list(positions)
+
+    percentiles = [str(p) for p in percentiles] if percentiles else [DEFAULT_PERCENTILE]
+
+    if not chunks:
+        return ForecastMatrix(np.array([], dtype='datetime64[ns]'), unique_ids,
+                              np.zeros((len(percentiles), 0, len(unique_ids))), percentiles)
+
+    n_fields = len(percentiles) + 1
+    try:
+        flat = np.fromstring(':'.join(chunks).replace('~', ':'), sep=':')
+    except ValueError:
+        flat = np.empty(0)   # Non-numeric field somewhere
+    if flat.size == sum(counts) * n_fields and all(chunk.split(':', 1)[0].count('~') + 1 == n_fields
+                                                   for chunk in chunks):
+        records = flat.reshape(-1, n_fields)
+        facility_index = np.repeat([positions[f] for f in facility_ids], counts)
+    else:
+        records, facility_index = _parse_records(items, positions, n_fields)
+
+    stamps, time_index = np.unique(records[:, 0].astype(np.int64), return_inverse=True)
+    values = np.zeros((n_fields - 1, len(stamps), len(unique_ids)))
+    values[:, time_index, facility_index] = records[:, 1:].T  # kW, converted to MW on read
+
+    times = stamps.astype('datetime64[s]').astype('datetime64[ns]')
+    return ForecastMatrix(times, unique_ids, values, percentiles)
+
+
+def _parse_records(items, positions, n_fields):
+    """
+    Record-by-record parse for payloads with a mixed or malformed layout.
+
+    Returns:
+        (records array of shape (n, n_fields), facility position of each record)
+    """
+    records, facility_index, skipped = [], [], 0
+    for facility in items:
+        for pair in (facility.forecastData or '').split(':'):
+            parts = pair.split('~')
+            if len(parts) < 2:
+                skipped += bool(pair)
+                continue
+            try:
+                stamp = int(parts[0])
+                values = [float(v) for v in parts[1:n_fields]]
+            except ValueError:
+                skipped += 1
+                continue
+            records.append([stamp] + values + [np.nan] * (n_fields - 1 - len(values)))
+            facility_index.append(positions[facility.facilityId])
+    print(f"[METEO] [WARNING] forecastData layout is not uniform - parsed record by record"
+          f"{f', skipped {skipped} malformed record(s)' if skipped else ''}")
+    return np.array(records, dtype=float).reshape(-1, n_fields), np.array(facility_index, dtype=np.intp)
+
+
+# ==========================================
+# 5. FORECAST FETCH
+# ==========================================
+# Half-hour periods in a trading day (the Generation Forecast layout)
+TRADING_DAY_PERIODS = 48
+
+
+def trading_day_window(trading_date):
+    """Request window of one trading day: 23:00 the day before to 22:30 on the day"""
+    start = trading_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    return start, start + timedelta(hours=23, minutes=30)
+
+
+def fetch_forecast(first_trading_date, last_trading_date=None, percentiles=None):
+    """
+    Download the aggregated production forecast for one or more consecutive
+    trading days with a single getForecastMulti call.
+    Only the facilities in FORECAST_FACILITIES are requested, and every
+    percentile band comes back in the same response.
+
+    Args:
+        first_trading_date: datetime of the first trading day
+        last_trading_date: datetime of the last trading day (default: same as first)
+        percentiles: Percentiles to request (default: FORECAST_PERCENTILES)
+
+    Returns:
+        ForecastMatrix covering first_trading_date-1 23:00 to last_trading_date 22:30
+    """
+    last_trading_date = last_trading_date or first_trading_date
+    percentiles = [str(p) for p in (percentiles or FORECAST_PERCENTILES)]
+    from_date, _ = trading_day_window(first_trading_date)
+    _, to_date = trading_day_window(last_trading_date)
+
+    client = get_meteologica_client()
+    request_type = 'ns0:GetForecastMultiReq'
+    forecast_response = get_session().call(
+        'getForecastMulti', request_type, client=client,
+        variableId='prod',
+        predictorId='aggregated',
+        fromDate=from_date.isoformat(),
+        toDate=to_date.isoformat(),
+        granularity='30',
+        percentiles=','.join(percentiles),
+        facilitiesId=facilities_arg(client, request_type, facilities_for('forecast')))
+
+    forecast = parse_forecast_data(forecast_response.facilitiesForecastData.item, percentiles)
+    validate_facilities(forecast.facility_ids, 'forecast')
+    with _forecast_memo_lock:
+        _forecast_memo[(from_date, to_date)] = forecast
+        _forecast_memo.move_to_end((from_date, to_date))
+        while len(_forecast_memo) > FORECAST_MEMO_SIZE:
+            _forecast_memo.popitem(last=False)
+    return forecast
+
+
+def cached_forecast(trading_date, percentile=None):
+    """
+    Trading day forecast from an earlier fetch_forecast call in this process,
+    so another percentile can be used without a new request.
+
+    Args:
+        trading_date: datetime of the trading day
+        percentile: Percentile that must be present (default: DEFAULT_PERCENTILE)
+
+    Returns:
+        ForecastMatrix for the trading day, or None if no fetched window covers it
+    """
+    start, end = trading_day_window(trading_date)
+    with _forecast_memo_lock:
+        # Compare against the request window of each fetch (local times, like start/end),
+        # then cut the day out of its UTC timestamps by position (see split_trading_days)
+        for (from_date, to_date), forecast in reversed(_forecast_memo.items()):
+            if str(percentile or DEFAULT_PERCENTILE) not in forecast.percentiles:
+                continue
+            if from_date <= start and to_date >= end:
+                day = forecast.trading_day((start - from_date).days)
+                if len(day.times) != TRADING_DAY_PERIODS:
+                    continue
+                _forecast_memo.move_to_end((from_date, to_date))
+                return day
+    return None
+
+
+def split_trading_days(forecast, trading_dates):
+    """
+    Split a multi-day ForecastMatrix into one matrix per trading day.
+
+    The response starts at the first trading day's first period, so each day is
+    the 48 periods at its offset from the first timestamp - the same rows a
+    single-day fetch of that day gives.
+
+    Args:
+        forecast: ForecastMatrix from fetch_forecast, requested from trading_dates[0]
+        trading_dates: List of trading day datetimes
+
+    Returns:
+        list of ForecastMatrix in the same order as trading_dates
+
+    Raises:
+        ValueError: A trading day does not have 48 half-hour periods in the response
+    """
+    days = []
+    for trading_date in trading_dates:
+        day = forecast.trading_day((trading_date - trading_dates[0]).days)
+        if len(day.times) != TRADING_DAY_PERIODS:
+            raise ValueError(f"Forecast for trading day {trading_date:%d/%m/%Y} has {len(day.times)} "
+                             f"half-hour periods, expected {TRADING_DAY_PERIODS}")
+        days.append(day)
+    return days
+
+
+# ==========================================
+# 6. AVAILABILITY
+# ==========================================
+def parse_availability_events(items):
+    """
+    Flatten facilityAvailabilityData items into plain event dicts.
+
+    Returns:
+        list of dicts with facilityId, fromDate, toDate (ISO strings) and powerPercentage
+    """
+    events = []
+    for facility in items:
+        if facility.availabilityData is None:
+            continue
+        for event in facility.availabilityData['item']:
+            events.append({
+                'facilityId': facility.facilityId,
+                'fromDate': str(event['fromDate']),
+                'toDate': str(event['toDate']),
+                'powerPercentage': float(event['powerPercentage'])
+            })
+    return events
+
+
+def _availability_cache_file(from_date, to_date, unit_ids, cache_dir=None):
+    """Cache file for one date window and facility set"""
+    units_key = hashlib.sha1(",".join(sorted(unit_ids)).encode()).hexdigest()[:10]
+    name = f"{from_date:%Y%m%d%H%M}_{to_date:%Y%m%d%H%M}_{units_key}.json"
+    return (Path(cache_dir) if cache_dir else CACHE_DIR) / "availability" / name
+
+
+def _read_availability_cache(cache_file, max_age_minutes):
+    """Return cached events if the file exists and is younger than max_age_minutes, else None"""
+    if max_age_minutes <= 0 or not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        fetched_at = datetime.fromisoformat(cached['fetched_at'])
+    except (OSError, ValueError, KeyError):
+        return None
+    if datetime.now() - fetched_at > timedelta(minutes=max_age_minutes):
+        return None
+    print(f"[METEO] Availability from cache (fetched {fetched_at:%H:%M})")
+    return cached['events']
+
+
+def _write_availability_cache(cache_file, events):
+    """Write events next to their fetch time (temp file + rename so readers never see half a file)"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({'fetched_at': datetime.now().isoformat(), 'events': events}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[METEO] Could not write availability cache: {e}")
+
+
+def fetch_availability_events(first_trading_date, last_trading_date=None,
+                              max_age_minutes=None, force_refresh=False):
+    """
+    Get outage events for the AVAILABILITY_FACILITIES units
+    (22:00Z the day before the first trading day to 23:00Z on the last).
+
+    Responses are cached on disk per date window and facility set, so repeated
+    D-1, IDA-1 and PPT runs on the same day share one download.
+
+    Args:
+        first_trading_date: First trading day (datetime)
+        last_trading_date: Last trading day (default: first_trading_date)
+        max_age_minutes: Cache TTL (default: AVAILABILITY_CACHE_TTL_MINUTES, 0 = no cache)
+        force_refresh: If True, ignore the cache and download again
+
+    Returns:
+        list of event dicts (see parse_availability_events)
+    """
+    last_trading_date = last_trading_date or first_trading_date
+    from_date = first_trading_date.replace(hour=22, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    to_date = last_trading_date.replace(hour=23, minute=0, second=0, microsecond=0)
+    unit_ids = facilities_for('availability')
+    if max_age_minutes is None:
+        max_age_minutes = AVAILABILITY_CACHE_TTL_MINUTES
+
+    cache_file = _availability_cache_file(from_date, to_date, unit_ids)
+    if not force_refresh:
+        events = _read_availability_cache(cache_file, max_age_minutes)
+        if events is not None:
+            return events
+
+    events = _download_availability_events(from_date, to_date, unit_ids)
+    if max_age_minutes > 0:
+        _write_availability_cache(cache_file, events)
+    return events
+
+
+def _download_availability_events(from_date, to_date, unit_ids):
+    """One getAvailabilityMulti call for the given window and units"""
+    client = get_meteologica_client(strict=False)
+    request_type = 'ns0:getAvailabilityMultiReq'
+    availability_response = get_session().call(
+        'getAvailabilityMulti', request_type, client=client,
+        fromDate=from_date.isoformat() + 'Z',
+        toDate=to_date.isoformat() + 'Z',
+        facilitiesId=facilities_arg(client, request_type, unit_ids),
+        unit='MW')
+
+    received = availability_response.facilityAvailabilityData.item
+    validate_facilities([item.facilityId for item in received], 'availability')
+    return parse_availability_events([item for item in received if item.facilityId in unit_ids])
+
+
+def availability_matrix(period_times, events, unit_ids, freq_minutes=30):
+    """
+    Apply outage events to a (period x unit) availability matrix in one pass.
+
+    An event covers every period on its freq_minutes grid from fromDate to toDate
+    (inclusive, local wall time). Where events overlap, the later event wins.
+    A powerPercentage of 0 is treated as fully available.
+
+    Args:
+        period_times: datetime64 array of period start times
+        events: list of event dicts (see parse_availability_events)
+        unit_ids: Facility ids, one per matrix column
+        freq_minutes: Period length
+
+    Returns:
+        float array (period x unit) of availability factors (1 = fully available)
+    """
+    result = np.ones((len(period_times), len(unit_ids)))
+    positions = {unit_id: i for i, unit_id in enumerate(unit_ids)}
+    events = [e for e in events if e['facilityId'] in positions]
+    if not events:
+        return result
+
+    # Keep the wall-clock part of the ISO timestamps (drop the UTC offset)
+    starts = np.array([e['fromDate'][:19] for e in events], dtype='datetime64[s]')
+    ends = np.array([e['toDate'][:19] for e in events], dtype='datetime64[s]')
+    factors = np.array([e['powerPercentage'] for e in events]) / 100
+    factors[factors == 0] = 1
+    units = np.array([positions[e['facilityId']] for e in events])
+
+    times = np.asarray(period_times, dtype='datetime64[s]')[:, None]
+    covered = ((times >= starts) & (times <= ends)
+               & ((times - starts) % np.timedelta64(freq_minutes, 'm') == 0))
+
+    # Rank of the last covering event per (period, unit); 0 = no event
+    rank = np.where(covered, np.arange(1, len(events) + 1), 0)
+    unit_mask = units[None, :] == np.arange(len(unit_ids))[:, None]
+    last = (rank[:, None, :] * unit_mask[None, :, :]).max(axis=2)
+
+    hit = last > 0
+    result[hit] = factors[last[hit] - 1]
+    return result
+
+
+# ==========================================
+# 7. CONCURRENT FETCH
+# ==========================================
+class MeteologicaFetch:
+    """Combined result of one fetch_all call"""
+
+    def __init__(self, forecast=None, availability=None, extra=None, timings=None):
+        self.forecast = forecast            # ForecastMatrix for the main window
+        self.availability = availability    # list of outage events, or None if not requested
+        self.extra = extra or {}            # name -> ForecastMatrix for each extra request
+        self.timings = timings or {}        # name -> seconds spent on that call
+
+    def summary(self):
+        """One-line timing summary for the logs"""
+        return ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items())
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def fetch_all(first_trading_date, last_trading_date=None, include_availability=True,
+              extra_requests=None, max_workers=None):
+    """
+    Run the forecast request, the availability request and any extra forecast
+    requests concurrently, so the fetch takes as long as the slowest call.
+
+    Args:
+        first_trading_date: First trading day (datetime)
+        last_trading_date: Last trading day (default: first_trading_date)
+        include_availability: If True, also fetch outage events for the same window
+        extra_requests: Optional dict of name -> fetch_forecast keyword arguments,
+            e.g. {'weekend': {'first_trading_date': sat, 'last_trading_date': mon}}
+        max_workers: Thread pool size (default: one thread per request)
+
+    Returns:
+        MeteologicaFetch
+    """
+    extra_requests = extra_requests or {}
+
+    # Build the clients and log in before fanning out, so the workers
+    # don't race to parse the WSDL or queue up behind the login
+    get_meteologica_client()
+    if include_availability:
+        get_meteologica_client(strict=False)
+    get_session().token()
+
+    jobs = {'forecast': (fetch_forecast, (first_trading_date, last_trading_date), {})}
+    if include_availability:
+        jobs['availability'] = (fetch_availability_events, (first_trading_date, last_trading_date), {})
+    for name, kwargs in extra_requests.items():
+        jobs[name] = (fetch_forecast, (), kwargs)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as pool:
+        futures = {name: pool.submit(_timed, func, *args, **kwargs)
+                   for name, (func, args, kwargs) in jobs.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    result = MeteologicaFetch(
+        forecast=results['forecast'][0],
+        availability=results['availability'][0] if include_availability else None,
+        extra={name: results[name][0] for name in extra_requests},
+        timings={name: seconds for name, (_, seconds) in results.items()})
+    print(f"[METEO] Fetched {len(jobs)} requests in {time.perf_counter() - start:.1f}s ({result.summary()})")
+    return result
@@ -17,6 +17,12 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import numpy as np
+from FES_Forecast_Store import read_generation_forecast, ForecastArchive
+
+
+# Lag labels of the weekend forecast files loaded for Friday presentations
+# (trading day +1 = Saturday, +2 = Sunday, +3 = Monday)
+WEEKEND_FORECAST_LAGS = ["D-3", "D-4", "D-5"]
 
 
 class ForecastPresentationGenerator:
@@ -30,10 +36,11 @@ class ForecastPresentationGenerator:
         self.d4_forecast_df = None  # Sunday
         self.d5_forecast_df = None  # Monday
         self.is_friday_presentation = False
+        self.forecasts = {}  # lag -> forecast DataFrame handed over in memory
         self.chart_dir = Path.cwd() / "output"
         self.chart_dir.mkdir(exist_ok=True)
         
-    def load_forecast_data(self, trading_date_str, force_friday_mode=False):
+    def load_forecast_data(self, trading_date_str, force_friday_mode=False, forecasts=None):
         """
         Load D-1 and D-2 forecast files if they exist
         For Friday presentations, also load D-3, D-4, D-5 (Saturday, Sunday, Monday)
@@ -41,8 +48,11 @@ class ForecastPresentationGenerator:
         Args:
             trading_date_str: Trading date in DD/MM/YYYY format
             force_friday_mode: If True, force Friday mode regardless of day
+            forecasts: Optional dict of lag -> forecast DataFrame already in memory
+                       (from grab_forecast_data / grab_forecast_window); other lags are read from disk
         """
         self.trading_date = datetime.strptime(trading_date_str, "%d/%m/%Y")
+        self.forecasts = forecasts or {}
         
         # Check if this is a Friday presentation (trading day is Friday)
         # Friday = 4 in weekday() where Monday=0
@@ -60,11 +70,13 @@ class ForecastPresentationGenerator:
         
         # Load D-1 forecast
         d1_file = forecast_dir / f"Generation Forecast {day_str_d1} D-1.xlsx"
-        print(f"[PPT] Loading D-1 forecast: {d1_file}")
         
-        if d1_file.exists():
-            self.gen_forecast_df = pd.read_excel(d1_file)
-            self.gen_forecast_df["DateTime"] = pd.to_datetime(self.gen_forecast_df["DateTime"], format="%d/%m/%Y %H:%M")
+        if "D-1" in self.forecasts:
+            print("[PPT] Using in-memory D-1 forecast")
+            self.gen_forecast_df = self.forecasts["D-1"].copy()
+        elif d1_file.exists():
+            print(f"[PPT] Loading D-1 forecast: {d1_file}")
+            self.gen_forecast_df = read_generation_forecast(d1_file)
         else:
             raise FileNotFoundError(f"D-1 forecast file not found: {d1_file}")
         
@@ -74,8 +86,7 @@ class ForecastPresentationGenerator:
         
         if d2_file.exists():
             print(f"[PPT] Loading D-2 forecast: {d2_file}")
-            self.d2_forecast_df = pd.read_excel(d2_file)
-            self.d2_forecast_df["DateTime"] = pd.to_datetime(self.d2_forecast_df["DateTime"], format="%d/%m/%Y %H:%M")
+            self.d2_forecast_df = read_generation_forecast(d2_file)
         else:
             print(f"[PPT] D-2 forecast not found (will skip comparison)")
             self.d2_forecast_df = None
@@ -87,17 +98,19 @@ class ForecastPresentationGenerator:
     def _load_weekend_forecasts(self):
         """Load D-3 (Saturday), D-4 (Sunday), D-5 (Monday) forecasts for Friday presentations"""
         
+        d3_lag, d4_lag, d5_lag = WEEKEND_FORECAST_LAGS
+        
         # D-3 = Saturday (trading_date + 1 day)
         saturday = self.trading_date + timedelta(days=1)
-        self._load_forecast_for_date(saturday, "D-3", "d3_forecast_df")
+        self._load_forecast_for_date(saturday, d3_lag, "d3_forecast_df")
         
         # D-4 = Sunday (trading_date + 2 days)
         sunday = self.trading_date + timedelta(days=2)
-        self._load_forecast_for_date(sunday, "D-4", "d4_forecast_df")
+        self._load_forecast_for_date(sunday, d4_lag, "d4_forecast_df")
         
         # D-5 = Monday (trading_date + 3 days)
         monday = self.trading_date + timedelta(days=3)
-        self._load_forecast_for_date(monday, "D-5", "d5_forecast_df")
+        self._load_forecast_for_date(monday, d5_lag, "d5_forecast_df")
     
     def _load_forecast_for_date(self, date_obj, forecast_label, attr_name):
         """Helper to load a forecast file for a specific date"""
@@ -108,10 +121,12 @@ class ForecastPresentationGenerator:
         forecast_dir = Path(rf"I:\Daily Generation Forecasts\Daily Generation to Submit\{year}\{month}")
         forecast_file = forecast_dir / f"Generation Forecast {day_str} {forecast_label}.xlsx"
         
-        if forecast_file.exists():
+        if forecast_label in self.forecasts:
+            print(f"[PPT] Using in-memory {forecast_label} forecast")
+            setattr(self, attr_name, self.forecasts[forecast_label].copy())
+        elif forecast_file.exists():
             print(f"[PPT] Loading {forecast_label} forecast: {forecast_file}")
-            df = pd.read_excel(forecast_file)
-            df["DateTime"] = pd.to_datetime(df["DateTime"], format="%d/%m/%Y %H:%M")
+            df = read_generation_forecast(forecast_file)
             setattr(self, attr_name, df)
         else:
             print(f"[PPT] {forecast_label} forecast not found: {forecast_file}")
@@ -360,12 +375,24 @@ class ForecastPresentationGenerator:
                     'Meteo CK (MW)', 'Meteo LD (MW)', 'Meteo CD (MW)',
                     'Naïve Nonwind (MW)', 'Self-forecast (MW)', 'Meteo DT (MW)', 'Meteo MUR (MW)']
         
-        # Try to load D-1 forecasts for the past 3 days
+        # D-1 totals for the past 3 days: one slice of the forecast archive,
+        # files on I: only for days the archive doesn't have
         all_forecasts = []
+        archived_days = set()
+        try:
+            archived = ForecastArchive().totals(self.trading_date - timedelta(days=2), self.trading_date, "D-1", gen_cols)
+            if len(archived):
+                all_forecasts.append(archived[['DateTime', 'Total']])
+                archived_days = set(archived['TradingDay'].dt.date)
+        except Exception as e:
+            print(f"[PPT] Forecast archive not available: {e}")
         
         for days_back in range(3):
             try:
                 past_date = self.trading_date - timedelta(days=days_back)
+                if past_date.date() in archived_days:
+                    print(f"[PPT] Loaded forecast for {past_date.strftime('%d.%m.%Y')} (archive)")
+                    continue
                 year = str(past_date.year)
                 month = past_date.strftime("%B")
                 day_str = past_date.strftime("%d.%m.%Y")
@@ -374,8 +401,7 @@ class ForecastPresentationGenerator:
                 forecast_file = forecast_dir / f"Generation Forecast {day_str} D-1.xlsx"
                 
                 if forecast_file.exists():
-                    df = pd.read_excel(forecast_file)
-                    df["DateTime"] = pd.to_datetime(df["DateTime"], format="%d/%m/%Y %H:%M")
+                    df = read_generation_forecast(forecast_file)
                     
                     available_cols = [col for col in gen_cols if col in df.columns]
                     df['Total'] = df[available_cols].sum(axis=1)
@@ -418,7 +444,8 @@ class ForecastPresentationGenerator:
         
         return chart_file
     
-    def create_presentation(self, trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False):
+    def create_presentation(self, trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False,
+                            forecasts=None):
         """
         Create complete PowerPoint presentation
         For Friday presentations, includes Saturday, Sunday, Monday forecasts
@@ -429,6 +456,7 @@ class ForecastPresentationGenerator:
             su_chart_path: Path to SU bid chart (optional)
             send_email: If True, send email with D-1 forecast attached
             force_friday_mode: If True, force Friday mode regardless of day
+            forecasts: Optional dict of lag -> forecast DataFrame already in memory
         
         Returns:
             Path to saved presentation
@@ -438,7 +466,7 @@ class ForecastPresentationGenerator:
         print("="*70)
         
         # Load forecast data
-        self.load_forecast_data(trading_date_str, force_friday_mode)
+        self.load_forecast_data(trading_date_str, force_friday_mode, forecasts)
         
         # Create new presentation
         self.prs = Presentation()
@@ -678,7 +706,8 @@ class ForecastPresentationGenerator:
 
 
 # Standalone function for easy calling
-def generate_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False):
+def generate_forecast_presentation(trading_date_str, gu_chart_path=None, su_chart_path=None, send_email=False, force_friday_mode=False,
+                                   forecasts=None):
     """
     Generate forecast presentation and optionally send email
     For Friday presentations, automatically includes weekend forecasts (Sat, Sun, Mon)
@@ -689,12 +718,14 @@ def generate_forecast_presentation(trading_date_str, gu_chart_path=None, su_char
         su_chart_path: Path to SU bid chart PNG (optional)
         send_email: If True, send email to trading team with D-1 forecast attached
         force_friday_mode: If True, force Friday mode (load weekend forecasts) regardless of day
+        forecasts: Optional dict of lag -> forecast DataFrame already in memory (e.g. {'D-1': df})
     
     Returns:
         Path to saved presentation
     """
     generator = ForecastPresentationGenerator()
-    return generator.create_presentation(trading_date_str, gu_chart_path, su_chart_path, send_email, force_friday_mode)
+    return generator.create_presentation(trading_date_str, gu_chart_path, su_chart_path, send_email, force_friday_mode,
+                                         forecasts=forecasts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FES Price Ladder Module
+Declarative price ladders for every bid format (ETS, DAM auction, IDA-1)
+- Ladders defined as data: prices/column labels plus the cell placed at each step for SELL and BUY
+- Each ladder compiled once into index arrays over a small table of cell sources
+- One vectorized engine builds the bid frame for any unit, or for many units at once
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+# ==========================================
+# 1. LADDER CONFIG
+# ==========================================
+# Cells per price step, for SELL (qty < 0) and BUY (qty >= 0) periods:
+#   "qty"      - the signed bid quantity
+#   "abs_qty"  - the bid quantity without sign (DAM quantities are always positive)
+#   anything else is written as is: 0 and 0.0 are written as "0" and "0.0", "" is an empty cell
+# ETS and IDA ladders name their columns with "columns"; DAM ladders repeat "prices" on every row.
+PRICE_LADDERS = {
+    "GU_ETS": {
+        "format": "ets",
+        "time_format": "%H:%M",
+        "columns": ["-1500", "-41.7", "-41.7", "9000"],
+        # GU always sells at columns 3&4 only
+        "sell": [0, 0, "qty", "qty"],
+        "buy": [0, 0, "qty", "qty"],
+    },
+    "GU_DAM": {
+        "format": "dam",
+        "prices": [-1500, -41.7, -41.7, 9000.0],
+        "sell": [0.0, 0.0, "abs_qty", "abs_qty"],
+        "buy": [0.0, 0.0, "abs_qty", "abs_qty"],
+    },
+    "SU_ETS": {
+        "format": "ets",
+        "time_format": "%H:%M:%S",
+        "columns": ["-500", "500", "500", "4000"],
+        # Columns 2&3 must be EMPTY (not 0) when selling to avoid ETS rejection (matches the VBA output)
+        "sell": ["qty", "", "", "qty"],
+        "buy": ["qty", "qty", 0, 0],
+    },
+    "SU_DAM": {
+        "format": "dam",
+        "prices": [-500, 500, 500, 4000],
+        "sell": [0.0, 0.0, "abs_qty", "abs_qty"],
+        "buy": ["abs_qty", "abs_qty", 0.0, 0.0],
+    },
+    "IDA1": {
+        "format": "ida",
+        "columns": ["-150", "3000.00"],
+        # The adjustment goes to both price columns
+        "sell": ["qty", "qty"],
+        "buy": ["qty", "qty"],
+    },
+}
+
+# Ladders used by each bidding unit, per output. Keys are unit ids or unit families
+# (the part before "_"), so a new GU_/SU_ unit uses its family's ladders unless listed
+UNIT_LADDERS = {
+    "GU": {"ets": "GU_ETS", "dam": "GU_DAM"},
+    "SU": {"ets": "SU_ETS", "dam": "SU_DAM"},
+    "IDA1": {"ida": "IDA1"},
+}
+
+# Optional JSON file with the same layout ({"ladders": {...}, "units": {...}}) that
+# replaces or adds ladders and units without touching the code
+PRICE_LADDER_CONFIG = Path(os.environ.get("FES_PRICE_LADDERS", Path.cwd() / "price_ladders.json"))
+
+QTY = "qty"
+ABS_QTY = "abs_qty"
+LADDER_FORMATS = ("ets", "dam", "ida")
+
+
+# ==========================================
+# 2. COMPILED LADDER
+# ==========================================
+class PriceLadder:
+    """
+    A price ladder compiled into index arrays.
+
+    The cell sources are the signed quantity, the absolute quantity and every
+    literal the ladder uses. `kinds` holds, for each side (0 = BUY, 1 = SELL)
+    and price step, the index of the source written there, so building a bid
+    frame is one selection per step over whole columns - no per-period Python.
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.format = spec["format"]
+        if self.format not in LADDER_FORMATS:
+            raise ValueError(f"Ladder {name}: unknown format '{self.format}' (expected one of {LADDER_FORMATS})")
+
+        self.time_format = spec.get("time_format", "%H:%M")
+        self.prices = list(spec.get("prices", []))
+        self.columns = list(spec.get("columns", [str(p) for p in self.prices]))
+
+        steps = len(self.columns)
+        if len(spec["sell"]) != steps or len(spec["buy"]) != steps or (self.prices and len(self.prices) != steps):
+            raise ValueError(f"Ladder {name}: prices/columns, sell and buy must all have {steps} steps")
+
+        # Source table: quantity, absolute quantity, then each distinct literal (0 and 0.0 kept apart)
+        self.sources = [QTY, ABS_QTY]
+        self.kinds = np.zeros((2, steps), dtype=np.intp)
+        for side, cells in enumerate((spec["buy"], spec["sell"])):
+            for step, cell in enumerate(cells):
+                self.kinds[side, step] = self._source_index(cell)
+
+    def _source_index(self, cell):
+        for index, source in enumerate(self.sources):
+            if type(source) is type(cell) and source == cell:
+                return index
+        self.sources.append(cell)
+        return len(self.sources) - 1
+
+    def cells(self, qty):
+        """
+        Cell values of every price step.
+
+        Args:
+            qty: Bid quantities, shape (periods,) or (periods, units)
+
+        Returns:
+            List with one array per step, shaped like qty. A step whose cells come
+            from a single numeric source keeps that dtype; a step that mixes sources
+            is an object array holding each value with its own type.
+        """
+        qty = np.asarray(qty, dtype=float)
+        sell = qty < 0
+        values = {QTY: qty, ABS_QTY: np.abs(qty)}
+
+        cells = []
+        for buy_kind, sell_kind in self.kinds.T:
+            buy_src, sell_src = self.sources[buy_kind], self.sources[sell_kind]
+            if buy_kind == sell_kind:
+                cells.append(self._fill(buy_src, values, qty.shape))
+                continue
+            out = np.empty(qty.shape, dtype=object)
+            out[~sell] = self._pick(buy_src, values, ~sell)
+            out[sell] = self._pick(sell_src, values, sell)
+            cells.append(out)
+        return cells
+
+    @staticmethod
+    def _fill(source, values, shape):
+        if isinstance(source, str) and source in values:
+            return values[source]
+        if isinstance(source, str):
+            return np.full(shape, source, dtype=object)
+        return np.full(shape, source)
+
+    @staticmethod
+    def _pick(source, values, mask):
+        if isinstance(source, str) and source in values:
+            return values[source][mask].astype(object)
+        return source
+
+    def frames(self, qty, times, periods=None):
+        """
+        Bid frames for one or many units in one pass.
+
+        Args:
+            qty: Bid quantities, shape (periods,) or (periods, units)
+            times: Period start times (DatetimeIndex / datetime Series)
+            periods: Period numbers (default 1..N)
+
+        Returns:
+            List of DataFrames, one per unit column of qty
+        """
+        qty = np.asarray(qty, dtype=float)
+        matrix = qty.reshape(len(qty), -1)
+        times = pd.DatetimeIndex(times)
+        periods = np.arange(1, len(matrix) + 1) if periods is None else np.asarray(periods)
+        cells = self.cells(matrix)
+
+        frames = []
+        for unit in range(matrix.shape[1]):
+            unit_cells = [_typed(step_cells[:, unit]) for step_cells in cells]
+            frames.append(self._layout(matrix[:, unit], times, periods, unit_cells))
+        return frames
+
+    def frame(self, qty, times, periods=None):
+        """Bid frame for a single unit (see frames)"""
+        return self.frames(np.asarray(qty, dtype=float).reshape(-1, 1), times, periods)[0]
+
+    def _layout(self, qty, times, periods, cells):
+        if self.format == "ets":
+            data = {0: np.asarray(times.strftime(self.time_format), dtype=object), 1: periods}
+            data.update({i + 2: values for i, values in enumerate(cells)})
+            frame = pd.DataFrame(data)
+            frame.columns = ["", "Period"] + self.columns
+            return frame
+
+        if self.format == "ida":
+            data = {0: periods}
+            data.update({i + 1: values for i, values in enumerate(cells)})
+            frame = pd.DataFrame(data)
+            frame.columns = ["period"] + self.columns
+            return frame
+
+        data = {
+            "Period": periods,
+            "DateTime": times.to_numpy(),
+            "BuySell": np.where(qty < 0, "SELL", "BUY").astype(object),
+        }
+        for step, (price, values) in enumerate(zip(self.prices, cells), start=1):
+            data[f"Curve-Price {step}"] = np.full(len(qty), price)
+            data[f"Curve-Qty {step}"] = values
+        return pd.DataFrame(data)
+
+
+def _typed(values):
+    """
+    Type a cell column the way pandas types a list of rows: object columns that
+    turn out all numeric become numeric, columns with empty cells stay object.
+    """
+    if values.dtype != object:
+        return values
+    return pd.Series(values).infer_objects().to_numpy()
+
+
+# ==========================================
+# 3. LADDER REGISTRY
+# ==========================================
+_ladders = None
+_ladders_lock = threading.Lock()
+
+
+def _load_config():
+    ladders, units = dict(PRICE_LADDERS), {k: dict(v) for k, v in UNIT_LADDERS.items()}
+    try:
+        with open(PRICE_LADDER_CONFIG, encoding="utf-8") as f:
+            override = json.load(f)
+        ladders.update(override.get("ladders", {}))
+        for unit, outputs in override.get("units", {}).items():
+            units.setdefault(unit, {}).update(outputs)
+        print(f"[LADDER] Loaded price ladders from {PRICE_LADDER_CONFIG}")
+    except FileNotFoundError:
+        pass
+    return ladders, units
+
+
+def get_ladders():
+    """
+    Compiled ladders and the unit -> ladder map (compiled on first use).
+
+    Returns:
+        (dict ladder name -> PriceLadder, dict unit -> {output: ladder name})
+    """
+    global _ladders
+    with _ladders_lock:
+        if _ladders is None:
+            ladders, units = _load_config()
+            _ladders = ({name: PriceLadder(name, spec) for name, spec in ladders.items()}, units)
+    return _ladders
+
+
+def ladder_for(unit, output):
+    """
+    Compiled ladder for a unit's output ("ets", "dam" or "ida").
+    The unit's own entry in UNIT_LADDERS wins over its family's.
+
+    Raises:
+        KeyError: The unit has no ladder for that output
+    """
+    ladders, units = get_ladders()
+    outputs = {**units.get(unit.split("_")[0], {}), **units.get(unit, {})}
+    try:
+        return ladders[outputs[output]]
+    except KeyError:
+        raise KeyError(f"No '{output}' price ladder configured for {unit}") from None
+
+
+def build_bids(unit, output, qty, times, periods=None):
+    """Bid frame for one unit and output from its configured ladder"""
+    return ladder_for(unit, output).frame(qty, times, periods)
+
+
+if __name__ == "__main__":
+    import time
+
+    times = pd.date_range("2026-01-20 23:00", periods=48, freq="30min")
+    qty = np.round(np.random.default_rng(0).normal(0, 20, 48), 1)
+
+    for unit, outputs in {"GU_504260": ["ets", "dam"], "SU_400130": ["ets", "dam"], "IDA1": ["ida"]}.items():
+        for output in outputs:
+            print(f"\n{unit} {output}:")
+            print(build_bids(unit, output, qty, times).head(4).to_string(index=False))
+
+    # Many units at once: 96 quarter-hour periods x 50 units
+    times_qh = pd.date_range("2026-01-20 23:00", periods=96, freq="15min")
+    many = np.round(np.random.default_rng(1).normal(0, 20, (96, 50)), 1)
+    start = time.perf_counter()
+    frames = ladder_for("SU_400130", "ets").frames(many, times_qh)
+    print(f"\n{len(frames)} SU ETS frames x {len(times_qh)} periods in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FES Self-Forecast Module
+Fast access to the Aggregated Naturgy self-forecast workbooks on the V: drive
+- Persistent index of self-forecast files (path, trading day, mtime)
+- Incremental refresh: only folders whose mtime changed are listed again
+- Cell-targeted reader for the C17:C40 hourly forecast, memoized by (path, mtime, size)
+"""
+
+import calendar
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+from openpyxl import load_workbook
+
+
+SELF_FORECAST_ROOT = Path(r"V:\Renewables\Self-Forecasting\2) Forecasts Received by Trading Day")
+SELF_FORECAST_PREFIX = "1) Aggregated Naturgy_Self_Forecast_Template_v1_"
+
+# Local cache folder (next to the scripts - the launcher runs from the script directory)
+CACHE_DIR = Path.cwd() / "cache"
+
+# Bump the version whenever the index layout changes so old index files are ignored
+SELF_FORECAST_INDEX_VERSION = 1
+
+# Hourly self-forecast cells in the template (C17:C40 on the first sheet)
+SELF_FORECAST_FIRST_ROW = 17
+SELF_FORECAST_LAST_ROW = 40
+SELF_FORECAST_COLUMN = 3
+
+# Parsed workbooks kept in the on-disk memo
+SELF_FORECAST_MEMO_SIZE = 200
+
+
+# ==========================================
+# 1. SELF-FORECAST INDEX
+# ==========================================
+def _scan(folder):
+    """
+    List a folder once.
+
+    Returns:
+        (folder mtime, list of os.DirEntry) or (None, []) if the folder does not exist
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+        with os.scandir(folder) as entries:
+            return mtime, list(entries)
+    except OSError:
+        return None, []
+
+
+def _mtime(folder):
+    """Folder mtime, or None if it does not exist"""
+    try:
+        return os.stat(folder).st_mtime
+    except OSError:
+        return None
+
+
+class SelfForecastIndex:
+    """
+    On-disk index of the self-forecast folders.
+
+    The share is laid out as {root}/{year}/{month}) {Month}/{dd.mm.yyyy}/<workbooks>.
+    For every month folder the index keeps its mtime and day folder names, and for
+    every day folder its mtime and the self-forecast workbooks in it (name, mtime).
+    A folder is only listed again when its mtime has changed, so a lookup usually
+    costs one stat per month instead of several exists()/glob calls per day.
+    """
+
+    def __init__(self, root=SELF_FORECAST_ROOT, index_file=None):
+        self.root = Path(root)
+        self.index_file = Path(index_file) if index_file else (
+            CACHE_DIR / f"self_forecast_index_v{SELF_FORECAST_INDEX_VERSION}.json")
+        self.months = {}    # "2026/1) January" -> {'mtime': float, 'days': [day folder names]}
+        self.days = {}      # "21.01.2026" -> {'mtime': float, 'files': [[name, mtime], ...]}
+        self._checked = set()   # month folders already checked during this lookup
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get('root') == str(self.root):
+                self.months = saved.get('months', {})
+                self.days = saved.get('days', {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """Write the index if it changed (temp file + rename so readers never see half a file)"""
+        if not self._dirty:
+            return
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({'root': str(self.root), 'months': self.months, 'days': self.days}, f)
+            os.replace(tmp_file, self.index_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"[WARNING] Could not save self-forecast index: {e}")
+
+    @staticmethod
+    def _month_key(day):
+        return f"{day.year}/{day.month}) {calendar.month_name[day.month]}"
+
+    def _refresh_month(self, month_key):
+        """Re-list a month folder if its mtime changed; returns its day folder names"""
+        entry = self.months.get(month_key)
+        if month_key not in self._checked:
+            self._checked.add(month_key)
+            mtime = _mtime(self.root / month_key)
+            if mtime is None:
+                entry = None
+                if self.months.pop(month_key, None) is not None:
+                    self._dirty = True
+            elif entry is None or entry['mtime'] != mtime:
+                mtime, entries = _scan(self.root / month_key)
+                entry = {'mtime': mtime, 'days': sorted(e.name for e in entries if e.is_dir())}
+                self.months[month_key] = entry
+                self._dirty = True
+        return set(entry['days']) if entry else set()
+
+    def _refresh_day(self, month_key, day_name):
+        """Re-list a day folder if its mtime changed; returns its [name, mtime] workbook list"""
+        folder = self.root / month_key / day_name
+        entry = self.days.get(day_name)
+        mtime = _mtime(folder)
+        if mtime is None:
+            self.days.pop(day_name, None)
+            self._dirty = True
+            return []
+        if entry is None or entry['mtime'] != mtime:
+            mtime, entries = _scan(folder)
+            files = [[e.name, e.stat().st_mtime] for e in entries
+                     if e.is_file() and e.name.startswith(SELF_FORECAST_PREFIX) and e.name.endswith(".xlsx")]
+            entry = {'mtime': mtime, 'files': sorted(files)}
+            self.days[day_name] = entry
+            self._dirty = True
+        return entry['files']
+
+    def _pick(self, day_name, files):
+        """Expected workbook for the day if present, else the last matching one"""
+        names = [name for name, _ in files]
+        expected = f"{SELF_FORECAST_PREFIX}{day_name}.xlsx"
+        if expected in names:
+            return expected
+        return names[-1] if names else None
+
+    def find(self, input_date_str, max_lookback_days=14):
+        """
+        Latest self-forecast workbook for a trading day, looking back up to
+        max_lookback_days days.
+
+        A day whose expected workbook is already indexed is a dictionary hit.
+        Other days are checked against the folder mtimes and re-listed only if changed.
+
+        Returns:
+            Path of the workbook
+
+        Raises:
+            FileNotFoundError: No workbook within the lookback window
+        """
+        dt0 = datetime.strptime(input_date_str, "%d/%m/%Y")
+        with self._lock:
+            self._checked = set()
+            try:
+                for delta in range(0, max_lookback_days + 1):
+                    day = dt0 - timedelta(days=delta)
+                    day_name = day.strftime('%d.%m.%Y')
+                    month_key = self._month_key(day)
+
+                    indexed = self.days.get(day_name)
+                    name = self._pick(day_name, indexed['files']) if indexed else None
+                    if name != f"{SELF_FORECAST_PREFIX}{day_name}.xlsx":
+                        if day_name not in self._refresh_month(month_key):
+                            continue
+                        name = self._pick(day_name, self._refresh_day(month_key, day_name))
+                    if name:
+                        return self.root / month_key / day_name / name
+            finally:
+                self.save()
+
+        raise FileNotFoundError(f"No self-forecast file found within {max_lookback_days} days back from {input_date_str}.")
+
+    def refresh(self):
+        """
+        Bring the whole index up to date, listing only folders whose mtime changed.
+        Useful as a background warm-up; find() refreshes what it needs on its own.
+        """
+        with self._lock:
+            self._checked = set()
+            _, years = _scan(self.root)
+            for year in years:
+                if not (year.is_dir() and year.name.isdigit()):
+                    continue
+                _, months = _scan(year.path)
+                for month in months:
+                    if not month.is_dir():
+                        continue
+                    month_key = f"{year.name}/{month.name}"
+                    for day_name in self._refresh_month(month_key):
+                        self._refresh_day(month_key, day_name)
+            self.save()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_self_forecast_index():
+    """Return the process-wide self-forecast index (loaded on first use)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SelfForecastIndex()
+    return _index
+
+
+def find_latest_self_forecast(input_date_str, max_lookback_days=14):
+    """Latest self-forecast workbook for a trading day (see SelfForecastIndex.find)"""
+    return get_self_forecast_index().find(input_date_str, max_lookback_days)
+
+
+# ==========================================
+# 2. SELF-FORECAST READER
+# ==========================================
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def _memo_file():
+    return CACHE_DIR / f"self_forecast_values_v{SELF_FORECAST_INDEX_VERSION}.json"
+
+
+def _load_memo():
+    global _memo
+    if _memo is None:
+        try:
+            with open(_memo_file(), encoding="utf-8") as f:
+                _memo = json.load(f)
+        except (OSError, ValueError):
+            _memo = {}
+    return _memo
+
+
+def _save_memo():
+    try:
+        memo_file = _memo_file()
+        memo_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = memo_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(_memo, f)
+        os.replace(tmp_file, memo_file)
+    except OSError as e:
+        print(f"[WARNING] Could not save self-forecast memo: {e}")
+
+
+def _read_cells(file_path):
+    """
+    Stream rows 17-40 of the first sheet and return column C (blank cells as NaN).
+    Like pd.read_excel, trailing rows that are blank in every column (up to and
+    including row 41) are dropped.
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = list(wb.worksheets[0].iter_rows(min_row=SELF_FORECAST_FIRST_ROW, max_row=SELF_FORECAST_LAST_ROW + 1,
+                                               values_only=True))
+    finally:
+        wb.close()
+
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    rows = rows[:SELF_FORECAST_LAST_ROW - SELF_FORECAST_FIRST_ROW + 1]
+    values = [row[SELF_FORECAST_COLUMN - 1] if len(row) >= SELF_FORECAST_COLUMN else None for row in rows]
+    return [float('nan') if v is None else float(v) for v in values]
+
+
+def read_self_forecast(file_path):
+    """
+    Hourly self-forecast values (C17:C40) from a self-forecast workbook.
+
+    Only that range is read (openpyxl read-only mode), and the result is memoized
+    in memory and on disk keyed by (path, mtime, size), so repeat runs for the same
+    workbook only stat the file.
+
+    Args:
+        file_path: Path of the self-forecast workbook
+
+    Returns:
+        float numpy array of up to 24 hourly MW values
+    """
+    stat = os.stat(file_path)
+    key = f"{Path(file_path)}|{stat.st_mtime}|{stat.st_size}"
+
+    with _memo_lock:
+        memo = _load_memo()
+        if key in memo:
+            return np.array(memo[key], dtype=float)
+
+    values = _read_cells(file_path)
+
+    with _memo_lock:
+        memo = _load_memo()
+        memo[key] = values
+        while len(memo) > SELF_FORECAST_MEMO_SIZE:
+            memo.pop(next(iter(memo)))
+        _save_memo()
+    return np.array(values, dtype=float)
+
+
+if __name__ == "__main__":
+    import time
+
+    index = get_self_forecast_index()
+    start = time.perf_counter()
+    index.refresh()
+    print(f"Index refreshed in {time.perf_counter() - start:.2f}s: "
+          f"{len(index.months)} months, {len(index.days)} days")
+
+    today = datetime.now().strftime("%d/%m/%Y")
+    start = time.perf_counter()
+    latest = find_latest_self_forecast(today)
+    print(f"Latest for {today}: {latest}")
+    print(f"Lookup took {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    print(f"Self-forecast: {read_self_forecast(latest)}")
+    print(f"Read took {time.perf_counter() - start:.3f}s")
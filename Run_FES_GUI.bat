@@ -2,6 +2,11 @@
 REM ====================================================================
 REM FES Bids Manager - Launcher
 REM Uses the correct Anaconda Python installation
+REM
+REM Meteologica password (one-off setup per Windows user, never stored here):
+REM   python -m keyring set FES-Meteologica Flogas
+REM saves it in the Windows Credential Manager, where the scripts read it.
+REM A METEOLOGICA_PASSWORD environment variable, if set, takes precedence.
 REM ====================================================================
 
 title FES Bids Manager
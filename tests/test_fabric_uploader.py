@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import FES_Fabric_Uploader as uploader
+
+
+@pytest.fixture
+def legacy_engine(monkeypatch):
+    """Local stand-in holding a Murley table created before the Lag column existed"""
+    monkeypatch.setattr(uploader, "_known_tables", {})
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE "Bids_Murley_D_Minus_1" '
+                          '("DateTime" DATETIME, "Upload_Timestamp" DATETIME, "GU_504260" FLOAT)'))
+    return engine
+
+
+def _murley_frame(**extra):
+    return pd.DataFrame({"DateTime": pd.date_range("2026-01-23", periods=48, freq="30min"),
+                         "Upload_Timestamp": pd.Timestamp("2026-01-22 09:00"), "Lag": "D-1",
+                         "GU_504260": 1.0, **extra})
+
+
+def test_append_never_alters_an_existing_table(legacy_engine):
+    assert uploader.bulk_insert(_murley_frame(), "Bids_Murley_D_Minus_1", legacy_engine) == 48
+
+    columns = [col["name"] for col in inspect(legacy_engine).get_columns("Bids_Murley_D_Minus_1")]
+    assert columns == ["DateTime", "Upload_Timestamp", "GU_504260"]
+
+    with pytest.raises(ValueError, match="GU_504261"):
+        uploader.bulk_insert(_murley_frame(GU_504261=2.0), "Bids_Murley_D_Minus_1", legacy_engine)
+
+
+def test_migrated_table_takes_the_lag(legacy_engine):
+    uploader.bulk_insert(_murley_frame(), "Bids_Murley_D_Minus_1", legacy_engine)
+    uploader.migrate_table("Bids_Murley_D_Minus_1", engine=legacy_engine)
+    uploader.bulk_insert(_murley_frame(), "Bids_Murley_D_Minus_1", legacy_engine)
+
+    lags = pd.read_sql('SELECT "Lag" FROM "Bids_Murley_D_Minus_1"', legacy_engine)["Lag"]
+    assert lags.isna().sum() == 48 and (lags == "D-1").sum() == 48
+
+
+def test_group_without_manifest_does_not_block_the_outbox(tmp_path, monkeypatch):
+    outbox = uploader.UploadOutbox(tmp_path)
+    delivered = []
+
+    def deliver(batches):
+        delivered.append(batches[0][1]["run_id"])
+        return batches[0][1]["run_id"], [], 0.0
+
+    outbox._deliver = deliver
+    frame = _murley_frame()
+
+    # Crash while queueing: the batches are on disk but the manifest never appeared
+    crashed = outbox.submit([("Bids_Murley_D_Minus_1", frame, None), ("Bids_SU_D_Minus_1", frame, None)], "crashed")
+    next(tmp_path.glob("*.manifest.json")).unlink()
+    crashed[1].unlink()
+    outbox.submit([("Bids_Murley_D_Minus_1", frame, None)], "next")
+
+    assert [complete for _, _, complete in outbox.pending_groups()] == [False, True]
+    outbox.start()
+    assert not outbox.drain(timeout=0.5)
+    assert delivered == ["next"]
+
+    # Once it is old enough the partial group is moved aside whole
+    monkeypatch.setattr(uploader, "OUTBOX_INCOMPLETE_GROUP_MINUTES", 0)
+    outbox._wake.set()
+    assert outbox.drain(timeout=2)
+    assert [batch.name for batch in outbox.failed()] == [crashed[0].name]
+    assert delivered == ["next"]
@@ -0,0 +1,16 @@
+import pandas as pd
+
+import FES_Forecast_Store as store
+
+
+def test_older_workbook_without_a_column_reads_it_as_nan(tmp_path):
+    workbook = tmp_path / "Generation Forecast.xlsx"
+    pd.DataFrame({"DateTime": ["23/01/2026 00:00", "23/01/2026 00:30"],
+                  "Meteo ROI _MW_": [110.0, 120.0]}).to_excel(workbook, index=False)
+
+    df = store.read_generation_forecast(workbook, ["Meteo ROI _MW_", "Meteo S26 _MW_"])
+
+    assert list(df.columns) == ["DateTime", "Meteo ROI _MW_", "Meteo S26 _MW_"]
+    assert df["Meteo ROI _MW_"].tolist() == [110.0, 120.0]
+    assert df["Meteo S26 _MW_"].isna().all()
+    assert df["DateTime"].iloc[1] == pd.Timestamp("2026-01-23 00:30")
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import FES_Meteologica as meteo
+
+
+WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+             xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:fes-test"
+             targetNamespace="urn:fes-test">
+  <types>
+    <xsd:schema targetNamespace="urn:fes-test" elementFormDefault="qualified">
+      <xsd:complexType name="LoginReq">
+        <xsd:sequence>
+          <xsd:element name="username" type="xsd:string"/>
+          <xsd:element name="password" type="xsd:string"/>
+        </xsd:sequence>
+      </xsd:complexType>
+      <xsd:element name="login" type="tns:LoginReq"/>
+    </xsd:schema>
+  </types>
+  <message name="loginRequest"><part name="request" element="tns:login"/></message>
+  <portType name="DataExchange">
+    <operation name="login"><input message="tns:loginRequest"/></operation>
+  </portType>
+  <binding name="DataExchangeBinding" type="tns:DataExchange">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <operation name="login">
+      <soap:operation soapAction="login"/>
+      <input><soap:body use="literal"/></input>
+    </operation>
+  </binding>
+  <service name="DataExchangeService">
+    <port name="DataExchangePort" binding="tns:DataExchangeBinding">
+      <soap:address location="http://localhost/api"/>
+    </port>
+  </service>
+</definitions>
+"""
+
+
+def _forecast_items(first_trading_date, days, values_per_record=2):
+    """forecastData as the service sends it: UTC stamps from 22:00Z the day before"""
+    start = first_trading_date - timedelta(hours=2)
+    first_stamp = int((start - datetime(1970, 1, 1)).total_seconds())
+    records = []
+    for period in range(48 * days):
+        values = "~".join(str(1000.0 * (period + band)) for band in range(values_per_record))
+        records.append(f"{first_stamp + 1800 * period}~{values}")
+    return [SimpleNamespace(facilityId="Vayu_Cluster1", forecastData=":" + ":".join(records))]
+
+
+def test_second_percentile_of_a_fetched_day_makes_no_request(monkeypatch):
+    first_day = datetime(2026, 1, 23)
+    requests = []
+
+    class Session:
+        def call(self, operation, request_type, client=None, **fields):
+            requests.append(fields)
+            return SimpleNamespace(facilitiesForecastData=SimpleNamespace(item=_forecast_items(first_day, 4)))
+
+    monkeypatch.setattr(meteo, "_forecast_memo", meteo.OrderedDict())
+    monkeypatch.setattr(meteo, "get_meteologica_client", lambda *args, **kwargs: None)
+    monkeypatch.setattr(meteo, "facilities_arg", lambda *args: None)
+    monkeypatch.setattr(meteo, "validate_facilities", lambda *args: [])
+    monkeypatch.setattr(meteo, "get_session", lambda: Session())
+
+    window = meteo.fetch_forecast(first_day, first_day + timedelta(days=3), percentiles=["50", "90"])
+    saturday = first_day + timedelta(days=1)
+    cached = meteo.cached_forecast(saturday, "90")
+
+    assert len(requests) == 1
+    assert cached is not None and len(cached.times) == 48
+    expected = meteo.split_trading_days(window, [first_day, saturday])[1]
+    np.testing.assert_array_equal(cached.column("Vayu_Cluster1", "90"), expected.column("Vayu_Cluster1", "90"))
+
+
+def test_missing_password_raises_with_setup_instructions(monkeypatch):
+    monkeypatch.setattr(meteo, "METEOLOGICA_PASSWORD", None)
+    monkeypatch.setattr(meteo, "KEYRING_AVAILABLE", False)
+
+    session = meteo.MeteologicaSession(client=object())
+    with pytest.raises(RuntimeError, match=meteo.METEOLOGICA_KEYRING_SERVICE) as e:
+        session.token()
+    assert "METEOLOGICA_PASSWORD" in str(e.value)
+
+
+def test_client_is_built_from_a_local_wsdl_once_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(meteo, "_clients", {})
+    wsdl = tmp_path / "MeteologicaDataExchangeService.wsdl"
+    wsdl.write_text(WSDL, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "meteologica_wsdl_v0.db").touch()
+
+    client = meteo.get_meteologica_client(wsdl=wsdl, cache_dir=cache_dir)
+
+    assert client.get_type("ns0:LoginReq")(username="u", password="p").username == "u"
+    assert meteo.get_meteologica_client(wsdl=wsdl, cache_dir=cache_dir) is client
+    assert [db.name for db in cache_dir.glob("*.db")] == [f"meteologica_wsdl_v{meteo.WSDL_CACHE_VERSION}.db"]
+    assert meteo.get_meteologica_client(wsdl=wsdl, cache_dir=cache_dir, force_refresh=True) is not client